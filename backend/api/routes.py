@@ -1,5 +1,10 @@
-from fastapi import APIRouter, HTTPException, UploadFile, File
+from fastapi import APIRouter, HTTPException, UploadFile, File, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
+from datetime import datetime
+from typing import List, Optional
+import json
 import shutil
 from pathlib import Path
 from backend.core.config import config
@@ -15,10 +20,22 @@ rag_engine = RAGEngine()
 indexing_service = IndexingService()
 
 
+class QueryFilters(BaseModel):
+    document_ids: List[str] = []
+    path_prefix: Optional[str] = None
+    modified_after: Optional[datetime] = None
+    modified_before: Optional[datetime] = None
+    author: Optional[str] = None
+
+
 class QueryRequest(BaseModel):
     question: str
     top_k: int = 5
     temperature: float = 0.7
+    filters: Optional[QueryFilters] = None
+
+    def filter_dict(self):
+        return self.filters.model_dump() if self.filters else None
 
 
 class QueryResponse(BaseModel):
@@ -35,7 +52,10 @@ class IndexResponse(BaseModel):
     status: str
     documents_processed: int
     chunks_created: int
+    documents_unchanged: int = 0
     errors: list
+    elapsed_seconds: float = 0.0
+    stages: dict = {}
 
 
 @router.post("/query", response_model=QueryResponse)
@@ -46,10 +66,11 @@ async def query_documents(request: QueryRequest):
         if not request.question or not request.question.strip():
             raise HTTPException(status_code=400, detail="Question cannot be empty")
 
-        result = rag_engine.query(
+        result = await rag_engine.aquery(
             request.question,
             top_k=request.top_k,
-            temperature=request.temperature
+            temperature=request.temperature,
+            filters=request.filter_dict()
         )
 
         return QueryResponse(**result)
@@ -59,12 +80,39 @@ async def query_documents(request: QueryRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/query/stream")
+async def stream_query(request: QueryRequest):
+    logger.info(f"Received streaming query: {request.question[:100]}...")
+
+    if not request.question or not request.question.strip():
+        raise HTTPException(status_code=400, detail="Question cannot be empty")
+
+    async def event_stream():
+        try:
+            async for event, data in rag_engine.astream(
+                request.question,
+                top_k=request.top_k,
+                temperature=request.temperature,
+                filters=request.filter_dict()
+            ):
+                yield f"event: {event}\ndata: {json.dumps(data)}\n\n"
+        except Exception as e:
+            logger.error(f"Streaming query endpoint error: {str(e)}")
+            yield f"event: error\ndata: {json.dumps({'detail': str(e)})}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+
 @router.post("/index/full", response_model=IndexResponse)
 async def trigger_full_reindex():
     try:
         logger.info("Full reindex triggered via API")
 
-        result = indexing_service.full_reindex()
+        result = await run_in_threadpool(indexing_service.full_reindex)
 
         return IndexResponse(**result)
 
@@ -78,7 +126,7 @@ async def trigger_incremental_index():
     try:
         logger.info("Incremental index triggered via API")
 
-        result = indexing_service.incremental_index()
+        result = await run_in_threadpool(indexing_service.incremental_index)
 
         return IndexResponse(**result)
 
@@ -87,6 +135,21 @@ async def trigger_incremental_index():
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/index/rollback")
+async def rollback_index():
+    try:
+        logger.warning("Index rollback triggered via API")
+
+        result = await run_in_threadpool(indexing_service.rollback)
+        return {"status": "success", **result}
+
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except Exception as e:
+        logger.error(f"Index rollback endpoint error: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.post("/index/upload", response_model=IndexResponse)
 async def upload_document(file: UploadFile = File(...)):
     try:
@@ -102,7 +165,7 @@ async def upload_document(file: UploadFile = File(...)):
             
         logger.info(f"File saved to {file_path}, triggering incremental index")
         
-        result = indexing_service.incremental_index()
+        result = await run_in_threadpool(indexing_service.incremental_index)
         return IndexResponse(**result)
 
     except Exception as e:
@@ -114,7 +177,7 @@ async def upload_document(file: UploadFile = File(...)):
 async def get_index_statistics():
     import traceback
     try:
-        stats = indexing_service.get_index_stats()
+        stats = await run_in_threadpool(indexing_service.get_index_stats)
         return stats
 
     except Exception as e:
@@ -123,9 +186,9 @@ async def get_index_statistics():
 
 
 @router.get("/index/documents")
-async def get_indexed_documents():
+async def get_indexed_documents(limit: int = Query(100, ge=1, le=1000), cursor: Optional[str] = None):
     try:
-        docs = indexing_service.get_indexed_documents()
+        docs = await run_in_threadpool(indexing_service.get_indexed_documents, limit, cursor)
         return docs
     except Exception as e:
         logger.error(f"Endpoint error: {str(e)}")
@@ -134,7 +197,7 @@ async def get_indexed_documents():
 @router.delete("/index/documents/{document_id}")
 async def delete_indexed_document(document_id: str):
     try:
-        indexing_service.delete_document(document_id)
+        await run_in_threadpool(indexing_service.delete_document, document_id)
         return {"status": "success", "message": f"Document {document_id} deleted"}
     except Exception as e:
         logger.error(f"Endpoint error: {str(e)}")
@@ -14,19 +14,69 @@ class Config:
         self.sharepoint_client_secret = os.getenv('SHAREPOINT_CLIENT_SECRET', '')
         self.sharepoint_tenant_id = os.getenv('SHAREPOINT_TENANT_ID', '')
         self.sharepoint_document_library = os.getenv('SHAREPOINT_DOCUMENT_LIBRARY', 'Shared Documents')
+        self.sharepoint_graph_url = os.getenv('SHAREPOINT_GRAPH_URL', 'https://graph.microsoft.com/v1.0').rstrip('/')
+        self.sharepoint_login_url = os.getenv('SHAREPOINT_LOGIN_URL', 'https://login.microsoftonline.com').rstrip('/')
+        self.sharepoint_delta_enabled = os.getenv('SHAREPOINT_DELTA_ENABLED', 'true').lower() == 'true'
+        self.sharepoint_delta_page_size = int(os.getenv('SHAREPOINT_DELTA_PAGE_SIZE', '500'))
+        self.sharepoint_max_concurrency = int(os.getenv('SHAREPOINT_MAX_CONCURRENCY', '8'))
+        self.sharepoint_max_retries = int(os.getenv('SHAREPOINT_MAX_RETRIES', '5'))
+        self.sharepoint_timeout_seconds = float(os.getenv('SHAREPOINT_TIMEOUT_SECONDS', '60'))
         self.local_documents_path = os.getenv('LOCAL_DOCUMENTS_PATH', '/tmp/tryrag_documents')
+        self.local_manifest_enabled = os.getenv('LOCAL_MANIFEST_ENABLED', 'true').lower() == 'true'
+        self.local_scan_hash_workers = int(os.getenv('LOCAL_SCAN_HASH_WORKERS', '8'))
+        self.local_watch_enabled = os.getenv('LOCAL_WATCH_ENABLED', 'false').lower() == 'true'
+        self.local_watch_debounce_seconds = float(os.getenv('LOCAL_WATCH_DEBOUNCE_SECONDS', '2'))
 
         self.google_api_key = os.getenv('GOOGLE_API_KEY', '')
         self.embedding_model = os.getenv('EMBEDDING_MODEL', 'gemini-embedding-2-preview')
+        self.embedding_provider = os.getenv('EMBEDDING_PROVIDER', 'gemini').strip().lower()
+        self.embedding_concurrency = int(os.getenv('EMBEDDING_CONCURRENCY', '4'))
+        self.embedding_max_retries = int(os.getenv('EMBEDDING_MAX_RETRIES', '5'))
+        self.embedding_retry_base_seconds = float(os.getenv('EMBEDDING_RETRY_BASE_SECONDS', '1.0'))
+        self.embedding_retry_max_seconds = float(os.getenv('EMBEDDING_RETRY_MAX_SECONDS', '30.0'))
+        self.local_embedding_dimension = int(os.getenv('LOCAL_EMBEDDING_DIMENSION', '768'))
+        self.local_embedding_latency_ms = float(os.getenv('LOCAL_EMBEDDING_LATENCY_MS', '0'))
         self.llm_model = os.getenv('LLM_MODEL', 'gemini-2.0-flash-exp')
 
         self.vector_db_path = os.getenv('VECTOR_DB_PATH', './data/chromadb')
         self.collection_name = os.getenv('COLLECTION_NAME', 'sharepoint_documents')
+        self.vector_hnsw_space = os.getenv('VECTOR_HNSW_SPACE', 'l2').strip().lower()
+        self.vector_hnsw_m = int(os.getenv('VECTOR_HNSW_M', '16'))
+        self.vector_hnsw_construction_ef = int(os.getenv('VECTOR_HNSW_CONSTRUCTION_EF', '100'))
+        self.vector_hnsw_search_ef = int(os.getenv('VECTOR_HNSW_SEARCH_EF', '10'))
+        self.vector_hnsw_num_threads = int(os.getenv('VECTOR_HNSW_NUM_THREADS', '0'))
+        self.vector_query_candidates = int(os.getenv('VECTOR_QUERY_CANDIDATES', '0'))
+        self.vector_store_backend = os.getenv('VECTOR_STORE_BACKEND', 'chroma').strip().lower()
+        self.vector_numpy_dtype = os.getenv('VECTOR_NUMPY_DTYPE', 'float32').strip().lower()
+        self.vector_numpy_rescore_factor = int(os.getenv('VECTOR_NUMPY_RESCORE_FACTOR', '4'))
+        self.vector_numpy_compaction_ratio = float(os.getenv('VECTOR_NUMPY_COMPACTION_RATIO', '0.25'))
+
+        self.embedding_cache_enabled = os.getenv('EMBEDDING_CACHE_ENABLED', 'true').lower() == 'true'
+        self.embedding_cache_path = os.getenv(
+            'EMBEDDING_CACHE_PATH',
+            str(Path(self.vector_db_path).parent / 'embedding_cache.db')
+        )
+        self.embedding_cache_max_entries = int(os.getenv('EMBEDDING_CACHE_MAX_ENTRIES', '500000'))
+        self.local_manifest_path = os.getenv(
+            'LOCAL_MANIFEST_PATH',
+            str(Path(self.vector_db_path).parent / 'local_manifest.db')
+        )
 
         self.index_schedule_minutes = int(os.getenv('INDEX_SCHEDULE_MINUTES', '30'))
         self.batch_size = int(os.getenv('BATCH_SIZE', '10'))
         self.chunk_size = int(os.getenv('CHUNK_SIZE', '1000'))
         self.chunk_overlap = int(os.getenv('CHUNK_OVERLAP', '200'))
+        self.indexing_download_workers = int(os.getenv('INDEXING_DOWNLOAD_WORKERS', '8'))
+        self.indexing_extract_workers = int(os.getenv('INDEXING_EXTRACT_WORKERS', str(min(4, os.cpu_count() or 1))))
+        self.extraction_isolation_enabled = os.getenv('EXTRACTION_ISOLATION_ENABLED', 'true').lower() == 'true'
+        self.extraction_timeout_seconds = float(os.getenv('EXTRACTION_TIMEOUT_SECONDS', '120'))
+        self.extraction_memory_limit_mb = int(os.getenv('EXTRACTION_MEMORY_LIMIT_MB', '2048'))
+        self.indexing_embed_workers = int(os.getenv('INDEXING_EMBED_WORKERS', '2'))
+        self.indexing_queue_size = int(os.getenv('INDEXING_QUEUE_SIZE', '32'))
+        self.indexing_write_batch_size = int(os.getenv('INDEXING_WRITE_BATCH_SIZE', '256'))
+        self.indexing_chunk_batch_size = int(os.getenv('INDEXING_CHUNK_BATCH_SIZE', '64'))
+        self.indexing_keyword_save_chunks = int(os.getenv('INDEXING_KEYWORD_SAVE_CHUNKS', '10000'))
+        self.vector_write_batch_size = int(os.getenv('VECTOR_WRITE_BATCH_SIZE', '1000'))
 
         self.api_host = os.getenv('API_HOST', '0.0.0.0')
         self.api_port = int(os.getenv('API_PORT', '8000'))
@@ -42,10 +92,18 @@ class Config:
 
         self.multi_query_enabled = os.getenv('MULTI_QUERY_ENABLED', 'true').lower() == 'true'
         self.multi_query_count = int(os.getenv('MULTI_QUERY_COUNT', '3'))
+        self.rewrite_deadline_seconds = float(os.getenv('REWRITE_DEADLINE_SECONDS', '4'))
+        self.rewrite_max_concurrency = int(os.getenv('REWRITE_MAX_CONCURRENCY', '8'))
+        self.speculative_retrieval_enabled = os.getenv('SPECULATIVE_RETRIEVAL_ENABLED', 'true').lower() == 'true'
         self.hybrid_search_enabled = os.getenv('HYBRID_SEARCH_ENABLED', 'true').lower() == 'true'
         self.hybrid_vector_weight = float(os.getenv('HYBRID_VECTOR_WEIGHT', '0.6'))
         self.hybrid_keyword_weight = float(os.getenv('HYBRID_KEYWORD_WEIGHT', '0.4'))
         self.hybrid_candidate_pool = int(os.getenv('HYBRID_CANDIDATE_POOL', '20'))
+        self.keyword_index_dir = os.getenv('KEYWORD_INDEX_DIR', self.vector_db_path)
+        self.bm25_k1 = float(os.getenv('BM25_K1', '1.5'))
+        self.bm25_b = float(os.getenv('BM25_B', '0.75'))
+        self.retrieval_max_concurrency = int(os.getenv('RETRIEVAL_MAX_CONCURRENCY', '4'))
+        self.retrieval_variant_timeout_seconds = float(os.getenv('RETRIEVAL_VARIANT_TIMEOUT_SECONDS', '10'))
 
         self.reranker_enabled = os.getenv('RERANKER_ENABLED', 'true').lower() == 'true'
         self.reranker_model = os.getenv('RERANKER_MODEL', 'BAAI/bge-reranker-v2-m3')
@@ -60,8 +118,18 @@ class Config:
         self.telemetry_otlp_endpoint = os.getenv('TELEMETRY_OTLP_ENDPOINT', 'http://otel-collector:4317')
         self.telemetry_console_export = os.getenv('TELEMETRY_CONSOLE_EXPORT', 'false').lower() == 'true'
 
-        self.cache_ttl_seconds = int(os.getenv('CACHE_TTL_SECONDS', '300'))
+        self.cache_ttl_seconds = int(os.getenv('CACHE_TTL_SECONDS', '3600'))
         self.cache_max_size = int(os.getenv('CACHE_MAX_SIZE', '100'))
+        self.cache_backend = os.getenv('CACHE_BACKEND', 'memory').lower()
+        self.cache_max_bytes = int(os.getenv('CACHE_MAX_BYTES', str(50 * 1024 * 1024)))
+        self.cache_sqlite_path = os.getenv(
+            'CACHE_SQLITE_PATH',
+            str(Path(self.vector_db_path).parent / 'response_cache.db')
+        )
+        self.cache_redis_url = os.getenv('CACHE_REDIS_URL', 'redis://localhost:6379/0')
+        self.cache_key_prefix = os.getenv('CACHE_KEY_PREFIX', 'tryrag:cache:')
+        self.semantic_cache_enabled = os.getenv('SEMANTIC_CACHE_ENABLED', 'true').lower() == 'true'
+        self.semantic_cache_threshold = float(os.getenv('SEMANTIC_CACHE_THRESHOLD', '0.92'))
 
         self.langfuse_enabled = os.getenv('LANGFUSE_ENABLED', 'false').lower() == 'true'
         self.langfuse_public_key = os.getenv('LANGFUSE_PUBLIC_KEY', '')
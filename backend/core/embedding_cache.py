@@ -0,0 +1,148 @@
+import hashlib
+import sqlite3
+import threading
+import time
+from array import array
+from pathlib import Path
+from backend.core.config import config
+from backend.core.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+class EmbeddingCache:
+    """Persistent content-addressed embedding store with LRU eviction.
+
+    Keys are sha256(model, task_type, text) so an unchanged chunk maps to the same
+    entry across reindexes. Vectors are stored as packed float32 blobs in SQLite
+    (WAL mode, safe to share between the API and indexing processes).
+    """
+
+    def __init__(self, db_path, max_entries=500000, eviction_fraction=0.1):
+        self.db_path = Path(db_path)
+        self.max_entries = max_entries
+        self.eviction_fraction = eviction_fraction
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "key TEXT PRIMARY KEY, embedding BLOB NOT NULL, last_access REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_embeddings_last_access ON embeddings(last_access)")
+        self._conn.commit()
+        self._entries = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+        logger.info(f"Embedding cache opened at {self.db_path} ({self._entries} entries)")
+
+    @staticmethod
+    def make_key(model, task_type, text):
+        raw = f"{model}\x00{task_type}\x00{text}"
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def get_many(self, keys):
+        if not keys:
+            return {}
+
+        unique_keys = list(dict.fromkeys(keys))
+        found = {}
+
+        with self._lock:
+            # Stay well under SQLite's bound-parameter limit
+            for i in range(0, len(unique_keys), 500):
+                batch = unique_keys[i:i + 500]
+                placeholders = ','.join('?' * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT key, embedding FROM embeddings WHERE key IN ({placeholders})",
+                    batch
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = array('f', blob).tolist()
+
+            if found:
+                now = time.time()
+                self._conn.executemany(
+                    "UPDATE embeddings SET last_access = ? WHERE key = ?",
+                    [(now, key) for key in found]
+                )
+                self._conn.commit()
+
+            self.hits += sum(1 for key in keys if key in found)
+            self.misses += sum(1 for key in keys if key not in found)
+
+        return found
+
+    def put_many(self, items):
+        if not items:
+            return
+
+        now = time.time()
+        rows = [(key, array('f', embedding).tobytes(), now) for key, embedding in items.items()]
+
+        with self._lock:
+            before = self._conn.total_changes
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO embeddings (key, embedding, last_access) VALUES (?, ?, ?)",
+                rows
+            )
+            self._entries += self._conn.total_changes - before
+            self._conn.commit()
+
+            if self._entries > self.max_entries:
+                self._evict()
+
+    def _evict(self):
+        # Evict a slice at a time so inserts near the limit don't evict on every call
+        target = int(self.max_entries * (1.0 - self.eviction_fraction))
+        excess = self._entries - target
+        self._conn.execute(
+            "DELETE FROM embeddings WHERE key IN ("
+            "SELECT key FROM embeddings ORDER BY last_access ASC LIMIT ?)",
+            (excess,)
+        )
+        self._conn.commit()
+        self._entries = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        self.evictions += excess
+        logger.info(f"Evicted {excess} least recently used embeddings from cache")
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'enabled': True,
+                'entries': self._entries,
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'evictions': self.evictions,
+            }
+
+
+def get_embedding_cache():
+    """Return the process-wide embedding cache, or None when disabled."""
+    global _cache
+
+    if not config.embedding_cache_enabled:
+        return None
+
+    with _cache_lock:
+        if _cache is None:
+            try:
+                _cache = EmbeddingCache(
+                    config.embedding_cache_path,
+                    max_entries=config.embedding_cache_max_entries
+                )
+            except Exception as e:
+                logger.warning(f"Embedding cache unavailable, continuing without it: {str(e)}")
+                return None
+        return _cache
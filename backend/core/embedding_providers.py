@@ -0,0 +1,93 @@
+import hashlib
+import math
+import re
+import time
+import google.generativeai as genai
+from backend.core.config import config
+from backend.core.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class EmbeddingProvider:
+    """Turns a batch of texts into one embedding per text, in order."""
+
+    name = 'base'
+    max_batch_size = 100
+
+    def embed(self, texts, task_type):
+        raise NotImplementedError
+
+    def is_rate_limit_error(self, error):
+        return False
+
+
+class GeminiEmbeddingProvider(EmbeddingProvider):
+    name = 'gemini'
+    max_batch_size = 100
+
+    def __init__(self, model):
+        genai.configure(api_key=config.google_api_key)
+        self.model = model
+
+    def embed(self, texts, task_type):
+        # A list payload is sent as a single batchEmbedContents request
+        result = genai.embed_content(
+            model=self.model,
+            content=list(texts),
+            task_type=task_type
+        )
+        return result['embedding']
+
+    def is_rate_limit_error(self, error):
+        if type(error).__name__ in ('ResourceExhausted', 'TooManyRequests', 'ServiceUnavailable'):
+            return True
+        message = str(error).lower()
+        return '429' in message or 'quota' in message or 'rate limit' in message
+
+
+class DeterministicEmbeddingProvider(EmbeddingProvider):
+    """Offline stand-in for benchmarking: hashes tokens into a fixed-size unit vector.
+
+    Texts sharing vocabulary get similar vectors, so retrieval still behaves
+    sensibly, and the optional simulated latency models an API round trip.
+    """
+
+    name = 'local'
+    max_batch_size = 1000
+
+    def __init__(self, dimension=768, latency_seconds=0.0):
+        self.dimension = dimension
+        self.latency_seconds = latency_seconds
+
+    def _embed_text(self, text):
+        vector = [0.0] * self.dimension
+        for token in re.findall(r"[a-zA-Z0-9]+", (text or "").lower()):
+            digest = hashlib.blake2b(token.encode('utf-8'), digest_size=8).digest()
+            bucket = int.from_bytes(digest[:4], 'little') % self.dimension
+            sign = 1.0 if digest[4] & 1 else -1.0
+            vector[bucket] += sign
+
+        norm = math.sqrt(sum(value * value for value in vector))
+        if norm == 0:
+            vector[0] = 1.0
+            return vector
+        return [value / norm for value in vector]
+
+    def embed(self, texts, task_type):
+        if self.latency_seconds:
+            time.sleep(self.latency_seconds)
+        return [self._embed_text(text) for text in texts]
+
+
+def create_embedding_provider(model):
+    provider_name = config.embedding_provider
+    if provider_name == 'local':
+        logger.info(f"Using deterministic local embedding provider ({config.local_embedding_dimension} dims)")
+        return DeterministicEmbeddingProvider(
+            dimension=config.local_embedding_dimension,
+            latency_seconds=config.local_embedding_latency_ms / 1000.0
+        )
+    if provider_name != 'gemini':
+        logger.warning(f"Unknown embedding provider '{provider_name}', falling back to gemini")
+    return GeminiEmbeddingProvider(model)
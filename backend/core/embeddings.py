@@ -1,4 +1,9 @@
-import google.generativeai as genai
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from backend.core.embedding_cache import EmbeddingCache, get_embedding_cache
+from backend.core.embedding_providers import create_embedding_provider
 from backend.core.logger import setup_logger
 from backend.core.config import config
 
@@ -6,10 +11,17 @@ logger = setup_logger(__name__)
 
 
 class EmbeddingService:
-    def __init__(self):
-        genai.configure(api_key=config.google_api_key)
+    def __init__(self, provider=None, cache=None):
         self.model = self._normalize_model_name(config.embedding_model)
-        self.batch_size = config.batch_size
+        self.provider = provider or create_embedding_provider(self.model)
+        self.cache = cache if cache is not None else get_embedding_cache()
+        self.batch_size = max(1, min(config.batch_size, self.provider.max_batch_size))
+        self.concurrency = max(1, config.embedding_concurrency)
+        self.max_retries = config.embedding_max_retries
+        self.retry_base_seconds = config.embedding_retry_base_seconds
+        self.retry_max_seconds = config.embedding_retry_max_seconds
+        self._executor = None
+        self._executor_lock = threading.Lock()
 
     def _normalize_model_name(self, model_name):
         if model_name.startswith('models/') or model_name.startswith('tunedModels/'):
@@ -18,46 +30,112 @@ class EmbeddingService:
         logger.info(f"Normalized embedding model name to: {normalized}")
         return normalized
 
-    def generate_embeddings(self, texts):
+    def _get_executor(self):
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.concurrency,
+                    thread_name_prefix='embedding'
+                )
+            return self._executor
+
+    def _embed_with_retry(self, texts, task_type):
+        attempt = 0
+        while True:
+            try:
+                embeddings = self.provider.embed(texts, task_type)
+                if len(embeddings) != len(texts):
+                    raise ValueError(f"Embedding provider returned {len(embeddings)} vectors for {len(texts)} texts")
+                return embeddings
+            except Exception as e:
+                if attempt >= self.max_retries or not self.provider.is_rate_limit_error(e):
+                    raise
+
+                # Full jitter keeps concurrent batches from retrying in lockstep
+                ceiling = min(self.retry_max_seconds, self.retry_base_seconds * (2 ** attempt))
+                delay = random.uniform(0, ceiling)
+                attempt += 1
+                logger.warning(f"Embedding rate limited, retry {attempt}/{self.max_retries} "
+                               f"in {delay:.2f}s: {str(e)}")
+                time.sleep(delay)
+
+    def _embed_batch(self, batch_number, batch, task_type):
+        try:
+            logger.debug(f"Generating embeddings for batch {batch_number} ({len(batch)} texts)")
+            batch_embeddings = self._embed_with_retry(batch, task_type)
+            logger.debug(f"Generated {len(batch_embeddings)} embeddings")
+            return batch_embeddings
+        except Exception as e:
+            logger.error(f"Failed to generate embeddings for batch: {str(e)}")
+            raise
+
+    def _cache_key(self, text, task_type):
+        # Provider is part of the key so local benchmark vectors never leak into Gemini results
+        return EmbeddingCache.make_key(f"{self.provider.name}:{self.model}", task_type, text)
+
+    def generate_embeddings(self, texts, task_type="retrieval_document"):
         if not texts:
             return []
 
-        all_embeddings = []
+        if not self.cache:
+            return self._generate_uncached(texts, task_type)
 
-        for i in range(0, len(texts), self.batch_size):
-            batch = texts[i:i + self.batch_size]
+        keys = [self._cache_key(text, task_type) for text in texts]
+        cached = self.cache.get_many(keys)
 
-            try:
-                logger.debug(f"Generating embeddings for batch {i//self.batch_size + 1} ({len(batch)} texts)")
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in cached and key not in missing:
+                missing[key] = text
 
-                batch_embeddings = []
-                for text in batch:
-                    result = genai.embed_content(
-                        model=self.model,
-                        content=text,
-                        task_type="retrieval_document"
-                    )
-                    batch_embeddings.append(result['embedding'])
+        if missing:
+            fresh = self._generate_uncached(list(missing.values()), task_type)
+            fresh_map = dict(zip(missing.keys(), fresh))
+            self.cache.put_many(fresh_map)
+            cached.update(fresh_map)
 
-                all_embeddings.extend(batch_embeddings)
+        logger.info(f"Embedding cache served {len(texts) - len(missing)}/{len(texts)} texts")
+        return [cached[key] for key in keys]
 
-                logger.debug(f"Generated {len(batch_embeddings)} embeddings")
+    def _generate_uncached(self, texts, task_type):
+        batches = [texts[i:i + self.batch_size] for i in range(0, len(texts), self.batch_size)]
 
-            except Exception as e:
-                logger.error(f"Failed to generate embeddings for batch: {str(e)}")
-                raise
+        if len(batches) == 1 or self.concurrency == 1:
+            batch_results = [
+                self._embed_batch(number, batch, task_type)
+                for number, batch in enumerate(batches, start=1)
+            ]
+        else:
+            batch_results = list(self._get_executor().map(
+                lambda item: self._embed_batch(item[0], item[1], task_type),
+                enumerate(batches, start=1)
+            ))
+
+        all_embeddings = []
+        for batch_embeddings in batch_results:
+            all_embeddings.extend(batch_embeddings)
 
         logger.info(f"Generated total of {len(all_embeddings)} embeddings")
         return all_embeddings
 
     def generate_single_embedding(self, text):
         try:
-            result = genai.embed_content(
-                model=self.model,
-                content=text,
-                task_type="retrieval_query"
-            )
-            return result['embedding']
+            if not self.cache:
+                return self._embed_with_retry([text], "retrieval_query")[0]
+
+            key = self._cache_key(text, "retrieval_query")
+            cached = self.cache.get_many([key])
+            if key in cached:
+                return cached[key]
+
+            embedding = self._embed_with_retry([text], "retrieval_query")[0]
+            self.cache.put_many({key: embedding})
+            return embedding
         except Exception as e:
             logger.error(f"Failed to generate single embedding: {str(e)}")
             raise
+
+    def cache_stats(self):
+        if not self.cache:
+            return {'enabled': False}
+        return self.cache.stats()
@@ -0,0 +1,26 @@
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks, single-process deployments only
+    fcntl = None
+
+
+@contextmanager
+def file_lock(path):
+    """Exclusive cross-process lock on a `<path>.lock` sidecar file.
+
+    flock locks belong to the open file, so two threads of one process that
+    each enter file_lock also exclude each other.
+    """
+    lock_path = Path(f"{path}.lock")
+    lock_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(lock_path, 'a') as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
@@ -8,17 +8,39 @@ class RAGEngine:
     def __init__(self):
         self.pipeline = LangGraphRAGPipeline()
 
-    def query(self, user_question, top_k=5, temperature=0.7):
+    def query(self, user_question, top_k=5, temperature=0.7, filters=None):
         logger.info(f"Processing RAG query with LangGraph: {user_question[:100]}...")
 
         try:
-            result = self.pipeline.run(user_question, top_k=top_k, temperature=temperature)
+            result = self.pipeline.run(user_question, top_k=top_k, temperature=temperature, filters=filters)
             logger.info("RAG query completed successfully")
             return result
         except Exception as e:
             logger.error(f"RAG query failed: {str(e)}")
             raise
 
+    async def aquery(self, user_question, top_k=5, temperature=0.7, filters=None):
+        logger.info(f"Processing async RAG query with LangGraph: {user_question[:100]}...")
+
+        try:
+            result = await self.pipeline.arun(user_question, top_k=top_k, temperature=temperature, filters=filters)
+            logger.info("RAG query completed successfully")
+            return result
+        except Exception as e:
+            logger.error(f"RAG query failed: {str(e)}")
+            raise
+
+    async def astream(self, user_question, top_k=5, temperature=0.7, filters=None):
+        logger.info(f"Processing streaming RAG query: {user_question[:100]}...")
+
+        try:
+            async for event, data in self.pipeline.astream(user_question, top_k=top_k, temperature=temperature, filters=filters):
+                yield event, data
+            logger.info("Streaming RAG query completed successfully")
+        except Exception as e:
+            logger.error(f"Streaming RAG query failed: {str(e)}")
+            raise
+
     def get_graph_mermaid(self):
         try:
             import re
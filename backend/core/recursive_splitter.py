@@ -115,18 +115,17 @@ class RecursiveCharacterSplitter:
         return overlapped_chunks
 
     def chunk_text_with_pages(self, pages_data, metadata=None):
-        all_chunks = []
+        all_chunks = list(self.iter_chunks_with_pages(pages_data, metadata))
+        logger.info(f"Created {len(all_chunks)} chunks from {len(pages_data)} pages")
+        return all_chunks
 
-        for page_data in pages_data:
+    def iter_chunks_with_pages(self, pages, metadata=None):
+        """Yield chunks page by page; pages may be any iterable, including a generator."""
+        for page_data in pages:
             page_number = page_data['page_number']
             page_text = page_data['text']
 
             page_metadata = metadata.copy() if metadata else {}
             page_metadata['page_number'] = page_number
 
-            page_chunks = self.split_text(page_text, page_metadata)
-
-            all_chunks.extend(page_chunks)
-
-        logger.info(f"Created {len(all_chunks)} chunks from {len(pages_data)} pages")
-        return all_chunks
+            yield from self.split_text(page_text, page_metadata)
@@ -4,14 +4,16 @@ from backend.core.logger import setup_logger
 
 logger = setup_logger(__name__)
 
+FALLBACK_ANSWER = "I apologize, but I was unable to generate a response at this time."
+
 
 class LLMService:
     def __init__(self):
         genai.configure(api_key=config.google_api_key)
         self.model = genai.GenerativeModel(config.llm_model)
 
-    def generate_answer(self, question, context, temperature=0.7):
-        prompt = f"""You are a helpful assistant that answers questions based on provided context.
+    def _answer_prompt(self, question, context):
+        return f"""You are a helpful assistant that answers questions based on provided context.
 
 Rules:
 - Use only context facts
@@ -25,26 +27,63 @@ Context:
 Question: {question}
 """
 
-        generation_config = genai.types.GenerationConfig(
+    def _answer_config(self, temperature):
+        return genai.types.GenerationConfig(
             temperature=temperature,
             max_output_tokens=1000
         )
 
-        response = self.model.generate_content(prompt, generation_config=generation_config)
-        answer = response.text or "I apologize, but I was unable to generate a response at this time."
-        return answer
-
-    def generate_hypothetical_answer(self, question):
-        prompt = f"""You generate a hypothetical answer for HyDE retrieval.
+    def _hyde_prompt(self, question):
+        return f"""You generate a hypothetical answer for HyDE retrieval.
 
 Question: {question}
 Generate a concise but information-rich hypothetical answer.
 """
 
-        generation_config = genai.types.GenerationConfig(
+    def _hyde_config(self):
+        return genai.types.GenerationConfig(
             temperature=config.hyde_temperature,
             max_output_tokens=config.hyde_max_tokens
         )
 
-        response = self.model.generate_content(prompt, generation_config=generation_config)
+    def generate_answer(self, question, context, temperature=0.7):
+        response = self.model.generate_content(
+            self._answer_prompt(question, context),
+            generation_config=self._answer_config(temperature)
+        )
+        answer = response.text or FALLBACK_ANSWER
+        return answer
+
+    async def agenerate_answer(self, question, context, temperature=0.7):
+        response = await self.model.generate_content_async(
+            self._answer_prompt(question, context),
+            generation_config=self._answer_config(temperature)
+        )
+        return response.text or FALLBACK_ANSWER
+
+    async def astream_answer(self, question, context, temperature=0.7):
+        response = await self.model.generate_content_async(
+            self._answer_prompt(question, context),
+            generation_config=self._answer_config(temperature),
+            stream=True
+        )
+
+        async for chunk in response:
+            try:
+                text = chunk.text
+            except ValueError:
+                # Chunks without text parts (e.g. a trailing safety/finish chunk)
+                continue
+            if text:
+                yield text
+
+    def generate_hypothetical_answer(self, question):
+        response = self.model.generate_content(self._hyde_prompt(question), generation_config=self._hyde_config())
+        return response.text or question
+
+    async def agenerate_hypothetical_answer(self, question):
+        response = await self.model.generate_content_async(
+            self._hyde_prompt(question),
+            generation_config=self._hyde_config()
+        )
         return response.text or question
@@ -1,21 +1,43 @@
 import json
+import os
+import threading
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
+from backend.core.file_lock import file_lock
 from backend.core.logger import setup_logger
 
 logger = setup_logger(__name__)
 
+# Shared by every IndexState in the process; the state file's lock file covers other processes
+_state_lock = threading.Lock()
+
 
 class IndexState:
     def __init__(self, state_file='./data/index_state.json'):
         self.state_file = Path(state_file)
+        self._lock = _state_lock
+        self._cached_signature = None
+        self._cached_state = {}
         self._ensure_state_file()
 
     def _ensure_state_file(self):
         self.state_file.parent.mkdir(parents=True, exist_ok=True)
 
         if not self.state_file.exists():
-            self._write_state({'last_indexed': None})
+            with self._updating():
+                if not self.state_file.exists():
+                    self._write_state({'last_indexed': None})
+
+    @contextmanager
+    def _updating(self):
+        """Hold the state for one read-modify-write, against this process's threads and other processes.
+
+        The indexing cron, API workers (upload, delete, rollback) and the
+        scheduler all update the same file.
+        """
+        with self._lock, file_lock(self.state_file):
+            yield
 
     def _read_state(self):
         try:
@@ -25,10 +47,25 @@ class IndexState:
             logger.error(f"Failed to read index state: {str(e)}")
             return {'last_indexed': None}
 
+    def _read_state_cached(self):
+        # Hot-path readers (every query) only re-parse the file after it was replaced
+        try:
+            stat = os.stat(self.state_file)
+        except FileNotFoundError:
+            return {}
+        signature = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        if signature != self._cached_signature:
+            self._cached_state = self._read_state()
+            self._cached_signature = signature
+        return self._cached_state
+
     def _write_state(self, state):
         try:
-            with open(self.state_file, 'w') as f:
+            # Written atomically so API workers never read a half-written file
+            tmp_path = self.state_file.with_suffix(self.state_file.suffix + '.tmp')
+            with open(tmp_path, 'w') as f:
                 json.dump(state, f, indent=2)
+            os.replace(tmp_path, self.state_file)
         except Exception as e:
             logger.error(f"Failed to write index state: {str(e)}")
 
@@ -41,7 +78,99 @@ class IndexState:
         return None
 
     def update_last_indexed_time(self, timestamp):
-        state = self._read_state()
-        state['last_indexed'] = timestamp.isoformat()
-        self._write_state(state)
+        with self._updating():
+            state = self._read_state()
+            state['last_indexed'] = timestamp.isoformat()
+            self._write_state(state)
         logger.info(f"Updated last indexed time to {timestamp}")
+
+    def get_generation(self):
+        return int(self._read_state_cached().get('generation', 0))
+
+    def bump_generation(self, document_ids=(), full=False):
+        """Advance the index generation and record it for the changed documents.
+
+        A full reindex changes every document, so it resets the per-document
+        map instead of listing them all.
+        """
+        with self._updating():
+            state = self._read_state()
+            generation = int(state.get('generation', 0)) + 1
+            state['generation'] = generation
+            if full:
+                state['full_generation'] = generation
+                state['document_generations'] = {}
+            document_generations = state.setdefault('document_generations', {})
+            for document_id in document_ids:
+                document_generations[document_id] = generation
+            self._write_state(state)
+        logger.info(f"Index generation advanced to {generation}")
+        return generation
+
+    def is_stale(self, generation, document_ids):
+        """Whether an answer produced at `generation` from `document_ids` may be out of date.
+
+        Answers that cite no documents go stale on any change, since a new
+        document could now answer them.
+        """
+        state = self._read_state_cached()
+        current = int(state.get('generation', 0))
+        if generation is None:
+            return current > 0
+        if generation >= current:
+            return False
+        if generation < int(state.get('full_generation', 0)):
+            return True
+        if not document_ids:
+            return True
+        document_generations = state.get('document_generations', {})
+        return any(document_generations.get(document_id, 0) > generation for document_id in document_ids)
+
+    def get_active_collection(self, alias):
+        """Physical collection an alias points at; an alias never swapped is its own collection."""
+        entry = self._read_state_cached().get('collections', {}).get(alias, {})
+        return entry.get('active') or alias
+
+    def get_previous_collection(self, alias):
+        return self._read_state_cached().get('collections', {}).get(alias, {}).get('previous')
+
+    def swap_collection(self, alias, collection_name):
+        """Point alias at collection_name, keeping the replaced collection for rollback.
+
+        Returns the collection that dropped out of the rollback slot, or None.
+        """
+        with self._updating():
+            state = self._read_state()
+            entry = state.setdefault('collections', {}).setdefault(alias, {})
+            retired = entry.get('previous')
+            entry['previous'] = entry.get('active') or alias
+            entry['active'] = collection_name
+            self._write_state(state)
+        logger.info(f"Collection alias {alias} now points at {collection_name}")
+        if retired in (collection_name, entry['previous']):
+            return None
+        return retired
+
+    def rollback_collection(self, alias):
+        """Swap alias back to its previous collection. Returns the new active collection, or None."""
+        with self._updating():
+            state = self._read_state()
+            entry = state.setdefault('collections', {}).setdefault(alias, {})
+            previous = entry.get('previous')
+            if not previous:
+                return None
+            entry['previous'] = entry.get('active') or alias
+            entry['active'] = previous
+            self._write_state(state)
+        logger.info(f"Collection alias {alias} rolled back to {previous}")
+        return previous
+
+    def get_delta_cursor(self):
+        """Position in the document source's change feed saved by the last indexing run."""
+        return self._read_state_cached().get('delta_cursor')
+
+    def set_delta_cursor(self, cursor):
+        with self._updating():
+            state = self._read_state()
+            state['delta_cursor'] = cursor
+            self._write_state(state)
@@ -1,11 +1,15 @@
+import asyncio
 import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError, wait
 from langgraph.graph import StateGraph, START, END
 from backend.core.config import config
 from backend.core.embeddings import EmbeddingService
-from backend.services.vector_store import VectorStore
+from backend.services.vector_store import create_vector_store
 from backend.services.response_cache import ResponseCache
+from backend.models.index_state import IndexState
 from backend.retrieval.multi_query_generator import MultiQueryGenerator
 from backend.retrieval.hybrid_retriever import HybridRetriever
+from backend.retrieval.query_filters import normalize_filters
 from backend.reranking.cross_encoder_reranker import CrossEncoderReranker
 from backend.generation.context_builder import ContextBuilder
 from backend.generation.llm_service import LLMService
@@ -26,18 +30,31 @@ SIMPLE_QUERY_PATTERNS = [
 class LangGraphRAGPipeline:
     def __init__(self):
         self.embedding_service = EmbeddingService()
-        self.vector_store = VectorStore()
+        self.vector_store = create_vector_store()
         self.query_generator = MultiQueryGenerator()
         self.hybrid_retriever = HybridRetriever(self.embedding_service, self.vector_store)
         self.reranker = CrossEncoderReranker()
         self.context_builder = ContextBuilder()
         self.llm_service = LLMService()
         self.evaluator = RagasEvaluator()
-        self.response_cache = ResponseCache()
+        self.index_state = IndexState()
+        self.response_cache = ResponseCache(index_state=self.index_state)
         self.max_retries = config.max_retries
         self.hyde_enabled = config.hyde_enabled
+        self.variant_timeout = config.retrieval_variant_timeout_seconds
+        self.rewrite_deadline = config.rewrite_deadline_seconds
+        self.speculative_retrieval = config.speculative_retrieval_enabled
+        self.rewrite_executor = ThreadPoolExecutor(
+            max_workers=max(1, config.rewrite_max_concurrency),
+            thread_name_prefix='rewrite'
+        )
+        self.retrieval_executor = ThreadPoolExecutor(
+            max_workers=max(1, config.retrieval_max_concurrency),
+            thread_name_prefix='retrieval'
+        )
         self.tracer = get_tracer("tryrag.langgraph")
         self.graph = self._build_graph()
+        self.async_graph = self._build_graph(async_nodes=True)
 
     def _trace_span(self, name):
         if self.tracer:
@@ -52,16 +69,38 @@ class LangGraphRAGPipeline:
 
         return DummySpan()
 
-    def _build_graph(self):
+    def _in_thread(self, node):
+        # Executor bridge for nodes whose dependencies (Chroma, BM25, reranker) are synchronous
+        async def run_in_thread(state):
+            return await asyncio.to_thread(node, state)
+        return run_in_thread
+
+    def _build_graph(self, async_nodes=False):
         graph = StateGraph(dict)
 
-        graph.add_node("query_node", self.query_node)
-        graph.add_node("rewrite_node", self.rewrite_node)
-        graph.add_node("retrieve_node", self.retrieve_node)
-        graph.add_node("rerank_node", self.rerank_node)
-        graph.add_node("generate_node", self.generate_node)
-        graph.add_node("evaluate_node", self.evaluate_node)
-        graph.add_node("retry_node", self.retry_node)
+        if async_nodes:
+            nodes = {
+                "query_node": self._in_thread(self.query_node),
+                "rewrite_node": self.arewrite_node,
+                "retrieve_node": self._in_thread(self.retrieve_node),
+                "rerank_node": self._in_thread(self.rerank_node),
+                "generate_node": self.agenerate_node,
+                "evaluate_node": self._in_thread(self.evaluate_node),
+                "retry_node": self.aretry_node,
+            }
+        else:
+            nodes = {
+                "query_node": self.query_node,
+                "rewrite_node": self.rewrite_node,
+                "retrieve_node": self.retrieve_node,
+                "rerank_node": self.rerank_node,
+                "generate_node": self.generate_node,
+                "evaluate_node": self.evaluate_node,
+                "retry_node": self.retry_node,
+            }
+
+        for name, node in nodes.items():
+            graph.add_node(name, node)
 
         # START → query_node
         graph.add_edge(START, "query_node")
@@ -112,9 +151,20 @@ class LangGraphRAGPipeline:
             question = (state.get('question') or '').strip()
             top_k = int(state.get('top_k', 5))
             temperature = float(state.get('temperature', 0.7))
+            filters = state.get('filters')
+
+            # Check cache: exact question first, then semantically similar questions
+            index_generation = self.index_state.get_generation()
+            cached = self.response_cache.get(question, top_k, temperature, filters)
+
+            query_embedding = None
+            if not cached and self.response_cache.semantic is not None and not self._simple_query_reason(question):
+                try:
+                    query_embedding = self.embedding_service.generate_single_embedding(question)
+                    cached = self.response_cache.get_similar(query_embedding, top_k, temperature, filters)
+                except Exception as e:
+                    logger.warning(f"Semantic cache lookup failed: {str(e)}")
 
-            # Check cache
-            cached = self.response_cache.get(question, top_k, temperature)
             if cached:
                 return {
                     **state,
@@ -132,42 +182,160 @@ class LangGraphRAGPipeline:
                 'evaluation': {},
                 'is_simple_query': False,
                 'cached_response': None,
+                'query_embedding': query_embedding,
+                'index_generation': index_generation,
             }
 
     def rewrite_node(self, state):
         with self._trace_span("rewrite_node"):
             question = state.get('question', '')
-            queries = self.query_generator.generate(question)
+            top_k = int(state.get('top_k', 5))
 
+            # Multi-query and HyDE are independent LLM calls, so issue them together
+            multi_query_future = None
+            hyde_future = None
+            if self.query_generator.enabled and self.query_generator.query_count > 1:
+                multi_query_future = self.rewrite_executor.submit(self.query_generator.generate, question)
             if self.hyde_enabled:
+                hyde_future = self.rewrite_executor.submit(self.llm_service.generate_hypothetical_answer, question)
+
+            rewrite_futures = [f for f in (multi_query_future, hyde_future) if f is not None]
+            pending_retrievals = self._start_speculative_retrieval(question, top_k, rewrite_futures, state.get('filters'))
+
+            if rewrite_futures:
+                wait(rewrite_futures, timeout=self.rewrite_deadline)
+
+            return {
+                **state,
+                'queries': self._collect_rewrites(question, multi_query_future, hyde_future),
+                'pending_retrievals': pending_retrievals
+            }
+
+    async def arewrite_node(self, state):
+        with self._trace_span("rewrite_node"):
+            question = state.get('question', '')
+            top_k = int(state.get('top_k', 5))
+
+            multi_query_task = None
+            hyde_task = None
+            if self.query_generator.enabled and self.query_generator.query_count > 1:
+                multi_query_task = asyncio.ensure_future(self.query_generator.agenerate(question))
+            if self.hyde_enabled:
+                hyde_task = asyncio.ensure_future(self.llm_service.agenerate_hypothetical_answer(question))
+
+            rewrite_tasks = [t for t in (multi_query_task, hyde_task) if t is not None]
+            pending_retrievals = self._start_speculative_retrieval(question, top_k, rewrite_tasks, state.get('filters'))
+
+            if rewrite_tasks:
+                await asyncio.wait(rewrite_tasks, timeout=self.rewrite_deadline)
+
+            return {
+                **state,
+                'queries': self._collect_rewrites(question, multi_query_task, hyde_task),
+                'pending_retrievals': pending_retrievals
+            }
+
+    def _start_speculative_retrieval(self, question, top_k, rewrite_futures, filters=None):
+        # Retrieve for the original question while the rewrites are in flight;
+        # retrieve_node merges the result instead of searching it again
+        if not self.speculative_retrieval or not rewrite_futures:
+            return {}
+
+        pool_size = max(top_k, config.hybrid_candidate_pool)
+        return {
+            question: self.retrieval_executor.submit(self.hybrid_retriever.search, question, pool_size, None, filters)
+        }
+
+    def _collect_rewrites(self, question, multi_query_future, hyde_future):
+        # Works for both concurrent.futures.Future and asyncio.Task
+        queries = [question]
+        if multi_query_future is not None:
+            if multi_query_future.done():
+                queries = multi_query_future.result()
+            else:
+                multi_query_future.cancel()
+                logger.warning(f"Multi-query rewrite missed the {self.rewrite_deadline}s deadline, "
+                               f"continuing without it")
+
+        if hyde_future is not None:
+            if hyde_future.done():
                 try:
-                    hyde_query = self.llm_service.generate_hypothetical_answer(question)
+                    hyde_query = hyde_future.result()
                     if hyde_query and hyde_query not in queries:
                         queries.append(hyde_query)
                 except Exception as e:
                     logger.warning(f"HyDE query generation failed: {str(e)}")
+            else:
+                hyde_future.cancel()
+                logger.warning(f"HyDE generation missed the {self.rewrite_deadline}s deadline, "
+                               f"continuing without it")
 
-            return {
-                **state,
-                'queries': queries
-            }
+        return queries
+
+    def _search_variant(self, query, pool_size, vector_future, position, filters=None):
+        # BM25 runs while the batched vector query is in flight
+        keyword_docs = self.hybrid_retriever.search_keywords(query, pool_size, filters)
+        vector_docs = vector_future.result(timeout=self.variant_timeout)[position]
+        return self.hybrid_retriever.fuse(vector_docs, keyword_docs, pool_size)
 
     def retrieve_node(self, state):
         with self._trace_span("retrieve_node"):
             queries = state.get('queries') or [state.get('question', '')]
             top_k = int(state.get('top_k', 5))
+            pool_size = max(top_k, config.hybrid_candidate_pool)
+            pending = state.get('pending_retrievals') or {}
+
+            # One batched embedding request for every variant instead of one per search
+            to_embed = [q for q in queries if q not in pending]
+            embeddings = {}
+            if to_embed:
+                try:
+                    embeddings = dict(zip(
+                        to_embed,
+                        self.embedding_service.generate_embeddings(to_embed, task_type="retrieval_query")
+                    ))
+                except Exception as e:
+                    logger.warning(f"Batched query embedding failed, embedding per variant: {str(e)}")
+
+            # Variants not already searched speculatively share one batched vector store
+            # query; BM25 and fusion still run per variant so each keeps its own timeout
+            filters = state.get('filters')
+            embedded = [q for q in to_embed if embeddings.get(q) is not None]
+            vector_future = None
+            if embedded:
+                vector_future = self.retrieval_executor.submit(
+                    self.hybrid_retriever.search_vectors, embedded, pool_size,
+                    [embeddings[q] for q in embedded], filters
+                )
+
+            futures = dict(pending)
+            for position, q in enumerate(embedded):
+                futures[q] = self.retrieval_executor.submit(
+                    self._search_variant, q, pool_size, vector_future, position, filters
+                )
+            for q in to_embed:
+                if q not in futures:
+                    futures[q] = self.retrieval_executor.submit(
+                        self.hybrid_retriever.search, q, pool_size, None, filters
+                    )
+            deadline = time.monotonic() + self.variant_timeout
 
             candidates = []
             seen_ids = set()
 
+            # Merge in variant order so results don't depend on completion order
             for q in queries:
+                future = futures[q]
                 try:
-                    docs = self.hybrid_retriever.search(q, top_k=max(top_k, config.hybrid_candidate_pool))
+                    docs = future.result(timeout=max(0.0, deadline - time.monotonic()))
                     for doc in docs:
                         doc_id = doc.get('id')
                         if doc_id and doc_id not in seen_ids:
                             seen_ids.add(doc_id)
                             candidates.append(doc)
+                except FutureTimeoutError:
+                    future.cancel()
+                    logger.warning(f"Retrieval timed out after {self.variant_timeout}s for query variant: {q[:60]}")
                 except Exception as e:
                     logger.warning(f"Retrieval failed for query variant: {str(e)}")
 
@@ -178,7 +346,8 @@ class LangGraphRAGPipeline:
 
             return {
                 **state,
-                'retrieved_docs': candidates[:max(top_k, config.hybrid_candidate_pool)]
+                'retrieved_docs': candidates[:pool_size],
+                'pending_retrievals': {}
             }
 
     def rerank_node(self, state):
@@ -192,48 +361,50 @@ class LangGraphRAGPipeline:
                 'reranked_docs': reranked
             }
 
+    def _prepare_generation(self, state):
+        question = state.get('question', '')
+        temperature = float(state.get('temperature', 0.7))
+        is_simple = state.get('is_simple_query', False)
+        docs = state.get('reranked_docs') or state.get('retrieved_docs') or []
+
+        if is_simple:
+            # Simple query: generate without context
+            return question, "No document context is needed. Respond conversationally.", '', temperature
+
+        if not docs:
+            # Fallback: no docs retrieved
+            return (
+                question,
+                "No relevant documents were found in the knowledge base. "
+                "Answer based on general knowledge and clearly state that no "
+                "specific documents were found.",
+                '[fallback: no documents retrieved]',
+                temperature
+            )
+
+        context = self.context_builder.build(docs)
+        return question, context, context, temperature
+
     def generate_node(self, state):
         with self._trace_span("generate_node"):
-            question = state.get('question', '')
-            temperature = float(state.get('temperature', 0.7))
-            is_simple = state.get('is_simple_query', False)
-            docs = state.get('reranked_docs') or state.get('retrieved_docs') or []
-
-            if is_simple:
-                # Simple query: generate without context
-                answer = self.llm_service.generate_answer(
-                    question,
-                    "No document context is needed. Respond conversationally.",
-                    temperature
-                )
-                return {
-                    **state,
-                    'answer': answer,
-                    'context_used': '',
-                }
+            question, context, context_used, temperature = self._prepare_generation(state)
+            answer = self.llm_service.generate_answer(question, context, temperature)
 
-            if not docs:
-                # Fallback: no docs retrieved
-                answer = self.llm_service.generate_answer(
-                    question,
-                    "No relevant documents were found in the knowledge base. "
-                    "Answer based on general knowledge and clearly state that no "
-                    "specific documents were found.",
-                    temperature
-                )
-                return {
-                    **state,
-                    'answer': answer,
-                    'context_used': '[fallback: no documents retrieved]',
-                }
+            return {
+                **state,
+                'answer': answer,
+                'context_used': context_used
+            }
 
-            context = self.context_builder.build(docs)
-            answer = self.llm_service.generate_answer(question, context, temperature)
+    async def agenerate_node(self, state):
+        with self._trace_span("generate_node"):
+            question, context, context_used, temperature = self._prepare_generation(state)
+            answer = await self.llm_service.agenerate_answer(question, context, temperature)
 
             return {
                 **state,
                 'answer': answer,
-                'context_used': context
+                'context_used': context_used
             }
 
     def evaluate_node(self, state):
@@ -264,39 +435,56 @@ class LangGraphRAGPipeline:
             if evaluation.get('passed', False):
                 top_k = int(state.get('top_k', 5))
                 temperature = float(state.get('temperature', 0.7))
+                sources = self._extract_sources(docs)
                 result = {
                     'answer': answer,
-                    'sources': self._extract_sources(docs),
+                    'sources': sources,
                     'context_used': state.get('context_used', ''),
                     'num_sources': len(docs),
                     'evaluation': evaluation,
                     'retry_count': state.get('retry_count', 0),
                     'queries_used': state.get('queries', [])
                 }
-                self.response_cache.put(question, top_k, temperature, result)
+                self.response_cache.put(
+                    question, top_k, temperature, result,
+                    query_embedding=state.get('query_embedding'),
+                    index_generation=state.get('index_generation'),
+                    document_ids=[source['document_id'] for source in sources if source['document_id']],
+                    filters=state.get('filters')
+                )
 
             return {
                 **state,
                 'evaluation': evaluation
             }
 
+    def _plan_retry(self, state):
+        retry_count = int(state.get('retry_count', 0)) + 1
+        top_k = int(state.get('top_k', 5))
+        updated_top_k = min(top_k + 3, max(top_k, config.hybrid_candidate_pool))
+
+        # Exponential backoff: 0.5s, 1s, 2s, ...
+        backoff = 0.5 * (2 ** (retry_count - 1))
+        logger.info(f"Retrying RAG query (attempt {retry_count}/{self.max_retries}), "
+                    f"backoff {backoff:.1f}s, new top_k={updated_top_k}")
+
+        return {
+            **state,
+            'retry_count': retry_count,
+            'top_k': updated_top_k
+        }, backoff
+
     def retry_node(self, state):
         with self._trace_span("retry_node"):
-            retry_count = int(state.get('retry_count', 0)) + 1
-            top_k = int(state.get('top_k', 5))
-            updated_top_k = min(top_k + 3, max(top_k, config.hybrid_candidate_pool))
-
-            # Exponential backoff: 0.5s, 1s, 2s, ...
-            backoff = 0.5 * (2 ** (retry_count - 1))
-            logger.info(f"Retrying RAG query (attempt {retry_count}/{self.max_retries}), "
-                        f"backoff {backoff:.1f}s, new top_k={updated_top_k}")
+            updated_state, backoff = self._plan_retry(state)
             time.sleep(backoff)
+            return updated_state
 
-            return {
-                **state,
-                'retry_count': retry_count,
-                'top_k': updated_top_k
-            }
+    async def aretry_node(self, state):
+        with self._trace_span("retry_node"):
+            updated_state, backoff = self._plan_retry(state)
+            await asyncio.sleep(backoff)
+            return updated_state
 
     # ──────────────── ROUTING ────────────────
 
@@ -306,20 +494,31 @@ class LangGraphRAGPipeline:
             return 'cached'
 
         question = state.get('question', '').lower().strip()
+        reason = self._simple_query_reason(question)
+
+        if reason == 'pattern':
+            logger.info(f"Routing as SIMPLE query: {question[:60]}")
+            return 'simple'
+        if reason == 'short':
+            logger.info(f"Routing as SIMPLE query (short): {question[:60]}")
+            return 'simple'
+
+        logger.info(f"Routing as COMPLEX query: {question[:60]}")
+        return 'complex'
+
+    def _simple_query_reason(self, question):
+        question = question.lower().strip()
 
         # Detect simple/conversational queries
         for pattern in SIMPLE_QUERY_PATTERNS:
             if question == pattern or question.startswith(pattern + ' ') or question.endswith('?') and len(question.split()) <= 4 and pattern in question:
-                logger.info(f"Routing as SIMPLE query: {question[:60]}")
-                return 'simple'
+                return 'pattern'
 
         # Short queries with no document-specific intent
         if len(question.split()) <= 3 and not any(kw in question for kw in ['what', 'how', 'why', 'explain', 'describe', 'compare', 'list', 'find']):
-            logger.info(f"Routing as SIMPLE query (short): {question[:60]}")
-            return 'simple'
+            return 'short'
 
-        logger.info(f"Routing as COMPLEX query: {question[:60]}")
-        return 'complex'
+        return None
 
     def route_after_retrieval(self, state):
         docs = state.get('retrieved_docs', [])
@@ -342,16 +541,100 @@ class LangGraphRAGPipeline:
 
     # ──────────────── RUN ────────────────
 
-    def run(self, question, top_k=5, temperature=0.7):
+    def run(self, question, top_k=5, temperature=0.7, filters=None):
         initial_state = {
             'question': question,
             'top_k': top_k,
             'temperature': temperature,
+            'filters': normalize_filters(filters),
             'retry_count': 0
         }
 
         final_state = self.graph.invoke(initial_state)
+        return self._build_result(final_state)
+
+    async def arun(self, question, top_k=5, temperature=0.7, filters=None):
+        initial_state = {
+            'question': question,
+            'top_k': top_k,
+            'temperature': temperature,
+            'filters': normalize_filters(filters),
+            'retry_count': 0
+        }
+
+        final_state = await self.async_graph.ainvoke(initial_state)
+        return self._build_result(final_state)
+
+    async def astream(self, question, top_k=5, temperature=0.7, filters=None):
+        """Run the pipeline node by node, yielding (event, data) pairs as results become available.
+
+        Answer tokens are streamed as Gemini produces them, so the evaluate/retry
+        loop cannot rewrite an answer the client has already seen: evaluation is
+        reported as a trailing event instead.
+        """
+        state = await asyncio.to_thread(self.query_node, {
+            'question': question,
+            'top_k': top_k,
+            'temperature': temperature,
+            'filters': normalize_filters(filters),
+            'retry_count': 0
+        })
+
+        cached = state.get('cached_response')
+        if cached:
+            yield 'status', {'stage': 'cached'}
+            yield 'sources', cached.get('sources', [])
+            yield 'token', {'text': cached.get('answer', '')}
+            yield 'evaluation', cached.get('evaluation', {})
+            yield 'done', {
+                'num_sources': cached.get('num_sources', 0),
+                'queries_used': cached.get('queries_used', []),
+                'retry_count': cached.get('retry_count', 0),
+                'from_cache': True,
+            }
+            return
+
+        if self.route_query(state) == 'complex':
+            yield 'status', {'stage': 'rewrite'}
+            state = await self.arewrite_node(state)
+            yield 'queries', state.get('queries', [])
+
+            yield 'status', {'stage': 'retrieve'}
+            state = await asyncio.to_thread(self.retrieve_node, state)
+
+            if self.route_after_retrieval(state) == 'has_docs':
+                yield 'status', {'stage': 'rerank'}
+                state = await asyncio.to_thread(self.rerank_node, state)
+
+        docs = state.get('reranked_docs') or state.get('retrieved_docs') or []
+        yield 'sources', self._extract_sources(docs)
+
+        yield 'status', {'stage': 'generate'}
+        with self._trace_span("generate_node"):
+            question, context, context_used, temperature = self._prepare_generation(state)
+            answer_parts = []
+            async for text in self.llm_service.astream_answer(question, context, temperature):
+                answer_parts.append(text)
+                yield 'token', {'text': text}
+
+        state = {
+            **state,
+            'answer': ''.join(answer_parts),
+            'context_used': context_used
+        }
+
+        yield 'status', {'stage': 'evaluate'}
+        state = await asyncio.to_thread(self.evaluate_node, state)
+        yield 'evaluation', state.get('evaluation', {})
+
+        yield 'done', {
+            'num_sources': len(docs),
+            'queries_used': state.get('queries', []),
+            'retry_count': 0,
+            'from_cache': False,
+        }
 
+    def _build_result(self, final_state):
         # If cached, return cached response directly
         cached = final_state.get('cached_response')
         if cached:
@@ -1,3 +1,4 @@
 from backend.retrieval.multi_query_generator import MultiQueryGenerator
 from backend.retrieval.keyword_retriever import KeywordRetriever
 from backend.retrieval.hybrid_retriever import HybridRetriever
+from backend.retrieval.bm25_index import BM25Index
@@ -0,0 +1,472 @@
+import math
+import os
+import pickle
+import re
+import threading
+from array import array
+from contextlib import contextmanager
+from pathlib import Path
+import numpy as np
+from backend.core.config import config
+from backend.core.file_lock import file_lock
+from backend.core.logger import setup_logger
+from backend.retrieval.query_filters import document_matches, filters_key
+
+logger = setup_logger(__name__)
+
+# 2: per-document filter fields
+INDEX_FORMAT_VERSION = 2
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def tokenize(text):
+    return re.findall(r"[a-zA-Z0-9]+", (text or "").lower())
+
+
+class BM25Index:
+    """Persistent inverted index with Okapi BM25 scoring.
+
+    Chunks are addressed by dense integer ordinals. Each term keeps two
+    parallel arrays (ordinals, term frequencies) in ascending ordinal order, so
+    appends stay sorted and a query only touches the postings of its own terms.
+    Deletes are tombstones that are purged when the index is compacted on save.
+
+    Each document's path, author and modification time are kept so queries can
+    be scoped; a filter becomes a boolean mask over ordinals, built from cached
+    per-field masks and dropped whenever the index changes.
+
+    Writers mutate the index inside writing(), which holds a cross-process lock
+    from reload to save, so concurrent writers never save over each other.
+    """
+
+    def __init__(self, index_path, k1=1.5, b=0.75, compaction_ratio=0.25):
+        self.index_path = Path(index_path)
+        self.k1 = k1
+        self.b = b
+        self.compaction_ratio = compaction_ratio
+        self._lock = threading.RLock()
+        self._writer = None
+        self._loaded_mtime = None
+        self._reset()
+        self._load()
+
+    def _reset(self):
+        self._chunk_ids = []
+        self._ordinals = {}
+        self._doc_lengths = array('I')
+        self._deleted = bytearray()
+        self._live_mask = None
+        self._document_chunks = {}
+        self._document_fields = {}
+        self._filter_masks = {}
+        self._postings = {}
+        self._live_count = 0
+        self._live_length = 0
+        self._dirty = False
+        self._unreadable = False
+
+    # ──────────────── PERSISTENCE ────────────────
+
+    def exists(self):
+        return self.index_path.exists()
+
+    def _load(self):
+        if not self.index_path.exists():
+            return
+
+        mtime = None
+        try:
+            mtime = self.index_path.stat().st_mtime_ns
+            with open(self.index_path, 'rb') as f:
+                data = pickle.load(f)
+
+            if data.get('version') != INDEX_FORMAT_VERSION:
+                raise ValueError(f"unsupported version {data.get('version')}")
+
+            self._reset()
+            self._chunk_ids = data['chunk_ids']
+            self._doc_lengths = data['doc_lengths']
+            self._deleted = data['deleted']
+            self._document_chunks = data['document_chunks']
+            self._document_fields = data['document_fields']
+            self._postings = data['postings']
+            self._ordinals = {
+                chunk_id: ordinal
+                for ordinal, chunk_id in enumerate(self._chunk_ids)
+                if not self._deleted[ordinal]
+            }
+            self._live_count = len(self._ordinals)
+            self._live_length = sum(self._doc_lengths[ordinal] for ordinal in self._ordinals.values())
+            self._loaded_mtime = mtime
+
+            logger.info(f"Loaded keyword index with {self._live_count} chunks and "
+                        f"{len(self._postings)} terms from {self.index_path}")
+        except Exception as e:
+            # Treated like a missing file: ensure_built rebuilds it from the vector store,
+            # and the same file is not read again on every query
+            logger.error(f"Failed to load keyword index, it will be rebuilt: {str(e)}")
+            self._reset()
+            self._unreadable = True
+            self._loaded_mtime = mtime
+
+    def reload_if_changed(self):
+        """Pick up an index saved by another process (e.g. the indexing cron)."""
+        try:
+            mtime = self.index_path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return
+
+        with self._lock:
+            if mtime != self._loaded_mtime and not self._dirty:
+                self._load()
+
+    @contextmanager
+    def writing(self):
+        """Lock the index file across processes, load the latest saved copy, and save on exit.
+
+        Re-entrant for the thread that holds it; mutations made by other threads
+        while it is held (e.g. the indexing pipeline's writer) are saved with it.
+        """
+        if self._writer == threading.get_ident():
+            yield self
+            return
+
+        with file_lock(self.index_path):
+            self._writer = threading.get_ident()
+            try:
+                with self._lock:
+                    self._reload_for_write()
+                yield self
+                self.save()
+            finally:
+                self._writer = None
+
+    def _reload_for_write(self):
+        try:
+            mtime = self.index_path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return
+        if mtime == self._loaded_mtime:
+            return
+        if self._dirty:
+            logger.warning(f"Discarding unsaved keyword index changes, {self.index_path} was saved elsewhere")
+        self._load()
+
+    def save(self):
+        with self._lock:
+            if not self._dirty and self.index_path.exists():
+                return
+
+            if len(self._chunk_ids) and (len(self._chunk_ids) - self._live_count) > self.compaction_ratio * len(self._chunk_ids):
+                self._compact()
+
+            data = {
+                'version': INDEX_FORMAT_VERSION,
+                'chunk_ids': self._chunk_ids,
+                'doc_lengths': self._doc_lengths,
+                'deleted': self._deleted,
+                'document_chunks': self._document_chunks,
+                'document_fields': self._document_fields,
+                'postings': self._postings,
+            }
+
+            try:
+                self.index_path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = self.index_path.with_suffix(self.index_path.suffix + '.tmp')
+                with open(tmp_path, 'wb') as f:
+                    pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp_path, self.index_path)
+                self._loaded_mtime = self.index_path.stat().st_mtime_ns
+                self._dirty = False
+                logger.info(f"Saved keyword index ({self._live_count} chunks) to {self.index_path}")
+            except Exception as e:
+                logger.error(f"Failed to save keyword index: {str(e)}")
+                raise
+
+    def _live(self):
+        # Boolean mask of live ordinals, rebuilt only after the tombstones change
+        if self._live_mask is None:
+            self._live_mask = np.frombuffer(self._deleted, dtype=np.uint8) == 0
+        return self._live_mask
+
+    def _compact(self):
+        live = self._live()
+        remap = np.cumsum(live, dtype=np.int64) - 1
+
+        postings = {}
+        for term, (ordinals, tfs) in self._postings.items():
+            ords = np.frombuffer(ordinals, dtype=np.uint32)
+            keep = live[ords]
+            if not keep.any():
+                continue
+            postings[term] = (
+                array('I', remap[ords[keep]].astype(np.uint32).tobytes()),
+                array('I', np.frombuffer(tfs, dtype=np.uint32)[keep].tobytes()),
+            )
+
+        self._chunk_ids = [chunk_id for ordinal, chunk_id in enumerate(self._chunk_ids) if live[ordinal]]
+        self._doc_lengths = array('I', np.frombuffer(self._doc_lengths, dtype=np.uint32)[live].tobytes())
+        self._deleted = bytearray(len(self._chunk_ids))
+        self._live_mask = None
+        self._document_chunks = {
+            document_id: [int(remap[ordinal]) for ordinal in ordinals if live[ordinal]]
+            for document_id, ordinals in self._document_chunks.items()
+        }
+        self._postings = postings
+        self._ordinals = {chunk_id: ordinal for ordinal, chunk_id in enumerate(self._chunk_ids)}
+        self._filter_masks = {}
+        logger.info(f"Compacted keyword index to {len(self._chunk_ids)} chunks")
+
+    # ──────────────── MUTATION ────────────────
+
+    def add_chunks(self, chunk_ids, chunks):
+        if len(chunk_ids) != len(chunks):
+            raise ValueError("Number of chunk IDs must match number of chunks")
+
+        with self._lock:
+            for chunk_id, chunk in zip(chunk_ids, chunks):
+                if chunk_id in self._ordinals:
+                    self._delete_ordinal(self._ordinals[chunk_id])
+
+                tokens = tokenize(chunk.get('text', ''))
+                ordinal = len(self._chunk_ids)
+                self._chunk_ids.append(chunk_id)
+                self._ordinals[chunk_id] = ordinal
+                self._doc_lengths.append(len(tokens))
+                self._deleted.append(0)
+
+                metadata = chunk.get('metadata', {})
+                document_id = metadata.get('document_id')
+                if document_id:
+                    self._document_chunks.setdefault(document_id, []).append(ordinal)
+                    self._document_fields[document_id] = self._fields(metadata)
+
+                term_counts = {}
+                for token in tokens:
+                    term_counts[token] = term_counts.get(token, 0) + 1
+                for term, tf in term_counts.items():
+                    postings = self._postings.get(term)
+                    if postings is None:
+                        postings = (array('I'), array('I'))
+                        self._postings[term] = postings
+                    postings[0].append(ordinal)
+                    postings[1].append(tf)
+
+                self._live_count += 1
+                self._live_length += len(tokens)
+
+            self._live_mask = None
+            self._filter_masks = {}
+            self._dirty = True
+
+    def update_document_fields(self, chunks):
+        """Refresh the filter fields of indexed documents from their chunks' current metadata."""
+        with self._lock:
+            changed = False
+            for chunk in chunks:
+                metadata = chunk.get('metadata', {})
+                document_id = metadata.get('document_id')
+                if document_id in self._document_chunks:
+                    fields = self._fields(metadata)
+                    if self._document_fields.get(document_id) != fields:
+                        self._document_fields[document_id] = fields
+                        changed = True
+            if changed:
+                self._filter_masks = {}
+                self._dirty = True
+
+    @staticmethod
+    def _fields(metadata):
+        # Only the numeric modified_ts, the same field the vector store filters on
+        return metadata.get('document_path', ''), metadata.get('author'), metadata.get('modified_ts')
+
+    def _delete_ordinal(self, ordinal):
+        if self._deleted[ordinal]:
+            return
+        self._deleted[ordinal] = 1
+        self._live_mask = None
+        self._ordinals.pop(self._chunk_ids[ordinal], None)
+        self._live_count -= 1
+        self._live_length -= self._doc_lengths[ordinal]
+
+    def remove_document(self, document_id):
+        with self._lock:
+            ordinals = self._document_chunks.pop(document_id, [])
+            self._document_fields.pop(document_id, None)
+            for ordinal in ordinals:
+                self._delete_ordinal(ordinal)
+            if ordinals:
+                self._filter_masks = {}
+                self._dirty = True
+            return len(ordinals)
+
+    def remove_chunks(self, chunk_ids, document_id=None):
+        with self._lock:
+            removed = set()
+            for chunk_id in chunk_ids:
+                ordinal = self._ordinals.get(chunk_id)
+                if ordinal is not None:
+                    self._delete_ordinal(ordinal)
+                    removed.add(ordinal)
+            if removed:
+                document_ids = [document_id] if document_id is not None else list(self._document_chunks)
+                for document_id in document_ids:
+                    ordinals = self._document_chunks.get(document_id, [])
+                    kept = [ordinal for ordinal in ordinals if ordinal not in removed]
+                    if len(kept) != len(ordinals):
+                        if kept:
+                            self._document_chunks[document_id] = kept
+                        else:
+                            del self._document_chunks[document_id]
+                            self._document_fields.pop(document_id, None)
+                self._filter_masks = {}
+                self._dirty = True
+            return len(removed)
+
+    def clear(self):
+        with self._lock:
+            self._reset()
+            self._dirty = True
+
+    def ensure_built(self, load_chunks):
+        """Build from the vector store once if no readable persisted index exists yet."""
+        if self.index_path.exists():
+            self.reload_if_changed()
+            if not self._unreadable:
+                return
+
+        with self.writing():
+            if self.index_path.exists() and not self._unreadable:
+                return
+            chunks = load_chunks()
+            logger.info(f"Keyword index missing or unreadable, building from {len(chunks)} stored chunks")
+            self.rebuild(chunks)
+
+    def rebuild(self, chunks):
+        with self._lock:
+            self._reset()
+            self.add_chunks([chunk.get('id', '') for chunk in chunks], chunks)
+            self._dirty = True
+            self.save()
+        logger.info(f"Rebuilt keyword index from {len(chunks)} chunks")
+
+    # ──────────────── QUERY ────────────────
+
+    def matching_documents(self, filters):
+        """IDs of the indexed documents that satisfy normalized /query filters."""
+        with self._lock:
+            return {
+                document_id
+                for document_id, (path, author, modified_ts) in self._document_fields.items()
+                if document_matches(filters, document_id, path, author, modified_ts)
+            }
+
+    def _filter_mask(self, filters):
+        key = filters_key(filters)
+        mask = self._filter_masks.get(key)
+        if mask is not None:
+            return mask
+
+        # Each field's mask is cached on its own, so scopes sharing a field reuse it
+        mask = np.ones(len(self._chunk_ids), dtype=bool)
+        for field, value in filters.items():
+            field_key = filters_key({field: value})
+            field_mask = self._filter_masks.get(field_key)
+            if field_mask is None:
+                field_mask = np.zeros(len(self._chunk_ids), dtype=bool)
+                for document_id in self.matching_documents({field: value}):
+                    field_mask[self._document_chunks.get(document_id, [])] = True
+                self._filter_masks[field_key] = field_mask
+            mask &= field_mask
+
+        if len(self._filter_masks) > 256:
+            self._filter_masks = {}
+        self._filter_masks[key] = mask
+        return mask
+
+    def search(self, query, top_k=10, filters=None):
+        query_tokens = tokenize(query)
+
+        with self._lock:
+            if not query_tokens or not self._live_count:
+                return []
+
+            allowed = self._filter_mask(filters) if filters else None
+
+            live_mask = self._live()
+            doc_lengths = np.frombuffer(self._doc_lengths, dtype=np.uint32)
+            avgdl = self._live_length / self._live_count if self._live_count else 1.0
+            avgdl = avgdl or 1.0
+
+            all_ordinals = []
+            all_scores = []
+            for term in query_tokens:
+                postings = self._postings.get(term)
+                if postings is None:
+                    continue
+
+                ordinals = np.frombuffer(postings[0], dtype=np.uint32)
+                tfs = np.frombuffer(postings[1], dtype=np.uint32).astype(np.float64)
+                live = live_mask[ordinals]
+                if allowed is not None:
+                    live &= allowed[ordinals]
+                ordinals = ordinals[live]
+                if not len(ordinals):
+                    continue
+                tfs = tfs[live]
+
+                df = len(ordinals)
+                idf = math.log((self._live_count - df + 0.5) / (df + 0.5) + 1.0)
+                norm = self.k1 * (1.0 - self.b + self.b * doc_lengths[ordinals] / avgdl)
+                all_ordinals.append(ordinals)
+                all_scores.append(idf * tfs * (self.k1 + 1.0) / (tfs + norm))
+
+            if not all_ordinals:
+                return []
+
+            unique_ordinals, inverse = np.unique(np.concatenate(all_ordinals), return_inverse=True)
+            scores = np.bincount(inverse, weights=np.concatenate(all_scores))
+
+            if len(scores) > top_k:
+                top = np.argpartition(-scores, top_k)[:top_k]
+            else:
+                top = np.arange(len(scores))
+            top = top[np.argsort(-scores[top], kind='stable')]
+
+            return [(self._chunk_ids[int(unique_ordinals[i])], float(scores[i])) for i in top]
+
+    def stats(self):
+        with self._lock:
+            return {
+                'chunks': self._live_count,
+                'terms': len(self._postings),
+                'documents': len(self._document_chunks),
+                'tombstones': len(self._chunk_ids) - self._live_count,
+                'path': str(self.index_path),
+            }
+
+    def __len__(self):
+        return self._live_count
+
+
+def get_bm25_index(collection_name=None):
+    """Return the process-wide keyword index for a collection, loading it on first use."""
+    collection_name = collection_name or config.collection_name
+    with _indexes_lock:
+        index = _indexes.get(collection_name)
+        if index is None:
+            index_path = Path(config.keyword_index_dir) / f"bm25_{collection_name}.pkl"
+            index = BM25Index(index_path, k1=config.bm25_k1, b=config.bm25_b)
+            _indexes[collection_name] = index
+        return index
+
+
+def drop_bm25_index(collection_name):
+    """Forget a collection's keyword index and delete its file."""
+    with _indexes_lock:
+        index = _indexes.pop(collection_name, None)
+    index_path = index.index_path if index else Path(config.keyword_index_dir) / f"bm25_{collection_name}.pkl"
+    index_path.unlink(missing_ok=True)
+    Path(f"{index_path}.lock").unlink(missing_ok=True)
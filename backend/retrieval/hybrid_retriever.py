@@ -1,6 +1,7 @@
 from backend.core.config import config
 from backend.core.logger import setup_logger
 from backend.retrieval.keyword_retriever import KeywordRetriever
+from backend.retrieval.query_filters import build_where
 
 logger = setup_logger(__name__)
 
@@ -25,14 +26,66 @@ class HybridRetriever:
             return {k: 1.0 for k in score_map}
         return {k: (v - min_score) / (max_score - min_score) for k, v in score_map.items()}
 
-    def search(self, query, top_k=5):
-        query_embedding = self.embedding_service.generate_single_embedding(query)
-        vector_docs = self.vector_store.search(query_embedding, top_k=max(top_k, self.candidate_pool))
+    def search(self, query, top_k=5, query_embedding=None, filters=None):
+        return self.search_many([query], top_k, [query_embedding], filters)[0]
 
+    def _where(self, filters):
+        """Vector store `where` for normalized filters; False when no document can match."""
+        if not filters:
+            return None
+        if 'path_prefix' not in filters:
+            return build_where(filters)
+
+        # Chroma cannot match path prefixes, so resolve every filter to document IDs
+        # from the keyword index's per-document fields
+        index = self.keyword_retriever.index
+        index.ensure_built(self.vector_store.get_all_chunks)
+        document_ids = index.matching_documents(filters)
+        return build_where(filters, document_ids) if document_ids else False
+
+    def search_vectors(self, queries, top_k=5, query_embeddings=None, filters=None):
+        """Vector candidates for several query variants with one batched vector store query.
+
+        Returns one candidate list (of the hybrid pool size) per query.
+        """
+        if not queries:
+            return []
+
+        where = self._where(filters)
+        if where is False:
+            logger.info(f"No indexed document matches filters {filters}")
+            return [[] for _ in queries]
+
+        query_embeddings = list(query_embeddings or [None] * len(queries))
+        for position, query in enumerate(queries):
+            if query_embeddings[position] is None:
+                query_embeddings[position] = self.embedding_service.generate_single_embedding(query)
+
+        pool_size = max(top_k, self.candidate_pool)
+        return self.vector_store.search_many(query_embeddings, top_k=pool_size, filter_metadata=where)
+
+    def search_keywords(self, query, top_k=5, filters=None):
+        """BM25 candidates for one query variant; empty when hybrid search is off."""
         if not self.enabled:
-            return vector_docs[:top_k]
+            return []
+        return self.keyword_retriever.search(query, top_k=max(top_k, self.candidate_pool), filters=filters)
+
+    def search_many(self, queries, top_k=5, query_embeddings=None, filters=None):
+        """Hybrid search for several query variants with one batched vector store query.
 
-        keyword_docs = self.keyword_retriever.search(query, top_k=max(top_k, self.candidate_pool))
+        `filters` (see query_filters.normalize_filters) scope both the vector and
+        the keyword search.
+        """
+        vector_results = self.search_vectors(queries, top_k, query_embeddings, filters)
+        return [
+            self.fuse(vector_docs, self.search_keywords(query, top_k, filters), top_k)
+            for query, vector_docs in zip(queries, vector_results)
+        ]
+
+    def fuse(self, vector_docs, keyword_docs, top_k=5):
+        """Blend one variant's vector and BM25 candidates into its top_k results."""
+        if not self.enabled:
+            return vector_docs[:top_k]
 
         vector_score_map = {}
         vector_doc_map = {}
@@ -1,41 +1,40 @@
-import re
-from rank_bm25 import BM25Okapi
+from backend.retrieval.bm25_index import get_bm25_index
 from backend.core.logger import setup_logger
 
 logger = setup_logger(__name__)
 
 
 class KeywordRetriever:
-    def __init__(self, vector_store):
+    def __init__(self, vector_store, index=None):
         self.vector_store = vector_store
+        self._index = index
 
-    def _tokenize(self, text):
-        return re.findall(r"[a-zA-Z0-9]+", (text or "").lower())
+    @property
+    def index(self):
+        # Resolved per query so a collection swap also switches the keyword index
+        return self._index or get_bm25_index(self.vector_store.collection_name)
 
-    def search(self, query, top_k=10):
-        chunks = self.vector_store.get_all_chunks()
-        if not chunks:
-            return []
+    def search(self, query, top_k=10, filters=None):
+        # One-off bootstrap for collections indexed before the keyword index existed
+        index = self.index
+        index.ensure_built(self.vector_store.get_all_chunks)
 
-        corpus_tokens = [self._tokenize(item.get('text', '')) for item in chunks]
-        if not any(corpus_tokens):
+        scored = index.search(query, top_k=top_k, filters=filters)
+        if not scored:
             return []
 
-        bm25 = BM25Okapi(corpus_tokens)
-        query_tokens = self._tokenize(query)
-        scores = bm25.get_scores(query_tokens)
-
-        indexed_scores = list(enumerate(scores))
-        indexed_scores.sort(key=lambda x: x[1], reverse=True)
+        chunks = self.vector_store.get_chunks([chunk_id for chunk_id, _ in scored])
 
         results = []
-        for idx, score in indexed_scores[:top_k]:
-            chunk = chunks[idx]
+        for chunk_id, score in scored:
+            chunk = chunks.get(chunk_id)
+            if not chunk:
+                continue
             results.append({
-                'id': chunk.get('id', ''),
+                'id': chunk_id,
                 'text': chunk.get('text', ''),
                 'metadata': chunk.get('metadata', {}),
-                'keyword_score': float(score)
+                'keyword_score': score
             })
 
         logger.debug(f"Keyword retriever returned {len(results)} results")
@@ -12,11 +12,8 @@ class MultiQueryGenerator:
         self.query_count = config.multi_query_count
         self.model = genai.GenerativeModel(config.llm_model)
 
-    def generate(self, question):
-        if not self.enabled or self.query_count <= 1:
-            return [question]
-
-        prompt = f"""You generate retrieval rewrites for a RAG system.
+    def _build_prompt(self, question):
+        return f"""You generate retrieval rewrites for a RAG system.
 
 Return exactly {self.query_count} alternative search queries that preserve user intent and improve recall.
 Each query must be on its own line and avoid numbering.
@@ -24,26 +21,44 @@ Each query must be on its own line and avoid numbering.
 User question: {question}
 """
 
+    def _parse_queries(self, question, response_text):
+        text = (response_text or "").strip()
+        candidates = [line.strip(" -\t") for line in text.splitlines() if line.strip()]
+
+        unique_queries = []
+        seen = set()
+        for candidate in [question] + candidates:
+            normalized = candidate.lower().strip()
+            if normalized and normalized not in seen:
+                seen.add(normalized)
+                unique_queries.append(candidate.strip())
+            if len(unique_queries) >= self.query_count:
+                break
+
+        if question not in unique_queries:
+            unique_queries.insert(0, question)
+
+        logger.debug(f"Generated {len(unique_queries)} retrieval queries")
+        return unique_queries
+
+    def generate(self, question):
+        if not self.enabled or self.query_count <= 1:
+            return [question]
+
+        try:
+            response = self.model.generate_content(self._build_prompt(question))
+            return self._parse_queries(question, response.text)
+        except Exception as e:
+            logger.warning(f"Multi-query generation failed, falling back to single query: {str(e)}")
+            return [question]
+
+    async def agenerate(self, question):
+        if not self.enabled or self.query_count <= 1:
+            return [question]
+
         try:
-            response = self.model.generate_content(prompt)
-            text = (response.text or "").strip()
-            candidates = [line.strip(" -\t") for line in text.splitlines() if line.strip()]
-
-            unique_queries = []
-            seen = set()
-            for candidate in [question] + candidates:
-                normalized = candidate.lower().strip()
-                if normalized and normalized not in seen:
-                    seen.add(normalized)
-                    unique_queries.append(candidate.strip())
-                if len(unique_queries) >= self.query_count:
-                    break
-
-            if question not in unique_queries:
-                unique_queries.insert(0, question)
-
-            logger.debug(f"Generated {len(unique_queries)} retrieval queries")
-            return unique_queries
+            response = await self.model.generate_content_async(self._build_prompt(question))
+            return self._parse_queries(question, response.text)
         except Exception as e:
             logger.warning(f"Multi-query generation failed, falling back to single query: {str(e)}")
             return [question]
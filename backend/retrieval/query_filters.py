@@ -0,0 +1,89 @@
+import json
+from datetime import datetime, timezone
+
+
+def to_timestamp(value):
+    """Epoch seconds for a datetime, ISO 8601 string or number."""
+    if value is None or value == '':
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp())
+
+
+def normalize_path(path):
+    return (path or '').strip().strip('/')
+
+
+def normalize_filters(filters):
+    """Canonical form of the /query filters, or None when nothing is filtered.
+
+    Accepts document_ids, path_prefix, modified_after, modified_before and
+    author; dates become epoch seconds so they compare as numbers everywhere.
+    """
+    if not filters:
+        return None
+
+    normalized = {}
+    if filters.get('document_ids'):
+        normalized['document_ids'] = sorted(set(filters['document_ids']))
+    if normalize_path(filters.get('path_prefix')):
+        normalized['path_prefix'] = normalize_path(filters['path_prefix'])
+    for field in ('modified_after', 'modified_before'):
+        timestamp = to_timestamp(filters.get(field))
+        if timestamp is not None:
+            normalized[field] = timestamp
+    if filters.get('author'):
+        normalized['author'] = filters['author']
+    return normalized or None
+
+
+def filters_key(filters):
+    return json.dumps(filters, sort_keys=True, separators=(',', ':')) if filters else ''
+
+
+def document_matches(filters, document_id, path, author, modified_ts):
+    """Whether one document's fields satisfy every filter."""
+    if 'document_ids' in filters and document_id not in filters['document_ids']:
+        return False
+    if 'path_prefix' in filters:
+        prefix, path = filters['path_prefix'], normalize_path(path)
+        if path != prefix and not path.startswith(f"{prefix}/"):
+            return False
+    if 'author' in filters and author != filters['author']:
+        return False
+    if 'modified_after' in filters and (modified_ts is None or modified_ts < filters['modified_after']):
+        return False
+    if 'modified_before' in filters and (modified_ts is None or modified_ts > filters['modified_before']):
+        return False
+    return True
+
+
+def build_where(filters, document_ids=None):
+    """Vector store `where` clause for normalized filters.
+
+    Chroma has no prefix operator, so a path prefix has to be resolved to
+    `document_ids` by the caller first (see BM25Index.matching_documents).
+    """
+    if not filters:
+        return None
+
+    conditions = []
+    if document_ids is not None:
+        conditions.append({'document_id': {'$in': sorted(document_ids)}})
+    elif 'document_ids' in filters:
+        conditions.append({'document_id': {'$in': filters['document_ids']}})
+    if 'author' in filters:
+        conditions.append({'author': filters['author']})
+    if 'modified_after' in filters:
+        conditions.append({'modified_ts': {'$gte': filters['modified_after']}})
+    if 'modified_before' in filters:
+        conditions.append({'modified_ts': {'$lte': filters['modified_before']}})
+
+    if not conditions:
+        return None
+    return conditions[0] if len(conditions) == 1 else {'$and': conditions}
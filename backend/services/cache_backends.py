@@ -0,0 +1,316 @@
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from backend.core.config import config
+from backend.core.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+class CacheBackend:
+    """Storage for response cache entries with TTL expiry and LRU eviction.
+
+    Entries are JSON-serialisable dicts. Eviction removes least recently used
+    entries until both the entry-count and the byte-size bounds hold.
+    """
+
+    name = 'base'
+
+    def __init__(self, ttl_seconds, max_entries, max_bytes):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+
+    def _encode(self, entry):
+        return json.dumps(entry, separators=(',', ':')).encode('utf-8')
+
+    def _decode(self, payload):
+        return json.loads(payload)
+
+    def get(self, key):
+        raise NotImplementedError
+
+    def set(self, key, entry):
+        raise NotImplementedError
+
+    def delete(self, key):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+    def stats(self):
+        raise NotImplementedError
+
+
+class MemoryCacheBackend(CacheBackend):
+    """Per-process OrderedDict store; invalidation does not reach other workers."""
+
+    name = 'memory'
+
+    def __init__(self, ttl_seconds, max_entries, max_bytes):
+        super().__init__(ttl_seconds, max_entries, max_bytes)
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            stored_at, size, entry = item
+            if time.time() - stored_at >= self.ttl_seconds:
+                self._remove_locked(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key, entry):
+        size = len(self._encode(entry))
+        with self._lock:
+            self._remove_locked(key)
+            self._entries[key] = (time.time(), size, entry)
+            self._bytes += size
+            while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                evicted_key = next(iter(self._entries))
+                self._remove_locked(evicted_key)
+
+    def _remove_locked(self, key):
+        item = self._entries.pop(key, None)
+        if item is not None:
+            self._bytes -= item[1]
+
+    def delete(self, key):
+        with self._lock:
+            self._remove_locked(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                'backend': self.name,
+                'size': len(self._entries),
+                'bytes': self._bytes,
+                'max_size': self.max_entries,
+                'max_bytes': self.max_bytes,
+            }
+
+
+class SQLiteCacheBackend(CacheBackend):
+    """Shared on-disk store in WAL mode, so every uvicorn worker on a host sees the same entries."""
+
+    name = 'sqlite'
+
+    def __init__(self, ttl_seconds, max_entries, max_bytes, db_path):
+        super().__init__(ttl_seconds, max_entries, max_bytes)
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS response_cache ("
+            "key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL, "
+            "stored_at REAL NOT NULL, last_access REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_response_cache_last_access ON response_cache(last_access)")
+        self._conn.commit()
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, stored_at FROM response_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            payload, stored_at = row
+            if now - stored_at >= self.ttl_seconds:
+                self._conn.execute("DELETE FROM response_cache WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            self._conn.execute("UPDATE response_cache SET last_access = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+        return self._decode(payload)
+
+    def set(self, key, entry):
+        payload = self._encode(entry)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO response_cache (key, value, size, stored_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, payload, len(payload), now, now)
+            )
+            self._conn.execute("DELETE FROM response_cache WHERE stored_at <= ?", (now - self.ttl_seconds,))
+            self._enforce_bounds_locked()
+            self._conn.commit()
+
+    def _enforce_bounds_locked(self):
+        count, total_bytes = self._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM response_cache"
+        ).fetchone()
+        while count > self.max_entries or total_bytes > self.max_bytes:
+            row = self._conn.execute(
+                "SELECT key, size FROM response_cache ORDER BY last_access ASC LIMIT 1"
+            ).fetchone()
+            if row is None:
+                break
+            self._conn.execute("DELETE FROM response_cache WHERE key = ?", (row[0],))
+            count -= 1
+            total_bytes -= row[1]
+
+    def delete(self, key):
+        with self._lock:
+            self._conn.execute("DELETE FROM response_cache WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM response_cache")
+            self._conn.commit()
+
+    def stats(self):
+        with self._lock:
+            count, total_bytes = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM response_cache"
+            ).fetchone()
+        return {
+            'backend': self.name,
+            'size': count,
+            'bytes': total_bytes,
+            'max_size': self.max_entries,
+            'max_bytes': self.max_bytes,
+            'path': str(self.db_path),
+        }
+
+
+class RedisCacheBackend(CacheBackend):
+    """Store shared across hosts, speaking the Redis protocol.
+
+    Each entry is a string key with a native TTL; a sorted set orders keys by last
+    access for LRU eviction and a hash tracks entry sizes for the byte bound.
+    Any client exposing the redis-py API (or a RESP-compatible stand-in server)
+    can be injected.
+    """
+
+    name = 'redis'
+
+    def __init__(self, ttl_seconds, max_entries, max_bytes, url=None, prefix='tryrag:cache:', client=None):
+        super().__init__(ttl_seconds, max_entries, max_bytes)
+        if client is None:
+            import redis
+            client = redis.Redis.from_url(url)
+        # redis-py connects lazily; fail here so create_cache_backend can fall back
+        client.ping()
+        self.client = client
+        self.prefix = prefix
+        self._lru_key = f"{prefix}lru"
+        self._sizes_key = f"{prefix}sizes"
+
+    def _entry_key(self, key):
+        return f"{self.prefix}entry:{key}"
+
+    def get(self, key):
+        payload = self.client.get(self._entry_key(key))
+        if payload is None:
+            # Expired via TTL: drop the bookkeeping so it stops counting against the bounds
+            pipe = self.client.pipeline()
+            pipe.zrem(self._lru_key, key)
+            pipe.hdel(self._sizes_key, key)
+            pipe.execute()
+            return None
+        self.client.zadd(self._lru_key, {key: time.time()})
+        return self._decode(payload)
+
+    def set(self, key, entry):
+        payload = self._encode(entry)
+        pipe = self.client.pipeline()
+        pipe.set(self._entry_key(key), payload, px=int(self.ttl_seconds * 1000))
+        pipe.zadd(self._lru_key, {key: time.time()})
+        pipe.hset(self._sizes_key, key, len(payload))
+        pipe.execute()
+        self._enforce_bounds()
+
+    def _enforce_bounds(self):
+        count = self.client.zcard(self._lru_key)
+        total_bytes = sum(int(size) for size in self.client.hvals(self._sizes_key))
+        while count > self.max_entries or total_bytes > self.max_bytes:
+            popped = self.client.zpopmin(self._lru_key, 1)
+            if not popped:
+                break
+            member = popped[0][0]
+            member = member.decode('utf-8') if isinstance(member, bytes) else member
+            size = self.client.hget(self._sizes_key, member)
+            pipe = self.client.pipeline()
+            pipe.delete(self._entry_key(member))
+            pipe.hdel(self._sizes_key, member)
+            pipe.execute()
+            count -= 1
+            total_bytes -= int(size or 0)
+
+    def delete(self, key):
+        pipe = self.client.pipeline()
+        pipe.delete(self._entry_key(key))
+        pipe.zrem(self._lru_key, key)
+        pipe.hdel(self._sizes_key, key)
+        pipe.execute()
+
+    def clear(self):
+        keys = list(self.client.scan_iter(match=f"{self.prefix}*", count=500))
+        for i in range(0, len(keys), 500):
+            self.client.delete(*keys[i:i + 500])
+
+    def stats(self):
+        return {
+            'backend': self.name,
+            'size': self.client.zcard(self._lru_key),
+            'bytes': sum(int(size) for size in self.client.hvals(self._sizes_key)),
+            'max_size': self.max_entries,
+            'max_bytes': self.max_bytes,
+        }
+
+
+def create_cache_backend():
+    backend_name = config.cache_backend
+    ttl_seconds = config.cache_ttl_seconds
+    max_entries = config.cache_max_size
+    max_bytes = config.cache_max_bytes
+
+    try:
+        if backend_name == 'sqlite':
+            logger.info(f"Using SQLite response cache at {config.cache_sqlite_path}")
+            return SQLiteCacheBackend(ttl_seconds, max_entries, max_bytes, config.cache_sqlite_path)
+        if backend_name == 'redis':
+            logger.info("Using Redis response cache")
+            return RedisCacheBackend(
+                ttl_seconds, max_entries, max_bytes,
+                url=config.cache_redis_url,
+                prefix=config.cache_key_prefix
+            )
+    except Exception as e:
+        logger.warning(f"Response cache backend '{backend_name}' unavailable, using in-memory cache: {str(e)}")
+
+    return MemoryCacheBackend(ttl_seconds, max_entries, max_bytes)
+
+
+def get_cache_backend():
+    """Return the process-wide response cache backend so every ResponseCache shares it."""
+    global _backend
+
+    with _backend_lock:
+        if _backend is None:
+            _backend = create_cache_backend()
+        return _backend
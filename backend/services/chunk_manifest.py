@@ -0,0 +1,256 @@
+import hashlib
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from backend.core.config import config
+from backend.core.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+_manifests = {}
+_manifests_lock = threading.Lock()
+
+
+def text_hash(text):
+    return hashlib.sha256((text or '').encode('utf-8')).hexdigest()[:32]
+
+
+def make_chunk_id(document_id, page_number, text, occurrence=0):
+    """Content-derived chunk ID: the same text on the same page keeps its ID across reindexes."""
+    digest = hashlib.sha256(f"{page_number}\x00{text}".encode('utf-8')).hexdigest()[:16]
+    chunk_id = f"{document_id}_{digest}"
+    return f"{chunk_id}_{occurrence}" if occurrence else chunk_id
+
+
+def assign_chunk_ids(chunks, occurrences):
+    """Set chunk['id'] for each chunk; `occurrences` tracks repeated text within one document."""
+    for chunk in chunks:
+        metadata = chunk['metadata']
+        base_id = make_chunk_id(metadata['document_id'], metadata.get('page_number', 'na'), chunk['text'])
+        occurrence = occurrences.get(base_id, 0)
+        occurrences[base_id] = occurrence + 1
+        chunk['id'] = make_chunk_id(metadata['document_id'], metadata.get('page_number', 'na'),
+                                    chunk['text'], occurrence)
+        chunk['text_hash'] = text_hash(chunk['text'])
+    return chunks
+
+
+def content_hash(content):
+    """Hash of a downloaded file, in the same form as a source-provided 'sha1:' hash."""
+    return f"sha1:{hashlib.sha1(content).hexdigest()}"
+
+
+class ChunkManifest:
+    """Per-document list of stored chunk IDs and their text hashes.
+
+    Lets a modified document be re-indexed as a diff against what is already
+    stored: unchanged chunks are kept, vanished ones deleted and only new text
+    embedded. Each document's content hash and path are kept too, so a file
+    whose bytes did not change is skipped before download. Stored in SQLite
+    (WAL mode) next to the keyword index.
+
+    The documents table doubles as the registry behind /index/documents (name,
+    path, chunk count, indexed_at), and running totals are kept in the same
+    transactions so /index/stats never scans the chunks.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = Path(db_path)
+        self._lock = threading.Lock()
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS chunks ("
+            "document_id TEXT NOT NULL, chunk_id TEXT NOT NULL, text_hash TEXT NOT NULL, "
+            "PRIMARY KEY (document_id, chunk_id))"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS documents ("
+            "document_id TEXT PRIMARY KEY, content_hash TEXT NOT NULL, path TEXT NOT NULL, "
+            "name TEXT NOT NULL DEFAULT '', chunk_count INTEGER NOT NULL DEFAULT 0, "
+            "indexed_at TEXT NOT NULL DEFAULT '')"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS totals ("
+            "id INTEGER PRIMARY KEY CHECK (id = 0), documents INTEGER NOT NULL, chunks INTEGER NOT NULL)"
+        )
+        self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        self._migrate()
+        self._conn.commit()
+
+    def _migrate(self):
+        # Manifests written before the registry existed: add its columns, register
+        # documents that only have chunk rows, and seed the totals once
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(documents)")}
+        if 'chunk_count' not in columns:
+            self._conn.execute("ALTER TABLE documents ADD COLUMN name TEXT NOT NULL DEFAULT ''")
+            self._conn.execute("ALTER TABLE documents ADD COLUMN chunk_count INTEGER NOT NULL DEFAULT 0")
+            self._conn.execute("ALTER TABLE documents ADD COLUMN indexed_at TEXT NOT NULL DEFAULT ''")
+            self._conn.execute(
+                "UPDATE documents SET chunk_count = "
+                "(SELECT COUNT(*) FROM chunks WHERE chunks.document_id = documents.document_id)"
+            )
+            self._conn.execute(
+                "INSERT OR IGNORE INTO documents (document_id, content_hash, path, chunk_count) "
+                "SELECT document_id, '', '', COUNT(*) FROM chunks GROUP BY document_id"
+            )
+        self._conn.execute(
+            "INSERT OR IGNORE INTO totals (id, documents, chunks) "
+            "SELECT 0, COUNT(*), COALESCE(SUM(chunk_count), 0) FROM documents"
+        )
+
+    def get(self, document_id):
+        """Return {chunk_id: text_hash} for a document, or None if it has no manifest yet."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT chunk_id, text_hash FROM chunks WHERE document_id = ?", (document_id,)
+            ).fetchall()
+        if not rows:
+            return None
+        return dict(rows)
+
+    def get_document(self, document_id):
+        """Return (content_hash, path) recorded for a document, or None."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT content_hash, path FROM documents WHERE document_id = ?", (document_id,)
+            ).fetchone()
+
+    def replace(self, document_id, chunks, content_hash=None, path=None, name=None):
+        """Record {chunk_id: text_hash} as the full chunk set of a document, and register it."""
+        with self._lock:
+            self._conn.execute("DELETE FROM chunks WHERE document_id = ?", (document_id,))
+            self._conn.executemany(
+                "INSERT INTO chunks (document_id, chunk_id, text_hash) VALUES (?, ?, ?)",
+                [(document_id, chunk_id, digest) for chunk_id, digest in chunks.items()]
+            )
+            self._unregister(document_id)
+            self._conn.execute(
+                "INSERT INTO documents (document_id, content_hash, path, name, chunk_count, indexed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (document_id, content_hash or '', path or '', name or '', len(chunks),
+                 datetime.now(timezone.utc).isoformat())
+            )
+            self._conn.execute(
+                "UPDATE totals SET documents = documents + 1, chunks = chunks + ? WHERE id = 0", (len(chunks),)
+            )
+            self._conn.commit()
+
+    def remove(self, document_id):
+        with self._lock:
+            self._conn.execute("DELETE FROM chunks WHERE document_id = ?", (document_id,))
+            self._unregister(document_id)
+            self._conn.commit()
+
+    def _unregister(self, document_id):
+        row = self._conn.execute(
+            "SELECT chunk_count FROM documents WHERE document_id = ?", (document_id,)
+        ).fetchone()
+        if row is None:
+            return
+        self._conn.execute("DELETE FROM documents WHERE document_id = ?", (document_id,))
+        self._conn.execute(
+            "UPDATE totals SET documents = documents - 1, chunks = chunks - ? WHERE id = 0", (row[0],)
+        )
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM chunks")
+            self._conn.execute("DELETE FROM documents")
+            self._conn.execute("UPDATE totals SET documents = 0, chunks = 0 WHERE id = 0")
+            self._conn.commit()
+
+    def register_documents(self, documents):
+        """Register {document_id: {name, path, chunks_count, indexed_at}} found only in the vector store.
+
+        Documents already registered are left alone. No chunk rows are written,
+        so each one is replaced in full the first time it changes.
+        """
+        with self._lock:
+            added = 0
+            chunks = 0
+            for document_id, entry in documents.items():
+                cursor = self._conn.execute(
+                    "INSERT OR IGNORE INTO documents (document_id, content_hash, path, name, chunk_count, indexed_at) "
+                    "VALUES (?, '', ?, ?, ?, ?)",
+                    (document_id, entry['path'] or '', entry['name'] or '', entry['chunks_count'],
+                     entry['indexed_at'] or '')
+                )
+                if cursor.rowcount:
+                    added += 1
+                    chunks += entry['chunks_count']
+            self._conn.execute(
+                "UPDATE totals SET documents = documents + ?, chunks = chunks + ? WHERE id = 0", (added, chunks)
+            )
+            self._conn.commit()
+
+    def get_meta(self, key):
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, key, value):
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, str(value)))
+            self._conn.commit()
+
+    def document_ids(self):
+        with self._lock:
+            return [row[0] for row in self._conn.execute("SELECT document_id FROM documents")]
+
+    def list_documents(self, limit=100, after=None):
+        """One page of registered documents ordered by ID, starting after the `after` cursor."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT document_id, name, path, chunk_count, content_hash, indexed_at FROM documents "
+                "WHERE document_id > ? ORDER BY document_id LIMIT ?",
+                (after or '', limit)
+            ).fetchall()
+        return [
+            {
+                'id': document_id,
+                'name': name or 'Unknown',
+                'path': path,
+                'chunks_count': chunk_count,
+                'content_hash': content_hash or None,
+                'indexed_at': indexed_at or None
+            }
+            for document_id, name, path, chunk_count, content_hash, indexed_at in rows
+        ]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def stats(self):
+        with self._lock:
+            documents, chunks = self._conn.execute(
+                "SELECT documents, chunks FROM totals WHERE id = 0"
+            ).fetchone()
+        return {'documents': documents, 'chunks': chunks, 'path': str(self.db_path)}
+
+
+def get_chunk_manifest(collection_name=None):
+    """Return the process-wide chunk manifest for a collection."""
+    collection_name = collection_name or config.collection_name
+    with _manifests_lock:
+        manifest = _manifests.get(collection_name)
+        if manifest is None:
+            manifest = ChunkManifest(Path(config.keyword_index_dir) / f"manifest_{collection_name}.db")
+            _manifests[collection_name] = manifest
+        return manifest
+
+
+def drop_chunk_manifest(collection_name):
+    """Close a collection's chunk manifest and delete its database files."""
+    with _manifests_lock:
+        manifest = _manifests.pop(collection_name, None)
+    if manifest is not None:
+        manifest.close()
+    db_path = Path(config.keyword_index_dir) / f"manifest_{collection_name}.db"
+    for path in (db_path, Path(f"{db_path}-wal"), Path(f"{db_path}-shm")):
+        path.unlink(missing_ok=True)
@@ -2,14 +2,23 @@ import io
 from PyPDF2 import PdfReader
 from docx import Document
 import openpyxl
+from backend.core.config import config
 from backend.core.logger import setup_logger
+from backend.services.extraction_pool import get_extraction_pool
 
 logger = setup_logger(__name__)
 
 
+def _iter_pages_in_child(content, file_name):
+    return DocumentProcessor(isolate=False).iter_text_with_pages(content, file_name)
+
+
 class DocumentProcessor:
-    def __init__(self):
+    def __init__(self, isolate=None):
         self.supported_extensions = ['.pdf', '.docx', '.txt', '.xlsx', '.md']
+        # Parsers for these formats are pure-Python CPU work; run them out of process
+        self.isolated_extensions = ['.pdf', '.docx', '.xlsx']
+        self.isolate = config.extraction_isolation_enabled if isolate is None else isolate
 
     def extract_text(self, content, file_name):
         extension = self._get_extension(file_name)
@@ -86,44 +95,54 @@ class DocumentProcessor:
         return full_text
 
     def extract_text_with_pages(self, content, file_name):
-        extension = self._get_extension(file_name)
-
-        if extension not in self.supported_extensions:
-            logger.warning(f"Unsupported file type: {extension} for {file_name}")
-            return []
-
         try:
-            if extension == '.pdf':
-                return self._extract_from_pdf_with_pages(content)
-            elif extension == '.docx':
-                return self._extract_from_docx_with_pages(content)
-            elif extension == '.txt' or extension == '.md':
-                return self._extract_from_text_with_pages(content)
-            elif extension == '.xlsx':
-                return self._extract_from_excel_with_pages(content)
-            else:
-                return []
+            return list(self.iter_text_with_pages(content, file_name))
         except Exception as e:
             logger.error(f"Failed to extract text with pages from {file_name}: {str(e)}")
             return []
 
-    def _extract_from_pdf_with_pages(self, content):
+    def iter_text_with_pages(self, content, file_name):
+        """Yield {'page_number', 'text'} dicts one page at a time.
+
+        Unlike extract_text_with_pages, extraction errors are raised so callers
+        can tell a failed file from an empty one.
+        """
+        extension = self._get_extension(file_name)
+
+        if extension not in self.supported_extensions:
+            logger.warning(f"Unsupported file type: {extension} for {file_name}")
+            return iter(())
+
+        if self.isolate and extension in self.isolated_extensions:
+            return get_extraction_pool().stream(_iter_pages_in_child, content, file_name, label=file_name)
+
+        if extension == '.pdf':
+            return self._iter_pdf_pages(content)
+        elif extension == '.docx':
+            return self._iter_docx_pages(content)
+        elif extension == '.txt' or extension == '.md':
+            return self._iter_text_pages(content)
+        elif extension == '.xlsx':
+            return self._iter_excel_pages(content)
+        return iter(())
+
+    def _iter_pdf_pages(self, content):
         pdf_file = io.BytesIO(content)
         reader = PdfReader(pdf_file)
 
-        pages_data = []
+        page_count = 0
         for page_num, page in enumerate(reader.pages, start=1):
             page_text = page.extract_text()
             if page_text.strip():
-                pages_data.append({
+                page_count += 1
+                yield {
                     'page_number': page_num,
                     'text': page_text
-                })
+                }
 
-        logger.debug(f"Extracted {len(pages_data)} pages from PDF")
-        return pages_data
+        logger.debug(f"Extracted {page_count} pages from PDF")
 
-    def _extract_from_docx_with_pages(self, content):
+    def _iter_docx_pages(self, content):
         doc_file = io.BytesIO(content)
         document = Document(doc_file)
 
@@ -132,43 +151,43 @@ class DocumentProcessor:
             if paragraph.text.strip():
                 page_text.append(paragraph.text)
 
-        pages_data = [{
+        logger.debug(f"Extracted 1 page from DOCX")
+        yield {
             'page_number': 1,
             'text': '\n\n'.join(page_text)
-        }]
+        }
 
-        logger.debug(f"Extracted 1 page from DOCX")
-        return pages_data
-
-    def _extract_from_text_with_pages(self, content):
+    def _iter_text_pages(self, content):
         text = content.decode('utf-8', errors='ignore')
 
-        pages_data = [{
+        logger.debug(f"Extracted 1 page from text file")
+        yield {
             'page_number': 1,
             'text': text
-        }]
+        }
 
-        logger.debug(f"Extracted 1 page from text file")
-        return pages_data
-
-    def _extract_from_excel_with_pages(self, content):
+    def _iter_excel_pages(self, content):
         excel_file = io.BytesIO(content)
-        workbook = openpyxl.load_workbook(excel_file, data_only=True)
+        # read_only streams rows instead of loading every cell of the workbook
+        workbook = openpyxl.load_workbook(excel_file, data_only=True, read_only=True)
 
-        pages_data = []
-        for page_num, sheet_name in enumerate(workbook.sheetnames, start=1):
-            sheet = workbook[sheet_name]
-            text_parts = [f"Sheet: {sheet_name}"]
-
-            for row in sheet.iter_rows(values_only=True):
-                row_text = '\t'.join([str(cell) if cell is not None else '' for cell in row])
-                if row_text.strip():
-                    text_parts.append(row_text)
-
-            pages_data.append({
-                'page_number': page_num,
-                'text': '\n'.join(text_parts)
-            })
+        try:
+            sheet_count = 0
+            for page_num, sheet_name in enumerate(workbook.sheetnames, start=1):
+                sheet = workbook[sheet_name]
+                text_parts = [f"Sheet: {sheet_name}"]
+
+                for row in sheet.iter_rows(values_only=True):
+                    row_text = '\t'.join([str(cell) if cell is not None else '' for cell in row])
+                    if row_text.strip():
+                        text_parts.append(row_text)
+
+                sheet_count += 1
+                yield {
+                    'page_number': page_num,
+                    'text': '\n'.join(text_parts)
+                }
+        finally:
+            workbook.close()
 
-        logger.debug(f"Extracted {len(pages_data)} sheets from Excel")
-        return pages_data
+        logger.debug(f"Extracted {sheet_count} sheets from Excel")
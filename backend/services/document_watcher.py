@@ -0,0 +1,172 @@
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from pathlib import Path
+from backend.core.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = IN_CLOSE_WRITE | IN_ATTRIB | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF
+EVENT_HEADER = struct.Struct('iIII')
+
+
+class WatcherUnavailable(Exception):
+    pass
+
+
+def _load_libc():
+    if not sys.platform.startswith('linux'):
+        raise WatcherUnavailable("inotify is only available on Linux")
+    libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+    if not hasattr(libc, 'inotify_init1'):
+        raise WatcherUnavailable("libc does not provide inotify")
+    libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+    libc.inotify_rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+    return libc
+
+
+class DocumentWatcher:
+    """Reports changed files under a directory tree without polling.
+
+    Uses inotify (through libc, so there is no extra dependency) with one watch
+    per directory; new directories are watched as they appear. Changed paths are
+    collected and handed to `callback` as one set once no event has arrived for
+    `debounce_seconds`, so a burst of writes becomes a single indexing run. If the
+    kernel event queue overflows, `callback` receives None and the caller should
+    rescan everything.
+    """
+
+    def __init__(self, root_path, callback, debounce_seconds=2.0):
+        self.root_path = Path(root_path).resolve()
+        self.callback = callback
+        self.debounce_seconds = debounce_seconds
+        self._libc = _load_libc()
+        self._fd = None
+        self._watches = {}
+        self._pending = set()
+        self._overflowed = False
+        self._last_event = 0.0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._threads = []
+
+    def start(self):
+        self._fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+        self._watch_tree(self.root_path)
+        logger.info(f"Watching {len(self._watches)} directories under {self.root_path}")
+
+        for target, name in ((self._read_events, 'watcher-events'), (self._dispatch, 'watcher-dispatch')):
+            thread = threading.Thread(target=target, name=name, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self):
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout=5)
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def _add_watch(self, directory):
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(str(directory)), WATCH_MASK)
+        if wd < 0:
+            error = ctypes.get_errno()
+            if error == errno.ENOSPC:
+                logger.error("inotify watch limit reached; raise fs.inotify.max_user_watches "
+                             "or rely on scheduled scans")
+            else:
+                logger.warning(f"Could not watch {directory}: {os.strerror(error)}")
+            return
+        self._watches[wd] = Path(directory)
+
+    def _watch_tree(self, directory):
+        pending = [str(directory)]
+        while pending:
+            current = pending.pop()
+            self._add_watch(current)
+            try:
+                with os.scandir(current) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            pending.append(entry.path)
+            except OSError as e:
+                logger.warning(f"Could not list {current}: {str(e)}")
+
+    def _read_events(self):
+        while not self._stop.is_set():
+            ready, _, _ = select.select([self._fd], [], [], 0.5)
+            if not ready:
+                continue
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                continue
+
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+                name = data[offset + EVENT_HEADER.size:offset + EVENT_HEADER.size + length].rstrip(b'\0')
+                offset += EVENT_HEADER.size + length
+                self._handle_event(wd, mask, os.fsdecode(name))
+
+    def _handle_event(self, wd, mask, name):
+        if mask & IN_Q_OVERFLOW:
+            logger.warning("inotify queue overflowed, requesting a full rescan")
+            with self._lock:
+                self._overflowed = True
+                self._last_event = time.monotonic()
+            return
+
+        directory = self._watches.get(wd)
+        if directory is None:
+            return
+        if mask & IN_IGNORED:
+            self._watches.pop(wd, None)
+            return
+
+        path = directory / name if name else directory
+        if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO):
+            # Files written before the watch was added are covered by reporting the directory
+            self._watch_tree(path)
+
+        with self._lock:
+            self._pending.add(str(path))
+            self._last_event = time.monotonic()
+
+    def _dispatch(self):
+        while not self._stop.wait(min(0.5, self.debounce_seconds)):
+            with self._lock:
+                quiet = time.monotonic() - self._last_event >= self.debounce_seconds
+                if not quiet or not (self._pending or self._overflowed):
+                    continue
+                paths = None if self._overflowed else self._pending
+                self._pending = set()
+                self._overflowed = False
+
+            try:
+                self.callback(paths)
+            except Exception as e:
+                logger.error(f"Watcher callback failed: {str(e)}")
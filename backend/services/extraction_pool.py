@@ -0,0 +1,172 @@
+import multiprocessing
+import threading
+import time
+from backend.core.config import config
+from backend.core.logger import setup_logger
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+logger = setup_logger(__name__)
+
+_pool = None
+_pool_lock = threading.Lock()
+
+# Imported once by the forkserver, so each job starts with the parsers already loaded
+EXTRACTION_MODULES = ['backend.services.indexing_pipeline']
+
+
+class ExtractionError(Exception):
+    pass
+
+
+class ExtractionTimeout(ExtractionError):
+    pass
+
+
+def _run_job(conn, func, args, memory_limit_bytes, streaming):
+    if resource is not None and memory_limit_bytes:
+        try:
+            resource.setrlimit(resource.RLIMIT_AS, (memory_limit_bytes, memory_limit_bytes))
+        except (ValueError, OSError) as e:
+            logger.warning(f"Could not apply extraction memory limit: {str(e)}")
+
+    try:
+        if streaming:
+            for item in func(*args):
+                conn.send(('item', item))
+            conn.send(('done', None))
+        else:
+            conn.send(('ok', func(*args)))
+    except MemoryError:
+        conn.send(('error', f"exceeded memory limit of {memory_limit_bytes // (1024 * 1024)} MB"))
+    except (BrokenPipeError, EOFError):
+        pass  # the parent stopped reading (timeout or abandoned stream)
+    except Exception as e:
+        conn.send(('error', f"{type(e).__name__}: {str(e)}"))
+    finally:
+        conn.close()
+
+
+def _job_context():
+    # A child forked straight from the API process would inherit its whole address
+    # space (reranker model, Chroma, grpc threads) before RLIMIT_AS applies, and
+    # forking a threaded grpc process can deadlock; jobs therefore fork from a
+    # small server process that only has the extraction modules loaded
+    if 'forkserver' in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context('forkserver')
+        context.set_forkserver_preload(EXTRACTION_MODULES)
+        return context
+    return multiprocessing.get_context('spawn')
+
+
+class ExtractionPool:
+    """Runs CPU-bound extraction jobs in child processes.
+
+    Each job gets a fresh process with an address-space limit, so a pathological
+    file can exhaust neither the caller's memory nor its GIL, and a job that
+    exceeds its timeout is killed. At most `max_workers` jobs run at once.
+    Jobs are started from a forkserver (spawn where there is none), so the limit
+    applies to a clean interpreter rather than a copy of the caller.
+    """
+
+    def __init__(self, max_workers=None, timeout_seconds=None, memory_limit_mb=None):
+        self.max_workers = max(1, max_workers or config.indexing_extract_workers)
+        self.timeout_seconds = timeout_seconds or config.extraction_timeout_seconds
+        memory_limit_mb = memory_limit_mb if memory_limit_mb is not None else config.extraction_memory_limit_mb
+        self.memory_limit_bytes = memory_limit_mb * 1024 * 1024 if memory_limit_mb else 0
+        self._slots = threading.BoundedSemaphore(self.max_workers)
+        self._context = _job_context()
+
+    def _start(self, func, args, streaming):
+        parent_conn, child_conn = self._context.Pipe(duplex=False)
+        process = self._context.Process(
+            target=_run_job,
+            args=(child_conn, func, args, self.memory_limit_bytes, streaming),
+            daemon=True
+        )
+        process.start()
+        child_conn.close()
+        return process, parent_conn
+
+    def _receive(self, process, parent_conn, wait_seconds, timeout_seconds, label):
+        if not parent_conn.poll(wait_seconds):
+            raise ExtractionTimeout(f"Extraction of {label or 'file'} exceeded {timeout_seconds}s")
+        try:
+            return parent_conn.recv()
+        except EOFError:
+            process.join()
+            raise ExtractionError(f"Extraction of {label or 'file'} crashed (exit code {process.exitcode})")
+
+    def _finish(self, process, parent_conn, completed):
+        parent_conn.close()
+        if completed:
+            process.join(timeout=5)
+        if process.is_alive():
+            process.kill()
+        process.join()
+
+    def run(self, func, *args, timeout_seconds=None, label=''):
+        """Run func(*args) in a child process and return its result.
+
+        func and its arguments must be picklable. Raises ExtractionTimeout when
+        the job runs too long and ExtractionError when it fails or is killed.
+        """
+        timeout_seconds = timeout_seconds or self.timeout_seconds
+
+        with self._slots:
+            process, parent_conn = self._start(func, args, streaming=False)
+            completed = False
+            try:
+                # Read before joining: a large result blocks the child until it is received
+                status, payload = self._receive(process, parent_conn, timeout_seconds, timeout_seconds, label)
+                completed = True
+            finally:
+                self._finish(process, parent_conn, completed)
+
+        if status != 'ok':
+            raise ExtractionError(f"Extraction of {label or 'file'} failed: {payload}")
+        return payload
+
+    def stream(self, func, *args, timeout_seconds=None, label=''):
+        """Run the generator function func(*args) in a child process and yield its items.
+
+        The child blocks while the consumer is busy, so only a pipe buffer of
+        items is in flight. The timeout budget only counts time spent waiting
+        for the child, not time the consumer spends on each item.
+        """
+        timeout_seconds = timeout_seconds or self.timeout_seconds
+
+        with self._slots:
+            process, parent_conn = self._start(func, args, streaming=True)
+            completed = False
+            waited = 0.0
+            try:
+                while True:
+                    started = time.monotonic()
+                    status, payload = self._receive(
+                        process, parent_conn, max(0.0, timeout_seconds - waited), timeout_seconds, label
+                    )
+                    waited += time.monotonic() - started
+
+                    if status == 'item':
+                        yield payload
+                    elif status == 'done':
+                        completed = True
+                        return
+                    else:
+                        raise ExtractionError(f"Extraction of {label or 'file'} failed: {payload}")
+            finally:
+                self._finish(process, parent_conn, completed)
+
+
+def get_extraction_pool():
+    """Return the process-wide extraction pool so concurrent callers share its worker limit."""
+    global _pool
+
+    with _pool_lock:
+        if _pool is None:
+            _pool = ExtractionPool()
+        return _pool
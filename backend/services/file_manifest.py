@@ -0,0 +1,75 @@
+import sqlite3
+import threading
+from pathlib import Path
+from backend.core.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class FileManifest:
+    """Last scanned state of every file under a local documents root.
+
+    One row per file: (path, size, mtime_ns, content_hash). A scan only hashes
+    files whose size or mtime differ from their row, so listing an unchanged tree
+    costs one stat per file. Every applied scan advances `scan_id`, which lets a
+    caller tell whether its saved position still matches the manifest.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = Path(db_path)
+        self._lock = threading.Lock()
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS files ("
+            "path TEXT PRIMARY KEY, size INTEGER NOT NULL, mtime_ns INTEGER NOT NULL, content_hash TEXT NOT NULL)"
+        )
+        self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        self._conn.commit()
+
+    def get_scan_id(self):
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = 'scan_id'").fetchone()
+        return int(row[0]) if row else 0
+
+    def get_all(self):
+        """Return {path: (size, mtime_ns, content_hash)} for every file."""
+        with self._lock:
+            rows = self._conn.execute("SELECT path, size, mtime_ns, content_hash FROM files").fetchall()
+        return {path: (size, mtime_ns, content_hash) for path, size, mtime_ns, content_hash in rows}
+
+    def get_under(self, paths):
+        """Rows for the given paths and for any file below them (paths may be directories)."""
+        found = {}
+        with self._lock:
+            for path in paths:
+                rows = self._conn.execute(
+                    "SELECT path, size, mtime_ns, content_hash FROM files "
+                    "WHERE path = ? OR substr(path, 1, ?) = ?",
+                    (path, len(path) + 1, f"{path}/")
+                ).fetchall()
+                for row_path, size, mtime_ns, content_hash in rows:
+                    found[row_path] = (size, mtime_ns, content_hash)
+        return found
+
+    def apply(self, upserts, deleted_paths):
+        """Write {path: (size, mtime_ns, content_hash)} rows, drop deleted paths, and return the new scan_id."""
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO files (path, size, mtime_ns, content_hash) VALUES (?, ?, ?, ?)",
+                [(path, size, mtime_ns, content_hash) for path, (size, mtime_ns, content_hash) in upserts.items()]
+            )
+            self._conn.executemany("DELETE FROM files WHERE path = ?", [(path,) for path in deleted_paths])
+            row = self._conn.execute("SELECT value FROM meta WHERE key = 'scan_id'").fetchone()
+            scan_id = (int(row[0]) if row else 0) + 1
+            self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('scan_id', ?)", (str(scan_id),))
+            self._conn.commit()
+        return scan_id
+
+    def stats(self):
+        with self._lock:
+            files = self._conn.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+        return {'files': files, 'scan_id': self.get_scan_id(), 'path': str(self.db_path)}
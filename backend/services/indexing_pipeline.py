@@ -0,0 +1,591 @@
+import queue
+import threading
+import time
+from backend.core.config import config
+from backend.core.logger import setup_logger
+from backend.core.recursive_splitter import RecursiveCharacterSplitter
+from backend.retrieval.query_filters import to_timestamp
+from backend.services.chunk_manifest import assign_chunk_ids, content_hash
+from backend.services.document_processor import DocumentProcessor
+from backend.services.extraction_pool import get_extraction_pool
+
+logger = setup_logger(__name__)
+
+_STOP = object()
+
+_worker_processor = None
+_worker_chunker = None
+
+
+def iter_chunk_batches(content, file_name, metadata, batch_size):
+    """Extract and chunk one document page by page, yielding lists of up to batch_size chunks.
+
+    Runs in an extraction worker process; only the current page and batch are held in memory.
+    """
+    global _worker_processor, _worker_chunker
+
+    if _worker_processor is None:
+        _worker_processor = DocumentProcessor(isolate=False)
+        _worker_chunker = RecursiveCharacterSplitter()
+
+    pages = _worker_processor.iter_text_with_pages(content, file_name)
+    occurrences = {}
+    batch = []
+    for chunk in _worker_chunker.iter_chunks_with_pages(pages, metadata):
+        batch.append(chunk)
+        if len(batch) >= batch_size:
+            yield assign_chunk_ids(batch, occurrences)
+            batch = []
+    if batch:
+        yield assign_chunk_ids(batch, occurrences)
+
+
+class StageMetrics:
+    def __init__(self, name, workers):
+        self.name = name
+        self.workers = workers
+        self.items = 0
+        self.units = 0
+        self.errors = 0
+        self.busy_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, seconds, items=1, units=0):
+        with self._lock:
+            self.items += items
+            self.units += units
+            self.busy_seconds += seconds
+
+    def record_error(self):
+        with self._lock:
+            self.errors += 1
+
+    def summary(self, elapsed):
+        return {
+            'workers': self.workers,
+            'items': self.items,
+            'chunks': self.units,
+            'errors': self.errors,
+            'busy_seconds': round(self.busy_seconds, 2),
+            'items_per_second': round(self.items / elapsed, 2) if elapsed else 0.0,
+            'utilization': round(self.busy_seconds / (elapsed * self.workers), 2) if elapsed else 0.0,
+        }
+
+
+class IndexingPipeline:
+    """Staged producer/consumer pipeline for indexing documents.
+
+    download (threads) -> extract + chunk (child processes) -> embed (threads)
+    -> write (single thread). Stages are joined by bounded queues, so a slow
+    stage applies backpressure instead of letting downloaded files pile up in
+    memory. Documents are extracted page by page and flow downstream in chunk
+    batches, so memory does not grow with document size and a large document's
+    first chunks are searchable before its last page is parsed. A document that
+    fails part-way through has its written chunks removed again.
+
+    Chunk IDs are content hashes. A re-indexed document is diffed against its
+    chunk manifest: unchanged chunks only get their metadata refreshed, moved
+    text reuses its stored embedding, and chunks that vanished are deleted once
+    the document completes.
+
+    A document whose content hash matches the one recorded when it was last
+    indexed (and whose path is unchanged) is skipped: before download when the
+    source supplies a hash, otherwise right after download.
+
+    Keyword index changes are queued by the write stage and applied in short
+    writing() sessions, every `keyword_save_chunks` new chunks and at the end
+    of the run, so other writers of the index only wait for a save.
+    """
+
+    def __init__(self, document_source, embedding_service, vector_store, keyword_index, manifest,
+                 download_workers=None, extract_workers=None, embed_workers=None,
+                 queue_size=None, write_batch_size=None, chunk_batch_size=None, keyword_save_chunks=None):
+        self.document_source = document_source
+        self.embedding_service = embedding_service
+        self.vector_store = vector_store
+        self.keyword_index = keyword_index
+        self.manifest = manifest
+        self.download_workers = max(1, download_workers or config.indexing_download_workers)
+        self.extract_workers = extract_workers if extract_workers is not None else config.indexing_extract_workers
+        self.embed_workers = max(1, embed_workers or config.indexing_embed_workers)
+        self.queue_size = max(1, queue_size or config.indexing_queue_size)
+        self.write_batch_size = max(1, write_batch_size or config.indexing_write_batch_size)
+        self.chunk_batch_size = max(1, chunk_batch_size or config.indexing_chunk_batch_size)
+        self.keyword_save_chunks = max(1, keyword_save_chunks or config.indexing_keyword_save_chunks)
+
+    def run(self, documents):
+        started = time.perf_counter()
+        self._errors = []
+        self._errors_lock = threading.Lock()
+        self._processed_count = 0
+        self._total_chunks = 0
+        self._unchanged_chunks = 0
+        self._deleted_chunks = 0
+        self._failed_documents = set()
+        self._unchanged_documents = []
+        self._progress = {}
+        self._keyword_updates = []
+        self._keyword_chunks = 0
+
+        # Extraction is dispatched by a fixed set of threads that each block on one
+        # child-process job; with no extraction workers they run extraction inline
+        dispatchers = max(1, self.extract_workers)
+        self._metrics = {
+            'download': StageMetrics('download', self.download_workers),
+            'extract': StageMetrics('extract', dispatchers),
+            'embed': StageMetrics('embed', self.embed_workers),
+            'write': StageMetrics('write', 1),
+        }
+
+        pending = queue.Queue()
+        for doc in documents:
+            pending.put(doc)
+        for _ in range(self.download_workers):
+            pending.put(_STOP)
+
+        extract_queue = queue.Queue(maxsize=self.queue_size)
+        embed_queue = queue.Queue(maxsize=self.queue_size)
+        write_queue = queue.Queue(maxsize=self.queue_size)
+
+        pool = get_extraction_pool() if self.extract_workers > 0 and config.extraction_isolation_enabled else None
+
+        stages = [
+            self._start_stage('download', self.download_workers, self._download_worker,
+                              (pending, extract_queue), extract_queue, dispatchers),
+            self._start_stage('extract', dispatchers, self._extract_worker,
+                              (extract_queue, embed_queue, pool), embed_queue, self.embed_workers),
+            self._start_stage('embed', self.embed_workers, self._embed_worker,
+                              (embed_queue, write_queue), write_queue, 1),
+            self._start_stage('write', 1, self._write_worker, (write_queue,), None, 0),
+        ]
+        for threads in stages:
+            for thread in threads:
+                thread.join()
+        self._apply_keyword_updates()
+
+        elapsed = time.perf_counter() - started
+        stage_stats = {name: metrics.summary(elapsed) for name, metrics in self._metrics.items()}
+        for name, stats in stage_stats.items():
+            logger.info(f"Indexing stage {name}: {stats['items']} items, {stats['chunks']} chunks, "
+                        f"{stats['items_per_second']}/s, utilization {stats['utilization']}, "
+                        f"{stats['errors']} errors")
+
+        return {
+            'status': 'completed' if not self._errors else 'completed_with_errors',
+            'documents_processed': self._processed_count,
+            'chunks_created': self._total_chunks,
+            'chunks_unchanged': self._unchanged_chunks,
+            'chunks_deleted': self._deleted_chunks,
+            'documents_unchanged': len(self._unchanged_documents),
+            'unchanged_document_ids': self._unchanged_documents,
+            'errors': self._errors,
+            'elapsed_seconds': round(elapsed, 2),
+            'stages': stage_stats,
+        }
+
+    # ──────────────── STAGE PLUMBING ────────────────
+
+    def _start_stage(self, name, workers, target, args, downstream, downstream_workers):
+        remaining = [workers]
+        remaining_lock = threading.Lock()
+
+        def run_worker():
+            try:
+                target(*args)
+            except Exception as e:
+                # Keep consuming this stage's queue so upstream workers never block on a full one
+                logger.error(f"Indexing {name} worker stopped: {str(e)}")
+                self._drain(name, args[0], downstream)
+            finally:
+                # The last worker of a stage tells every downstream worker to stop
+                with remaining_lock:
+                    remaining[0] -= 1
+                    last = remaining[0] == 0
+                if last and downstream is not None:
+                    for _ in range(downstream_workers):
+                        downstream.put(_STOP)
+
+        threads = [
+            threading.Thread(target=run_worker, name=f"indexing-{name}-{i}", daemon=True)
+            for i in range(workers)
+        ]
+        for thread in threads:
+            thread.start()
+        return threads
+
+    def _drain(self, stage, inbox, downstream):
+        while True:
+            item = inbox.get()
+            if item is _STOP:
+                return
+            doc = item[0] if isinstance(item, tuple) else item.get('doc', item)
+            self._fail_document(stage, doc, RuntimeError(f"{stage} worker stopped"))
+            if downstream is None:
+                self._discard_document(doc)
+            elif stage != 'download':
+                downstream.put({'doc': doc, 'failed': True})
+
+    def _record_error(self, stage, doc, error):
+        error_msg = f"Failed to process {doc['name']}: {str(error)}"
+        logger.error(error_msg)
+        self._metrics[stage].record_error()
+        with self._errors_lock:
+            self._errors.append(error_msg)
+
+    def _fail_document(self, stage, doc, error):
+        with self._errors_lock:
+            if doc['id'] in self._failed_documents:
+                return
+            self._failed_documents.add(doc['id'])
+        self._record_error(stage, doc, error)
+
+    def _document_metadata(self, doc):
+        return {
+            'document_id': doc['id'],
+            'document_name': doc['name'],
+            'document_path': doc['path'],
+            'modified': doc['modified'],
+            # Chroma only compares numbers, so date range filters use this copy
+            'modified_ts': to_timestamp(doc['modified']),
+            'author': doc['author'],
+            'url': doc.get('web_url', '')
+        }
+
+    # ──────────────── STAGES ────────────────
+
+    def _download_worker(self, pending, extract_queue):
+        while True:
+            doc = pending.get()
+            if doc is _STOP:
+                return
+
+            try:
+                item = self._download_document(doc)
+            except Exception as e:
+                self._record_error('download', doc, e)
+                continue
+            if item is not None:
+                extract_queue.put(item)
+
+    def _download_document(self, doc):
+        started = time.perf_counter()
+        stored = self._stored_document(doc)
+        if doc.get('content_hash') and stored == (doc['content_hash'], doc['path']):
+            self._skip_unchanged(doc)
+            return None
+
+        logger.info(f"Processing document: {doc['name']}")
+        content = self.document_source.download_file_content(doc['path'])
+        self._metrics['download'].record(time.perf_counter() - started)
+
+        doc = dict(doc, content_hash=doc.get('content_hash') or content_hash(content))
+        if stored == (doc['content_hash'], doc['path']):
+            self._skip_unchanged(doc)
+            return None
+        return doc, content
+
+    def _stored_document(self, doc):
+        try:
+            return self.manifest.get_document(doc['id'])
+        except Exception as e:
+            logger.warning(f"Content hash unavailable for {doc['name']}: {str(e)}")
+            return None
+
+    def _skip_unchanged(self, doc):
+        logger.debug(f"Skipping {doc['name']}: content unchanged since it was indexed")
+        with self._errors_lock:
+            self._unchanged_documents.append(doc['id'])
+
+    def _extract_worker(self, extract_queue, embed_queue, pool):
+        while True:
+            item = extract_queue.get()
+            if item is _STOP:
+                return
+
+            doc, content = item
+            try:
+                self._extract_document(doc, content, embed_queue, pool)
+            except Exception as e:
+                self._fail_document('extract', doc, e)
+            if doc['id'] in self._failed_documents:
+                embed_queue.put({'doc': doc, 'failed': True})
+
+    def _extract_document(self, doc, content, embed_queue, pool):
+        args = (content, doc['name'], self._document_metadata(doc), self.chunk_batch_size)
+        if pool is not None:
+            batches = pool.stream(iter_chunk_batches, *args, label=doc['name'])
+        else:
+            batches = iter_chunk_batches(*args)
+
+        existing = None
+        try:
+            existing = self.manifest.get(doc['id'])
+        except Exception as e:
+            logger.warning(f"Chunk manifest unavailable for {doc['name']}, reindexing it fully: {str(e)}")
+        existing_by_hash = {digest: chunk_id for chunk_id, digest in (existing or {}).items()}
+
+        # Hold one batch back so the last one can carry the document's batch count
+        busy = 0.0
+        held = None
+        batch_count = 0
+        chunk_count = 0
+        seen = {}
+        try:
+            while doc['id'] not in self._failed_documents:
+                started = time.perf_counter()
+                batch = next(batches, None)
+                busy += time.perf_counter() - started
+                if batch is None:
+                    break
+                if held is not None:
+                    embed_queue.put(held)
+                held = self._diff_batch(doc, batch, existing, existing_by_hash, seen)
+                batch_count += 1
+                chunk_count += len(batch)
+        except Exception as e:
+            self._fail_document('extract', doc, e)
+        finally:
+            batches.close()
+
+        self._metrics['extract'].record(busy, units=chunk_count)
+        if doc['id'] in self._failed_documents:
+            return
+        if held is None:
+            if not existing:
+                logger.warning(f"Skipping {doc['name']}: no text content extracted")
+                return
+            # Indexed before but no text now: the write stage drops its stale chunks
+            logger.warning(f"Removing {doc['name']} from the index: no text content extracted")
+            held = self._diff_batch(doc, [], existing, existing_by_hash, seen)
+            batch_count = 1
+        held.update({'batch_total': batch_count, 'manifest': seen, 'existing': existing})
+        embed_queue.put(held)
+
+    def _diff_batch(self, doc, batch, existing, existing_by_hash, seen):
+        new_chunks = []
+        retained = []
+        for chunk in batch:
+            seen[chunk['id']] = chunk['text_hash']
+            if existing and chunk['id'] in existing:
+                retained.append(chunk)
+                continue
+            reuse_id = existing_by_hash.get(chunk['text_hash'])
+            if reuse_id:
+                chunk['reuse_id'] = reuse_id
+            new_chunks.append(chunk)
+        return {
+            'doc': doc,
+            'chunks': new_chunks,
+            'retained': retained,
+            'has_manifest': existing is not None,
+            'batch_total': None,
+        }
+
+    def _embed_worker(self, embed_queue, write_queue):
+        stopping = False
+        while not stopping:
+            item = embed_queue.get()
+            if item is _STOP:
+                return
+
+            # Top the batch up with whatever is already waiting so small documents
+            # share embedding requests
+            batch = [item]
+            batch_chunks = len(item.get('chunks') or [])
+            while batch_chunks < self.write_batch_size:
+                try:
+                    item = embed_queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+                batch_chunks += len(item.get('chunks') or [])
+
+            pending = [item for item in batch if not item.get('failed')]
+            for item in batch:
+                if item.get('failed'):
+                    write_queue.put(item)
+            if not pending:
+                continue
+
+            try:
+                self._embed_items(pending, write_queue)
+            except Exception as e:
+                for item in pending:
+                    self._fail_document('embed', item['doc'], e)
+                    write_queue.put({'doc': item['doc'], 'failed': True})
+
+    def _embed_items(self, items, write_queue):
+        started = time.perf_counter()
+        chunks = [chunk for item in items for chunk in item['chunks']]
+        try:
+            # Text that only moved within its document keeps its stored embedding
+            reused = self.vector_store.get_embeddings(
+                [chunk['reuse_id'] for chunk in chunks if chunk.get('reuse_id')]
+            )
+            to_embed = [chunk for chunk in chunks if chunk.get('reuse_id') not in reused]
+            fresh = self.embedding_service.generate_embeddings([chunk['text'] for chunk in to_embed])
+            fresh_by_id = {chunk['id']: embedding for chunk, embedding in zip(to_embed, fresh)}
+            embeddings = [fresh_by_id.get(chunk['id']) or reused[chunk['reuse_id']] for chunk in chunks]
+        except Exception as e:
+            if len(items) > 1:
+                # Retry documents one by one so one bad document does not fail its batch mates
+                for item in items:
+                    self._embed_items([item], write_queue)
+                return
+            self._fail_document('embed', items[0]['doc'], e)
+            write_queue.put({'doc': items[0]['doc'], 'failed': True})
+            return
+        self._metrics['embed'].record(time.perf_counter() - started, items=len(items), units=len(to_embed))
+
+        offset = 0
+        for item in items:
+            count = len(item['chunks'])
+            write_queue.put({**item, 'embeddings': embeddings[offset:offset + count]})
+            offset += count
+
+    def _write_worker(self, write_queue):
+        buffered = []
+        buffered_chunks = 0
+        while True:
+            item = write_queue.get()
+            if item is not _STOP:
+                if item.get('failed'):
+                    self._discard_document(item['doc'])
+                else:
+                    buffered.append(item)
+                    buffered_chunks += len(item['chunks'])
+
+            if buffered and (item is _STOP or buffered_chunks >= self.write_batch_size or write_queue.empty()):
+                try:
+                    self._flush(buffered)
+                except Exception as e:
+                    for buffered_item in buffered:
+                        self._fail_document('write', buffered_item['doc'], e)
+                        self._discard_document(buffered_item['doc'])
+                buffered = []
+                buffered_chunks = 0
+                if self._keyword_chunks >= self.keyword_save_chunks:
+                    self._apply_keyword_updates()
+
+            if item is _STOP:
+                return
+
+    def _flush(self, batch):
+        batch = [item for item in batch if item['doc']['id'] not in self._failed_documents]
+        if not batch:
+            return
+
+        started = time.perf_counter()
+        chunks = [chunk for item in batch for chunk in item['chunks']]
+        embeddings = [embedding for item in batch for embedding in item['embeddings']]
+        retained = [chunk for item in batch for chunk in item['retained']]
+        try:
+            for item in batch:
+                doc = item['doc']
+                if doc['id'] not in self._progress:
+                    self._progress[doc['id']] = {'batches': 0, 'chunks': 0, 'total': None, 'written_ids': []}
+                    if not item['has_manifest']:
+                        # No manifest: drop whatever an older indexing run stored for this document
+                        self.vector_store.delete_document(doc['id'])
+                        self._queue_keyword_update('remove_document', doc['id'])
+
+            if chunks:
+                chunk_ids = self.vector_store.add_documents(chunks, embeddings)
+                self._queue_keyword_update('add_chunks', chunk_ids, chunks)
+                self._keyword_chunks += len(chunks)
+            self.vector_store.update_chunk_metadata(retained)
+            # A moved or renamed document may have kept every chunk
+            self._queue_keyword_update('update_document_fields', retained)
+        except Exception as e:
+            for item in batch:
+                self._fail_document('write', item['doc'], e)
+                self._discard_document(item['doc'])
+            return
+
+        self._metrics['write'].record(time.perf_counter() - started, items=len(batch), units=len(chunks))
+        self._total_chunks += len(chunks)
+        self._unchanged_chunks += len(retained)
+
+        for item in batch:
+            doc = item['doc']
+            progress = self._progress[doc['id']]
+            progress['batches'] += 1
+            progress['chunks'] += len(item['chunks'])
+            progress['written_ids'].extend(chunk['id'] for chunk in item['chunks'])
+            if item['batch_total'] is not None:
+                progress['total'] = item['batch_total']
+                progress['manifest'] = item['manifest']
+                progress['existing'] = item['existing'] or {}
+            if progress['batches'] == progress['total']:
+                self._complete_document(doc, progress)
+
+    def _complete_document(self, doc, progress):
+        if not progress['manifest']:
+            self._remove_document(doc, progress)
+            return
+
+        vanished = [chunk_id for chunk_id in progress['existing'] if chunk_id not in progress['manifest']]
+        try:
+            if vanished:
+                self.vector_store.delete_chunks(vanished)
+                self._queue_keyword_update('remove_chunks', vanished, document_id=doc['id'])
+            self.manifest.replace(doc['id'], progress['manifest'],
+                                  content_hash=doc.get('content_hash'), path=doc['path'], name=doc['name'])
+        except Exception as e:
+            self._fail_document('write', doc, e)
+            self._discard_document(doc)
+            return
+
+        del self._progress[doc['id']]
+        self._processed_count += 1
+        self._deleted_chunks += len(vanished)
+        logger.info(f"Successfully indexed {doc['name']} ({progress['chunks']} new, "
+                    f"{len(progress['manifest']) - progress['chunks']} unchanged, {len(vanished)} removed chunks)")
+
+    def _remove_document(self, doc, progress):
+        try:
+            self.vector_store.delete_document(doc['id'])
+            self._queue_keyword_update('remove_document', doc['id'])
+            self.manifest.remove(doc['id'])
+        except Exception as e:
+            self._fail_document('write', doc, e)
+            self._progress.pop(doc['id'], None)
+            return
+
+        del self._progress[doc['id']]
+        self._deleted_chunks += len(progress['existing'])
+        logger.info(f"Removed {doc['name']} ({len(progress['existing'])} chunks): it no longer has text content")
+
+    def _discard_document(self, doc):
+        # Drop the new chunks already written for a document that failed part-way through;
+        # chunks it had before this run stay in place
+        progress = self._progress.pop(doc['id'], None)
+        if progress is None or not progress['written_ids']:
+            return
+        try:
+            self.vector_store.delete_chunks(progress['written_ids'])
+            self._queue_keyword_update('remove_chunks', progress['written_ids'], document_id=doc['id'])
+            self._total_chunks -= progress['chunks']
+        except Exception as e:
+            logger.error(f"Failed to remove partially indexed {doc['name']}: {str(e)}")
+
+    def _queue_keyword_update(self, method, *args, **kwargs):
+        self._keyword_updates.append((method, args, kwargs))
+
+    def _apply_keyword_updates(self):
+        updates, self._keyword_updates = self._keyword_updates, []
+        self._keyword_chunks = 0
+        if not updates:
+            return
+        try:
+            with self.keyword_index.writing():
+                for method, args, kwargs in updates:
+                    getattr(self.keyword_index, method)(*args, **kwargs)
+        except Exception as e:
+            error_msg = f"Failed to update keyword index: {str(e)}"
+            logger.error(error_msg)
+            with self._errors_lock:
+                self._errors.append(error_msg)
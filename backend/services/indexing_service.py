@@ -1,13 +1,16 @@
 from datetime import datetime, timezone
 from backend.services.sharepoint_connector import SharePointConnector
 from backend.services.local_document_connector import LocalDocumentConnector
-from backend.services.document_processor import DocumentProcessor
-from backend.services.vector_store import VectorStore
-from backend.core.recursive_splitter import RecursiveCharacterSplitter
+from backend.services.vector_store import create_vector_store
+from backend.retrieval.bm25_index import get_bm25_index, drop_bm25_index
+from backend.services.cache_backends import get_cache_backend
+from backend.services.chunk_manifest import get_chunk_manifest, drop_chunk_manifest
+from backend.services.indexing_pipeline import IndexingPipeline
 from backend.core.embeddings import EmbeddingService
 from backend.core.logger import setup_logger
 from backend.core.config import config
 from backend.models.index_state import IndexState
+from backend.retrieval.query_filters import to_timestamp
 
 logger = setup_logger(__name__)
 
@@ -21,17 +24,33 @@ class IndexingService:
             self.document_source = LocalDocumentConnector()
             logger.info("Indexing source set to local temp folder (development environment)")
 
-        self.doc_processor = DocumentProcessor()
-        self.vector_store = VectorStore()
-        self.chunker = RecursiveCharacterSplitter()
+        self.vector_store = create_vector_store()
         self.embedding_service = EmbeddingService()
         self.index_state = IndexState()
 
+    @property
+    def keyword_index(self):
+        return get_bm25_index(self.vector_store.collection_name)
+
+    @property
+    def chunk_manifest(self):
+        return get_chunk_manifest(self.vector_store.collection_name)
+
     def full_reindex(self):
+        """Rebuild every document into a shadow collection, then swap the alias to it.
+
+        Searches keep hitting the current collection until the swap, and the
+        replaced collection is kept so rollback() can restore it.
+        """
         logger.info("Starting full reindex of all source documents")
 
         try:
-            documents = self.document_source.get_all_documents()
+            delta_cursor = None
+            if self._uses_delta_feed():
+                changes = self.document_source.get_changes()
+                documents, delta_cursor = changes['documents'], changes['cursor']
+            else:
+                documents = self.document_source.get_all_documents()
 
             if not documents:
                 logger.warning("No documents found in configured source")
@@ -44,14 +63,44 @@ class IndexingService:
 
             logger.info(f"Found {len(documents)} documents to index")
 
-            self.vector_store.clear_collection()
+            shadow_name = f"{self.vector_store.alias}_{datetime.now(timezone.utc).strftime('%Y%m%d%H%M%S%f')}"
+            logger.info(f"Building shadow collection {shadow_name}")
 
-            results = self._process_documents(documents)
+            try:
+                shadow_store = create_vector_store(collection_name=shadow_name)
+                keyword_index = get_bm25_index(shadow_name)
+                manifest = get_chunk_manifest(shadow_name)
+                manifest.clear()
+                manifest.set_meta('upgraded', 1)
+
+                with keyword_index.writing():
+                    keyword_index.clear()
+                results = self._process_documents(documents, shadow_store, keyword_index, manifest)
+            except Exception:
+                self._drop_collection(shadow_name)
+                raise
+
+            if results['documents_processed'] == 0:
+                self._drop_collection(shadow_name)
+                results['status'] = 'failed'
+                logger.error(f"Full reindex indexed none of {len(documents)} documents, "
+                             f"keeping collection {self.vector_store.collection_name}")
+                return results
+
+            retired = self.index_state.swap_collection(self.vector_store.alias, shadow_name)
+            if retired:
+                self._drop_collection(retired)
 
             self.index_state.update_last_indexed_time(datetime.now(timezone.utc))
+            self.index_state.bump_generation(full=True)
+            self._invalidate_response_cache()
+            if delta_cursor:
+                self.index_state.set_delta_cursor(delta_cursor)
 
+            results.pop('unchanged_document_ids', None)
+            results['collection_name'] = shadow_name
             logger.info(f"Full reindex completed: {results['documents_processed']} documents, "
-                       f"{results['chunks_created']} chunks")
+                       f"{results['chunks_created']} chunks, now serving {shadow_name}")
 
             return results
 
@@ -69,6 +118,11 @@ class IndexingService:
                 logger.info("No previous index found, performing full reindex")
                 return self.full_reindex()
 
+            self._upgrade_collection()
+
+            if self._uses_delta_feed():
+                return self._delta_index(last_indexed)
+
             deleted_count = self._cleanup_deleted_documents()
 
             logger.info(f"Fetching documents modified since {last_indexed}")
@@ -86,13 +140,12 @@ class IndexingService:
 
             logger.info(f"Found {len(modified_docs)} modified documents")
 
-            for doc in modified_docs:
-                self.vector_store.delete_document(doc['id'])
-
+            # Modified documents are diffed against their chunk manifest by the pipeline
             results = self._process_documents(modified_docs)
             results['documents_deleted'] = deleted_count
 
             self.index_state.update_last_indexed_time(datetime.now(timezone.utc))
+            self.index_state.bump_generation(self._changed_document_ids(modified_docs, results))
 
             logger.info(f"Incremental index completed: {results['documents_processed']} documents, "
                        f"{results['chunks_created']} chunks, {deleted_count} deleted")
@@ -103,6 +156,152 @@ class IndexingService:
             logger.error(f"Incremental index failed: {str(e)}")
             raise
 
+    def index_paths(self, paths):
+        """Index only the given source paths, e.g. files reported by a filesystem watcher."""
+        last_indexed = self.index_state.get_last_indexed_time()
+        if not last_indexed or not self._uses_delta_feed():
+            return self.incremental_index()
+
+        self._upgrade_collection()
+        logger.info(f"Indexing {len(paths)} changed paths")
+        return self._delta_index(last_indexed, paths=paths)
+
+    def _uses_delta_feed(self):
+        return getattr(self.document_source, 'supports_changes', False)
+
+    def _delta_index(self, last_indexed, paths=None):
+        """Apply adds, modifications and deletions from the source's change feed."""
+        cursor = self.index_state.get_delta_cursor()
+        if paths:
+            changes = self.document_source.get_changes(cursor, paths=paths)
+        else:
+            changes = self.document_source.get_changes(cursor)
+
+        if changes['full']:
+            # No usable cursor: the feed listed every document, so diff it against the index
+            current_ids = {doc['id'] for doc in changes['documents']}
+            indexed_ids = set(self.chunk_manifest.document_ids())
+            deleted_ids = indexed_ids - current_ids
+            documents = [
+                doc for doc in changes['documents']
+                if doc['id'] not in indexed_ids
+                or datetime.fromisoformat(doc['modified'].replace('Z', '+00:00')) > last_indexed
+            ]
+        else:
+            deleted_ids = set(changes['deleted_ids']) & set(self.chunk_manifest.document_ids())
+            documents = changes['documents']
+
+        deleted_count = self._remove_documents(deleted_ids)
+        logger.info(f"Change feed returned {len(documents)} modified and {deleted_count} deleted documents")
+
+        if documents:
+            results = self._process_documents(documents)
+        else:
+            results = {
+                'status': 'completed',
+                'documents_processed': 0,
+                'chunks_created': 0,
+                'errors': []
+            }
+        results['documents_deleted'] = deleted_count
+
+        self.index_state.update_last_indexed_time(datetime.now(timezone.utc))
+        if documents:
+            self.index_state.bump_generation(self._changed_document_ids(documents, results))
+        self.index_state.set_delta_cursor(changes['cursor'])
+
+        logger.info(f"Incremental index completed: {results['documents_processed']} documents, "
+                   f"{results['chunks_created']} chunks, {deleted_count} deleted")
+        return results
+
+    def rollback(self):
+        """Point the alias back at the collection replaced by the last full reindex."""
+        alias = self.vector_store.alias
+        previous = self.index_state.get_previous_collection(alias)
+        if not previous:
+            raise ValueError("No previous collection to roll back to")
+
+        self.index_state.rollback_collection(alias)
+        self.index_state.bump_generation(full=True)
+        self._invalidate_response_cache()
+        logger.warning(f"Rolled back collection alias {alias} to {previous}")
+        return {
+            'collection_name': previous,
+            'previous_collection': self.index_state.get_previous_collection(alias)
+        }
+
+    def _upgrade_collection(self):
+        """Bring a collection indexed by an earlier version up to date, once.
+
+        Documents stored before the chunk manifest existed are added to the
+        document registry, so deletions, /index/documents and /index/stats see
+        them. Chunks stored before date filters existed get the numeric
+        modified_ts the vector store and keyword index filter on.
+        """
+        chunk_manifest = self.chunk_manifest
+        if chunk_manifest.get_meta('upgraded'):
+            return
+
+        keyword_index = self.keyword_index
+        try:
+            # Under the writer lock, so concurrent indexing runs upgrade only once
+            with keyword_index.writing():
+                if chunk_manifest.get_meta('upgraded'):
+                    return
+
+                registered = set(chunk_manifest.document_ids())
+                unregistered = {}
+                chunks = []
+                for chunk in self.vector_store.get_all_chunks():
+                    metadata = chunk['metadata']
+                    document_id = metadata.get('document_id')
+                    if document_id and document_id not in registered:
+                        entry = unregistered.setdefault(document_id, {
+                            'name': metadata.get('document_name', ''),
+                            'path': metadata.get('document_path', ''),
+                            'chunks_count': 0,
+                            'indexed_at': metadata.get('indexed_at', '')
+                        })
+                        entry['chunks_count'] += 1
+
+                    if metadata.get('modified_ts') is not None or not metadata.get('modified'):
+                        continue
+                    try:
+                        metadata['modified_ts'] = to_timestamp(metadata['modified'])
+                    except ValueError:
+                        continue
+                    chunks.append(chunk)
+
+                if unregistered:
+                    chunk_manifest.register_documents(unregistered)
+                    logger.info(f"Registered {len(unregistered)} documents indexed before the document registry")
+                if chunks:
+                    self.vector_store.update_chunk_metadata(chunks)
+                    keyword_index.ensure_built(self.vector_store.get_all_chunks)
+                    keyword_index.update_document_fields(chunks)
+                    logger.info(f"Backfilled modified_ts on {len(chunks)} chunks")
+                chunk_manifest.set_meta('upgraded', 1)
+        except Exception as e:
+            logger.warning(f"Failed to upgrade collection {self.vector_store.collection_name}, "
+                           f"retrying on the next run: {str(e)}")
+
+    def _drop_collection(self, collection_name):
+        try:
+            self.vector_store.drop_collection(collection_name)
+            drop_bm25_index(collection_name)
+            drop_chunk_manifest(collection_name)
+        except Exception as e:
+            logger.warning(f"Failed to drop collection {collection_name}: {str(e)}")
+
+    def _invalidate_response_cache(self):
+        # After a full reindex no cached answer survives the generation check, so
+        # free the space in the shared backend for every worker at once
+        try:
+            get_cache_backend().clear()
+            logger.info("Response cache invalidated after indexing")
+        except Exception as e:
+            logger.warning(f"Failed to invalidate response cache: {str(e)}")
+
     def _cleanup_deleted_documents(self):
         try:
             logger.info("Checking for deleted documents in configured source")
@@ -110,7 +309,7 @@ class IndexingService:
             current_docs = self.document_source.get_all_documents()
             current_doc_ids = {doc['id'] for doc in current_docs}
 
-            indexed_doc_ids = set(self.vector_store.get_all_document_ids())
+            indexed_doc_ids = set(self.chunk_manifest.document_ids())
 
             deleted_doc_ids = indexed_doc_ids - current_doc_ids
 
@@ -120,106 +319,99 @@ class IndexingService:
 
             logger.info(f"Found {len(deleted_doc_ids)} deleted documents")
 
-            for doc_id in deleted_doc_ids:
-                try:
-                    self.vector_store.delete_document(doc_id)
-                    logger.info(f"Removed deleted document from index: {doc_id}")
-                except Exception as e:
-                    logger.error(f"Failed to remove document {doc_id}: {str(e)}")
-
-            logger.info(f"Cleanup completed: {len(deleted_doc_ids)} documents removed from index")
-            return len(deleted_doc_ids)
+            removed = self._remove_documents(deleted_doc_ids)
+            logger.info(f"Cleanup completed: {removed} documents removed from index")
+            return removed
 
         except Exception as e:
             logger.error(f"Cleanup deleted documents failed: {str(e)}")
             return 0
 
-    def _process_documents(self, documents):
-        processed_count = 0
-        total_chunks = 0
-        errors = []
-
-        for doc in documents:
-            try:
-                logger.info(f"Processing document: {doc['name']}")
-
-                content = self.document_source.download_file_content(doc['path'])
-
-                pages_data = self.doc_processor.extract_text_with_pages(content, doc['name'])
-
-                if not pages_data:
-                    logger.warning(f"Skipping {doc['name']}: no text content extracted")
-                    continue
-
-                metadata = {
-                    'document_id': doc['id'],
-                    'document_name': doc['name'],
-                    'document_path': doc['path'],
-                    'modified': doc['modified'],
-                    'author': doc['author'],
-                    'url': doc.get('web_url', '')
-                }
-
-                chunks = self.chunker.chunk_text_with_pages(pages_data, metadata)
-
-                if not chunks:
-                    logger.warning(f"No chunks created for {doc['name']}")
-                    continue
-
-                chunk_texts = [chunk['text'] for chunk in chunks]
-                embeddings = self.embedding_service.generate_embeddings(chunk_texts)
-
-                self.vector_store.add_documents(chunks, embeddings)
-
-                processed_count += 1
-                total_chunks += len(chunks)
-
-                logger.info(f"Successfully indexed {doc['name']} ({len(chunks)} chunks)")
+    def _remove_documents(self, document_ids):
+        if not document_ids:
+            return 0
 
-            except Exception as e:
-                error_msg = f"Failed to process {doc['name']}: {str(e)}"
-                logger.error(error_msg)
-                errors.append(error_msg)
+        keyword_index = self.keyword_index
+        chunk_manifest = self.chunk_manifest
+        with keyword_index.writing():
+            keyword_index.ensure_built(self.vector_store.get_all_chunks)
+            for doc_id in document_ids:
+                try:
+                    self.vector_store.delete_document(doc_id)
+                    keyword_index.remove_document(doc_id)
+                    chunk_manifest.remove(doc_id)
+                    logger.info(f"Removed deleted document from index: {doc_id}")
+                except Exception as e:
+                    logger.error(f"Failed to remove document {doc_id}: {str(e)}")
 
-        return {
-            'status': 'completed' if not errors else 'completed_with_errors',
-            'documents_processed': processed_count,
-            'chunks_created': total_chunks,
-            'errors': errors
-        }
+        self.index_state.bump_generation(document_ids)
+        return len(document_ids)
+
+    def _process_documents(self, documents, vector_store=None, keyword_index=None, manifest=None):
+        vector_store = vector_store or create_vector_store(collection_name=self.vector_store.collection_name)
+        keyword_index = keyword_index or get_bm25_index(vector_store.collection_name)
+        manifest = manifest or get_chunk_manifest(vector_store.collection_name)
+
+        pipeline = IndexingPipeline(
+            self.document_source,
+            self.embedding_service,
+            vector_store,
+            keyword_index,
+            manifest
+        )
+        # Rebuilt first if missing or unreadable, so the run's saves do not drop older documents
+        keyword_index.ensure_built(vector_store.get_all_chunks)
+        results = pipeline.run(documents)
+
+        if results['documents_unchanged']:
+            logger.info(f"Skipped {results['documents_unchanged']} documents whose content hash is unchanged")
+        return results
+
+    def _changed_document_ids(self, documents, results):
+        # Documents skipped on an unchanged content hash keep their cached answers valid
+        unchanged = set(results.pop('unchanged_document_ids', ()))
+        return [doc['id'] for doc in documents if doc['id'] not in unchanged]
 
     def get_index_stats(self):
         last_indexed = self.index_state.get_last_indexed_time()
+        chunk_manifest = self.chunk_manifest.stats()
         return {
             'total_chunks': self.vector_store.get_document_count(),
+            'total_documents': chunk_manifest['documents'],
             'last_indexed': last_indexed.isoformat() if last_indexed else None,
-            'collection_name': self.vector_store.collection_name
+            'index_generation': self.index_state.get_generation(),
+            'collection_name': self.vector_store.collection_name,
+            'collection_alias': self.vector_store.alias,
+            'previous_collection': self.index_state.get_previous_collection(self.vector_store.alias),
+            'vector_index': self.vector_store.get_index_params(),
+            'keyword_index': self.keyword_index.stats(),
+            'chunk_manifest': chunk_manifest,
+            'embedding_cache': self.embedding_service.cache_stats()
         }
 
-    def get_indexed_documents(self):
+    def get_indexed_documents(self, limit=100, cursor=None):
+        """One page of the document registry; pass the returned next_cursor to get the next page."""
         try:
-            chunks = self.vector_store.get_all_chunks()
-            documents = {}
-            for chunk in chunks:
-                metadata = chunk.get('metadata', {})
-                doc_id = metadata.get('document_id')
-                if doc_id and doc_id not in documents:
-                    documents[doc_id] = {
-                        'id': doc_id,
-                        'name': metadata.get('document_name', 'Unknown'),
-                        'path': metadata.get('document_path', ''),
-                        'chunks_count': 0
-                    }
-                if doc_id:
-                    documents[doc_id]['chunks_count'] += 1
-            return list(documents.values())
+            chunk_manifest = self.chunk_manifest
+            documents = chunk_manifest.list_documents(limit=limit, after=cursor)
+            return {
+                'documents': documents,
+                'total': chunk_manifest.stats()['documents'],
+                'next_cursor': documents[-1]['id'] if len(documents) == limit else None
+            }
         except Exception as e:
             logger.error(f"Failed to get indexed documents: {str(e)}")
             raise
 
     def delete_document(self, document_id: str):
         try:
-            self.vector_store.delete_document(document_id)
+            keyword_index = self.keyword_index
+            with keyword_index.writing():
+                keyword_index.ensure_built(self.vector_store.get_all_chunks)
+                self.vector_store.delete_document(document_id)
+                keyword_index.remove_document(document_id)
+                self.chunk_manifest.remove(document_id)
+            self.index_state.bump_generation([document_id])
             logger.info(f"Deleted document {document_id} via API")
         except Exception as e:
             logger.error(f"Failed to delete document: {str(e)}")
@@ -1,8 +1,11 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from hashlib import sha1
 from pathlib import Path
 from backend.core.config import config
 from backend.core.logger import setup_logger
+from backend.services.file_manifest import FileManifest
 
 logger = setup_logger(__name__)
 
@@ -13,35 +16,137 @@ class LocalDocumentConnector:
         self.supported_extensions = {'.pdf', '.docx', '.txt', '.xlsx', '.md'}
         self.root_path.mkdir(parents=True, exist_ok=True)
         self.site_url = f"file://{self.root_path.as_posix()}/"
+        self.supports_changes = config.local_manifest_enabled
+        self._manifest = None
 
         logger.info(f"Using local documents directory: {self.root_path}")
 
-    def get_all_documents(self):
-        documents = []
-
-        for file_path in self.root_path.rglob('*'):
-            if not file_path.is_file():
-                continue
-            if file_path.suffix.lower() not in self.supported_extensions:
-                continue
+    @property
+    def manifest(self):
+        if self._manifest is None:
+            self._manifest = FileManifest(config.local_manifest_path)
+        return self._manifest
 
-            relative_path = file_path.relative_to(self.root_path).as_posix()
-            modified = datetime.fromtimestamp(file_path.stat().st_mtime, timezone.utc)
-
-            documents.append({
-                'id': self._build_document_id(relative_path),
-                'name': file_path.name,
-                'path': relative_path,
-                'modified': modified.isoformat().replace('+00:00', 'Z'),
-                'size': file_path.stat().st_size,
-                'author': 'local',
-                'download_url': '',
-                'web_url': f"{self.site_url}{relative_path}"
-            })
+    def get_all_documents(self):
+        documents = [
+            self._build_document_info(relative_path, size, mtime_ns)
+            for relative_path, (size, mtime_ns) in self._scan().items()
+        ]
 
         logger.info(f"Retrieved {len(documents)} documents from local folder")
         return documents
 
+    def _scan(self, directory=None, prefix=''):
+        """Walk a tree with os.scandir and return {relative_path: (size, mtime_ns)}.
+
+        DirEntry caches its stat result, so each file costs a single stat call,
+        and directory entries are classified from the directory listing itself.
+        """
+        files = {}
+        pending = [(str(directory or self.root_path), prefix)]
+
+        while pending:
+            directory, prefix = pending.pop()
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        relative_path = f"{prefix}{entry.name}"
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                pending.append((entry.path, f"{relative_path}/"))
+                            elif entry.is_file() and self._is_supported(entry.name):
+                                stat = entry.stat()
+                                files[relative_path] = (stat.st_size, stat.st_mtime_ns)
+                        except OSError as e:
+                            logger.warning(f"Skipping unreadable entry {relative_path}: {str(e)}")
+            except OSError as e:
+                logger.warning(f"Skipping unreadable directory {directory}: {str(e)}")
+
+        return files
+
+    def _stat_paths(self, paths):
+        """Stat only the given relative paths, descending into those that are directories."""
+        files = {}
+        for relative_path in paths:
+            absolute_path = self.root_path / relative_path
+            if not self._is_within_root(absolute_path.resolve()):
+                continue
+            try:
+                stat = absolute_path.stat()
+            except OSError:
+                continue  # deleted; picked up from the manifest
+
+            if absolute_path.is_dir():
+                files.update(self._scan(absolute_path, f"{relative_path}/"))
+            elif self._is_supported(absolute_path.name):
+                files[relative_path] = (stat.st_size, stat.st_mtime_ns)
+        return files
+
+    def get_changes(self, cursor=None, paths=None):
+        """Diff the tree (or just `paths`) against the file manifest.
+
+        Same contract as SharePointConnector.get_changes: returns {'documents',
+        'deleted_ids', 'full', 'cursor'}. Files whose size and mtime match the
+        manifest are not read at all; files that were only touched hash the same
+        and are not reported. If `cursor` does not match the manifest's last scan
+        (e.g. the previous run failed before saving it), every file is returned
+        with full=True so the caller can diff against its index.
+        """
+        full = not (
+            cursor
+            and cursor.get('root') == str(self.root_path)
+            and cursor.get('scan_id') == self.manifest.get_scan_id()
+        )
+
+        if paths and not full:
+            relative_paths = {self._relative_path(path) for path in paths}
+            relative_paths.discard(None)
+            current = self._stat_paths(relative_paths)
+            known = self.manifest.get_under(relative_paths)
+        else:
+            current = self._scan()
+            known = self.manifest.get_all()
+
+        upserts = {}
+        changed = []
+        to_hash = []
+        for relative_path, (size, mtime_ns) in current.items():
+            row = known.get(relative_path)
+            if row and row[0] == size and row[1] == mtime_ns:
+                if full:
+                    changed.append((relative_path, size, mtime_ns, row[2]))
+                continue
+            to_hash.append((relative_path, size, mtime_ns))
+
+        # Hash reads are I/O bound (and slow on network shares), so overlap them
+        with ThreadPoolExecutor(max_workers=config.local_scan_hash_workers) as executor:
+            hashes = executor.map(lambda item: self._hash_file(item[0]), to_hash)
+            for (relative_path, size, mtime_ns), content_hash in zip(to_hash, hashes):
+                if content_hash is None:
+                    if full:
+                        changed.append((relative_path, size, mtime_ns, None))
+                    continue
+                upserts[relative_path] = (size, mtime_ns, content_hash)
+                row = known.get(relative_path)
+                if full or not row or row[2] != content_hash:
+                    changed.append((relative_path, size, mtime_ns, content_hash))
+
+        deleted_paths = [path for path in known if path not in current]
+        scan_id = self.manifest.apply(upserts, deleted_paths)
+
+        documents = [
+            self._build_document_info(relative_path, size, mtime_ns, content_hash)
+            for relative_path, size, mtime_ns, content_hash in changed
+        ]
+        logger.info(f"Local scan found {len(documents)} {'files' if full else 'changed files'}, "
+                    f"{len(deleted_paths)} deleted, {len(upserts)} hashed")
+        return {
+            'documents': documents,
+            'deleted_ids': sorted(self._build_document_id(path) for path in deleted_paths),
+            'full': full,
+            'cursor': {'root': str(self.root_path), 'scan_id': scan_id}
+        }
+
     def get_documents_modified_since(self, last_indexed_time):
         modified_documents = []
 
@@ -65,6 +170,46 @@ class LocalDocumentConnector:
         with open(resolved_path, 'rb') as f:
             return f.read()
 
+    def _build_document_info(self, relative_path, size, mtime_ns, content_hash=None):
+        modified = datetime.fromtimestamp(mtime_ns / 1e9, timezone.utc)
+        document = {
+            'id': self._build_document_id(relative_path),
+            'name': relative_path.rsplit('/', 1)[-1],
+            'path': relative_path,
+            'modified': modified.isoformat().replace('+00:00', 'Z'),
+            'size': size,
+            'author': 'local',
+            'download_url': '',
+            'web_url': f"{self.site_url}{relative_path}"
+        }
+        if content_hash:
+            # Same form as the hash the indexing pipeline computes from downloaded bytes
+            document['content_hash'] = f"sha1:{content_hash}"
+        return document
+
+    def _hash_file(self, relative_path):
+        digest = sha1()
+        try:
+            with open(self.root_path / relative_path, 'rb') as f:
+                for block in iter(lambda: f.read(1024 * 1024), b''):
+                    digest.update(block)
+        except OSError as e:
+            logger.warning(f"Could not hash {relative_path}: {str(e)}")
+            return None
+        return digest.hexdigest()
+
+    def _relative_path(self, path):
+        candidate = Path(path)
+        if not candidate.is_absolute():
+            candidate = self.root_path / candidate
+        try:
+            return candidate.relative_to(self.root_path).as_posix()
+        except ValueError:
+            return None
+
+    def _is_supported(self, file_name):
+        return os.path.splitext(file_name)[1].lower() in self.supported_extensions
+
     def _build_document_id(self, relative_path):
         return sha1(relative_path.encode('utf-8')).hexdigest()
 
@@ -0,0 +1,635 @@
+import json
+import shutil
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+import numpy as np
+from backend.core.config import config
+from backend.core.logger import setup_logger
+from backend.services.vector_store import VectorStoreBase
+
+logger = setup_logger(__name__)
+
+DTYPES = {'float32': np.float32, 'float16': np.float16, 'int8': np.int8}
+SPACES = ('l2', 'cosine', 'ip')
+# Rows scanned per step; small enough that the float32 copy of a float16/int8 block stays in cache
+BLOCK_ROWS = 4096
+WHERE_OPERATORS = {'$eq': '=', '$ne': '!=', '$gt': '>', '$gte': '>=', '$lt': '<', '$lte': '<='}
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+class NumpyVectorIndex:
+    """Exact vector search over memory-mapped matrices, one directory per collection.
+
+    Vectors are appended to `vectors.<revision>.bin` in `dtype`. For float16 and
+    int8 a float32 copy (`full.<revision>.bin`) is kept on disk and only the best
+    `rescore_factor * top_k` candidates are re-scored from it. Each row also has
+    its squared norm and int8 scale in `rows.<revision>.bin` and a tombstone byte
+    in `deleted.<revision>.bin`. Chunk IDs, texts and metadata live in SQLite
+    (`index.db`) next to the committed row count, so a reader only ever looks at
+    rows whose write has finished. Deletes set the tombstone, which other
+    processes see at once through the shared mapping; once more than
+    `compaction_ratio` of the rows are tombstones, the live rows are rewritten
+    under the next revision. Every write holds SQLite's write lock from reading
+    the row count to committing, so writers in different processes never
+    claim the same ordinals.
+    """
+
+    def __init__(self, directory, space='l2', dtype='float32', rescore_factor=4, compaction_ratio=0.25):
+        if space not in SPACES:
+            raise ValueError(f"Unsupported vector space: {space}")
+        if dtype not in DTYPES:
+            raise ValueError(f"Unsupported vector dtype: {dtype}")
+
+        self.directory = Path(directory)
+        self.rescore_factor = max(1, rescore_factor)
+        self.compaction_ratio = compaction_ratio
+        self._lock = threading.RLock()
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.directory / 'index.db'), check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS chunks ("
+            "ordinal INTEGER PRIMARY KEY, id TEXT NOT NULL UNIQUE, document_id TEXT, text TEXT, metadata TEXT)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS chunks_document ON chunks (document_id)")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        # Like HNSW parameters, the distance and storage type are fixed when the collection is created
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO meta (key, value) VALUES (?, ?)",
+            [('space', space), ('dtype', dtype), ('count', '0'), ('dimensions', '0'), ('revision', '0')]
+        )
+        self._conn.commit()
+        self._load()
+
+    # ──────────────── FILES ────────────────
+
+    def _path(self, kind, revision=None):
+        return self.directory / f"{kind}.{self.revision if revision is None else revision}.bin"
+
+    def _load(self):
+        while True:
+            meta = dict(self._conn.execute("SELECT key, value FROM meta").fetchall())
+            self.space = meta['space']
+            self.dtype = meta['dtype']
+            self.count = int(meta['count'])
+            self.dimensions = int(meta['dimensions'])
+            self.revision = int(meta['revision'])
+            self._data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+            try:
+                self._map_files()
+                return
+            except FileNotFoundError:
+                # Compacted by another process between reading the revision and opening its files
+                latest = self._conn.execute("SELECT value FROM meta WHERE key = 'revision'").fetchone()[0]
+                if int(latest) == self.revision:
+                    raise
+
+    def _map_files(self):
+        if not self.count:
+            self._vectors = self._full = self._rows = self._deleted = None
+            return
+
+        shape = (self.count, self.dimensions)
+        self._vectors = np.memmap(self._path('vectors'), dtype=DTYPES[self.dtype], mode='r', shape=shape)
+        if self.quantized:
+            self._full = np.memmap(self._path('full'), dtype=np.float32, mode='r', shape=shape)
+        else:
+            self._full = self._vectors
+        self._rows = np.memmap(self._path('rows'), dtype=np.float32, mode='r', shape=(self.count, 2))
+        self._deleted = np.memmap(self._path('deleted'), dtype=np.uint8, mode='r+', shape=(self.count,))
+
+    @property
+    def quantized(self):
+        return self.dtype != 'float32'
+
+    def _refresh(self):
+        # data_version only changes when another connection (process) committed
+        version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+        if version != self._data_version:
+            self._load()
+
+    def _write_rows(self, kind, start, array, revision=None):
+        array = np.ascontiguousarray(array)
+        path = self._path(kind, revision)
+        with open(path, 'r+b' if path.exists() else 'w+b') as f:
+            # Rows past the committed count (left by a failed write) are overwritten
+            f.seek(start * (array.nbytes // len(array)))
+            f.write(array.tobytes())
+
+    def _encode(self, vectors):
+        if self.dtype == 'int8':
+            scales = np.abs(vectors).max(axis=1) / 127.0
+            scales[scales == 0] = 1.0
+            codes = np.clip(np.rint(vectors / scales[:, None]), -127, 127).astype(np.int8)
+            return codes, scales.astype(np.float32)
+        return vectors.astype(DTYPES[self.dtype]), np.ones(len(vectors), dtype=np.float32)
+
+    # ──────────────── WRITES ────────────────
+
+    @contextmanager
+    def _writing(self):
+        """Take the SQLite write lock, then load what other processes committed, then commit on exit."""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._refresh()
+                yield
+                self._conn.commit()
+            except BaseException:
+                self._conn.rollback()
+                # Drop in-memory state that assumed the write would commit
+                self._load()
+                raise
+
+    def add(self, ids, embeddings, texts, metadatas):
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        if vectors.ndim != 2 or len(vectors) != len(ids):
+            raise ValueError("Embeddings must be one vector per chunk ID")
+
+        with self._lock:
+            with self._writing():
+                if not self.dimensions:
+                    self.dimensions = vectors.shape[1]
+                elif vectors.shape[1] != self.dimensions:
+                    raise ValueError(f"Embedding dimension {vectors.shape[1]} does not match index dimension {self.dimensions}")
+
+                # Re-adding an ID replaces the stored chunk
+                self._delete_ordinals(self._ordinals_for_ids(ids))
+
+                start = self.count
+                codes, scales = self._encode(vectors)
+                norms = np.einsum('ij,ij->i', vectors, vectors)
+                self._write_rows('vectors', start, codes)
+                if self.quantized:
+                    self._write_rows('full', start, vectors)
+                self._write_rows('rows', start, np.stack([norms, scales], axis=1).astype(np.float32))
+                self._write_rows('deleted', start, np.zeros(len(ids), dtype=np.uint8))
+
+                self._conn.executemany(
+                    "INSERT INTO chunks (ordinal, id, document_id, text, metadata) VALUES (?, ?, ?, ?, ?)",
+                    [
+                        (start + position, chunk_id, metadata.get('document_id'), text, json.dumps(metadata))
+                        for position, (chunk_id, text, metadata) in enumerate(zip(ids, texts, metadatas))
+                    ]
+                )
+                self._set_meta(count=start + len(ids), dimensions=self.dimensions)
+                self.count = start + len(ids)
+                # Mapped before the commit, while no other process can compact these files away
+                self._map_files()
+
+    def update_metadata(self, ids, metadatas):
+        with self._writing():
+            self._conn.executemany(
+                "UPDATE chunks SET document_id = ?, metadata = ? WHERE id = ?",
+                [(metadata.get('document_id'), json.dumps(metadata), chunk_id) for chunk_id, metadata in zip(ids, metadatas)]
+            )
+
+    def delete_ids(self, ids):
+        with self._writing():
+            self._delete_ordinals(self._ordinals_for_ids(ids))
+        self._compact_if_needed()
+
+    def delete_document(self, document_id):
+        with self._writing():
+            rows = self._conn.execute("SELECT ordinal FROM chunks WHERE document_id = ?", (document_id,)).fetchall()
+            self._delete_ordinals([row[0] for row in rows])
+        self._compact_if_needed()
+
+    def _delete_ordinals(self, ordinals):
+        if not ordinals:
+            return
+
+        # Tombstone first: searches in flight skip the rows before they disappear from SQLite
+        self._deleted[np.asarray(ordinals)] = 1
+        self._deleted.flush()
+        self._conn.executemany("DELETE FROM chunks WHERE ordinal = ?", [(ordinal,) for ordinal in ordinals])
+
+    def _compact_if_needed(self):
+        with self._lock:
+            live = self._conn.execute("SELECT COUNT(*) FROM chunks").fetchone()[0]
+            if self.count - live > self.compaction_ratio * self.count:
+                self.compact()
+
+    def compact(self):
+        """Rewrite the live rows contiguously under the next revision and renumber them."""
+        with self._lock:
+            with self._writing():
+                live = np.array(
+                    [row[0] for row in self._conn.execute("SELECT ordinal FROM chunks ORDER BY ordinal")],
+                    dtype=np.int64
+                )
+                old_revision, revision = self.revision, self.revision + 1
+                kinds = ['vectors', 'rows', 'deleted'] + (['full'] if self.quantized else [])
+                sources = {'vectors': self._vectors, 'full': self._full, 'rows': self._rows, 'deleted': self._deleted}
+
+                for kind in kinds:
+                    self._path(kind, revision).unlink(missing_ok=True)
+                    for start in range(0, len(live), BLOCK_ROWS):
+                        block = live[start:start + BLOCK_ROWS]
+                        self._write_rows(kind, start, sources[kind][block], revision)
+
+                # Ascending renumbering never collides: every new ordinal is <= the old one
+                self._conn.executemany(
+                    "UPDATE chunks SET ordinal = ? WHERE ordinal = ?",
+                    [(new, int(old)) for new, old in enumerate(live) if new != old]
+                )
+                self._set_meta(count=len(live), revision=revision)
+                removed = self.count - len(live)
+                self._load()
+
+            for kind in kinds:
+                # Readers still holding the old mapping keep the unlinked file until they reload
+                self._path(kind, old_revision).unlink(missing_ok=True)
+            logger.info(f"Compacted vector index {self.directory.name}: removed {removed} deleted rows")
+
+    def clear(self):
+        with self._lock:
+            with self._writing():
+                old_revision = self.revision
+                self._conn.execute("DELETE FROM chunks")
+                self._set_meta(count=0, dimensions=0, revision=old_revision + 1)
+                self._load()
+            for kind in ('vectors', 'full', 'rows', 'deleted'):
+                self._path(kind, old_revision).unlink(missing_ok=True)
+
+    def _set_meta(self, **values):
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+            [(key, str(value)) for key, value in values.items()]
+        )
+
+    def close(self):
+        with self._lock:
+            self._vectors = self._full = self._rows = self._deleted = None
+            self._conn.close()
+
+    # ──────────────── SEARCH ────────────────
+
+    def search(self, query_embedding, top_k=5, where=None):
+        return self.search_many([query_embedding], top_k=top_k, where=where)[0]
+
+    def search_many(self, query_embeddings, top_k=5, where=None):
+        """Search several queries in one pass over the matrix; returns one result list per query."""
+        queries = np.asarray(query_embeddings, dtype=np.float32).reshape(len(query_embeddings), -1)
+
+        # A compaction renumbers rows; if one lands mid-search the search is repeated
+        for _ in range(3):
+            with self._lock:
+                self._refresh()
+                if not self.count:
+                    return [[] for _ in queries]
+                vectors, full, rows, deleted = self._vectors, self._full, self._rows, self._deleted
+                revision = self.revision
+                ordinals = self._filter_ordinals(where) if where else None
+
+            if ordinals is not None and not len(ordinals):
+                return [[] for _ in queries]
+
+            nearest = self._top_k(vectors, full, rows, deleted, queries, top_k, ordinals)
+            wanted = sorted({ordinal for candidates, _ in nearest for ordinal in candidates.tolist()})
+
+            with self._lock:
+                self._conn.execute("BEGIN")
+                try:
+                    current = int(self._conn.execute("SELECT value FROM meta WHERE key = 'revision'").fetchone()[0])
+                    found = self._rows_for_ordinals(wanted) if current == revision else None
+                finally:
+                    self._conn.execute("COMMIT")
+
+            if found is None:
+                continue
+
+            all_results = []
+            for candidates, distances in nearest:
+                results = []
+                for ordinal, distance in zip(candidates.tolist(), distances.tolist()):
+                    row = found.get(ordinal)
+                    if row:
+                        chunk_id, text, metadata = row
+                        results.append({'id': chunk_id, 'text': text or "", 'metadata': metadata, 'distance': distance})
+                all_results.append(results)
+            return all_results
+
+        raise RuntimeError("Vector index kept changing during search")
+
+    def _top_k(self, vectors, full, rows, deleted, queries, top_k, ordinals=None):
+        """Return [(ordinals, distances)] of the nearest live rows for each query, best first."""
+        total = len(vectors) if ordinals is None else len(ordinals)
+        query_norms = np.einsum('ij,ij->i', queries, queries)
+
+        # Each block is read once for every query: one matrix product instead of one per query
+        dots = np.empty((total, len(queries)), dtype=np.float32)
+        for start in range(0, total, BLOCK_ROWS):
+            stop = min(total, start + BLOCK_ROWS)
+            block = vectors[start:stop] if ordinals is None else vectors[ordinals[start:stop]]
+            dots[start:stop] = block.astype(np.float32, copy=False) @ queries.T
+
+        selected_rows = rows if ordinals is None else rows[ordinals]
+        if self.dtype == 'int8':
+            dots *= selected_rows[:, 1:2]
+        distances = self._distance(dots, selected_rows[:, 0:1], query_norms[None, :])
+        distances[(deleted if ordinals is None else deleted[ordinals]) != 0] = np.inf
+
+        keep = min(total, top_k * self.rescore_factor if self.quantized else top_k)
+        nearest = []
+        for position, query in enumerate(queries):
+            column = distances[:, position]
+            best = np.argpartition(column, keep - 1)[:keep] if keep < total else np.arange(total)
+            best = best[np.isfinite(column[best])]
+            candidates = best if ordinals is None else ordinals[best]
+
+            if self.quantized and len(candidates):
+                # Full-precision rescoring of the shortlist; sorted ordinals read the file sequentially
+                order = np.argsort(candidates)
+                candidates = candidates[order]
+                scores = self._distance(full[candidates] @ query, rows[candidates, 0], query_norms[position])
+            else:
+                scores = column[best]
+
+            order = np.argsort(scores, kind='stable')[:top_k]
+            nearest.append((candidates[order], scores[order]))
+        return nearest
+
+    def _distance(self, dots, norms, query_norm):
+        # Same conventions as Chroma: squared L2, 1 - cosine similarity, 1 - inner product
+        if self.space == 'l2':
+            return np.maximum(norms - 2 * dots + query_norm, 0)
+        if self.space == 'cosine':
+            return 1 - dots / np.maximum(np.sqrt(norms * query_norm), 1e-12)
+        return 1 - dots
+
+    def _filter_ordinals(self, where):
+        clause, params = self._where_sql(where)
+        rows = self._conn.execute(
+            f"SELECT ordinal FROM chunks WHERE ordinal < ? AND {clause} ORDER BY ordinal", [self.count, *params]
+        ).fetchall()
+        return np.array([row[0] for row in rows], dtype=np.int64)
+
+    def _where_sql(self, where):
+        """Translate a Chroma `where` filter into SQL over the JSON metadata."""
+        clauses, params = [], []
+        for key, condition in where.items():
+            if key in ('$and', '$or'):
+                parts = [self._where_sql(part) for part in condition]
+                clauses.append('(' + f" {key[1:].upper()} ".join(part for part, _ in parts) + ')')
+                for _, part_params in parts:
+                    params.extend(part_params)
+                continue
+
+            field = "json_extract(metadata, ?)"
+            path = f'$."{key}"'
+            if not isinstance(condition, dict):
+                condition = {'$eq': condition}
+            for operator, value in condition.items():
+                if operator in ('$in', '$nin'):
+                    placeholders = ', '.join('?' for _ in value)
+                    negate = 'NOT ' if operator == '$nin' else ''
+                    clauses.append(f"{field} {negate}IN ({placeholders})")
+                    params.extend([path, *value])
+                elif operator in WHERE_OPERATORS:
+                    clauses.append(f"{field} {WHERE_OPERATORS[operator]} ?")
+                    params.extend([path, value])
+                else:
+                    raise ValueError(f"Unsupported filter operator: {operator}")
+
+        return '(' + ' AND '.join(clauses or ['1']) + ')', params
+
+    # ──────────────── READS ────────────────
+
+    def _ordinals_for_ids(self, ids):
+        ordinals = []
+        for start in range(0, len(ids), 500):
+            batch = list(ids[start:start + 500])
+            placeholders = ', '.join('?' for _ in batch)
+            ordinals.extend(
+                row[0] for row in self._conn.execute(f"SELECT ordinal FROM chunks WHERE id IN ({placeholders})", batch)
+            )
+        return ordinals
+
+    def _rows_for_ordinals(self, ordinals):
+        if not ordinals:
+            return {}
+        placeholders = ', '.join('?' for _ in ordinals)
+        rows = self._conn.execute(
+            f"SELECT ordinal, id, text, metadata FROM chunks WHERE ordinal IN ({placeholders})", ordinals
+        ).fetchall()
+        return {ordinal: (chunk_id, text, json.loads(metadata)) for ordinal, chunk_id, text, metadata in rows}
+
+    def get_chunks(self, ids=None):
+        with self._lock:
+            if ids is None:
+                rows = self._conn.execute("SELECT id, text, metadata FROM chunks ORDER BY ordinal").fetchall()
+            else:
+                rows = []
+                ids = list(ids)
+                for start in range(0, len(ids), 500):
+                    batch = ids[start:start + 500]
+                    placeholders = ', '.join('?' for _ in batch)
+                    rows.extend(self._conn.execute(
+                        f"SELECT id, text, metadata FROM chunks WHERE id IN ({placeholders})", batch
+                    ).fetchall())
+        return [{'id': chunk_id, 'text': text or "", 'metadata': json.loads(metadata)} for chunk_id, text, metadata in rows]
+
+    def get_embeddings(self, ids):
+        with self._lock:
+            self._refresh()
+            ids = list(ids)
+            found = []
+            for start in range(0, len(ids), 500):
+                batch = ids[start:start + 500]
+                placeholders = ', '.join('?' for _ in batch)
+                found.extend(self._conn.execute(
+                    f"SELECT id, ordinal FROM chunks WHERE id IN ({placeholders})", batch
+                ).fetchall())
+            full = self._full
+        return {chunk_id: full[ordinal].tolist() for chunk_id, ordinal in found}
+
+    def document_ids(self):
+        with self._lock:
+            return [row[0] for row in self._conn.execute("SELECT DISTINCT document_id FROM chunks WHERE document_id IS NOT NULL")]
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM chunks").fetchone()[0]
+
+    def stats(self):
+        with self._lock:
+            self._refresh()
+            live = len(self)
+            return {
+                'backend': 'numpy',
+                'space': self.space,
+                'dtype': self.dtype,
+                'dimensions': self.dimensions,
+                'rows': self.count,
+                'deleted_rows': self.count - live,
+                'revision': self.revision,
+                'rescore_factor': self.rescore_factor if self.quantized else None,
+            }
+
+
+def _index_directory(collection_name):
+    return Path(config.vector_db_path) / 'numpy' / collection_name
+
+
+def get_numpy_vector_index(collection_name):
+    """Return the process-wide vector index for a collection, opening it on first use."""
+    directory = _index_directory(collection_name)
+    with _indexes_lock:
+        index = _indexes.get(str(directory))
+        if index is None:
+            index = NumpyVectorIndex(
+                directory,
+                space=config.vector_hnsw_space,
+                dtype=config.vector_numpy_dtype,
+                rescore_factor=config.vector_numpy_rescore_factor,
+                compaction_ratio=config.vector_numpy_compaction_ratio
+            )
+            _indexes[str(directory)] = index
+        return index
+
+
+def drop_numpy_vector_index(collection_name):
+    """Close a collection's vector index and delete its files."""
+    directory = _index_directory(collection_name)
+    with _indexes_lock:
+        index = _indexes.pop(str(directory), None)
+    if index:
+        index.close()
+    if directory.exists():
+        shutil.rmtree(directory)
+        return True
+    return False
+
+
+class NumpyVectorStore(VectorStoreBase):
+    """Vector store backed by NumpyVectorIndex instead of Chroma (VECTOR_STORE_BACKEND=numpy)."""
+
+    name = 'numpy'
+
+    def _index(self):
+        return get_numpy_vector_index(self.collection_name)
+
+    def add_documents(self, chunks, embeddings):
+        if not chunks or not embeddings:
+            logger.warning("No chunks or embeddings provided")
+            return []
+
+        if len(chunks) != len(embeddings):
+            raise ValueError("Number of chunks must match number of embeddings")
+
+        try:
+            index = self._index()
+            ids = []
+            for start, end in self._write_batches(len(chunks)):
+                batch = chunks[start:end]
+                batch_ids = self._chunk_ids(batch, offset=start)
+                index.add(
+                    batch_ids,
+                    embeddings[start:end],
+                    [chunk['text'] for chunk in batch],
+                    [self._prepare_metadata(chunk) for chunk in batch]
+                )
+                ids.extend(batch_ids)
+            logger.info(f"Added {len(chunks)} document chunks to vector store")
+            return ids
+        except Exception as e:
+            logger.error(f"Failed to add documents to vector store: {str(e)}")
+            raise
+
+    def update_chunk_metadata(self, chunks):
+        """Refresh the metadata of chunks that are already stored, keeping their embeddings."""
+        if not chunks:
+            return
+        index = self._index()
+        for start, end in self._write_batches(len(chunks)):
+            index.update_metadata(
+                [chunk['id'] for chunk in chunks[start:end]],
+                [self._prepare_metadata(chunk) for chunk in chunks[start:end]]
+            )
+
+    def get_embeddings(self, chunk_ids):
+        if not chunk_ids:
+            return {}
+        try:
+            return self._index().get_embeddings(chunk_ids)
+        except Exception as e:
+            logger.error(f"Failed to load embeddings by ID: {str(e)}")
+            return {}
+
+    def delete_chunks(self, chunk_ids):
+        if not chunk_ids:
+            return
+        self._index().delete_ids(list(chunk_ids))
+        logger.info(f"Deleted {len(chunk_ids)} chunks from vector store")
+
+    def search(self, query_embedding, top_k=5, filter_metadata=None):
+        return self.search_many([query_embedding], top_k=top_k, filter_metadata=filter_metadata)[0]
+
+    def search_many(self, query_embeddings, top_k=5, filter_metadata=None):
+        """Search several query embeddings in one pass; returns one result list per query."""
+        if not query_embeddings:
+            return []
+
+        try:
+            all_docs = self._index().search_many(query_embeddings, top_k=top_k, where=filter_metadata)
+            logger.info(f"Retrieved {sum(len(docs) for docs in all_docs)} documents from vector store "
+                        f"for {len(query_embeddings)} queries")
+            return all_docs
+        except Exception as e:
+            logger.error(f"Failed to search vector store: {str(e)}")
+            raise
+
+    def delete_document(self, document_id):
+        self._index().delete_document(document_id)
+        logger.info(f"Deleted document {document_id} from vector store")
+
+    def get_index_params(self):
+        """Parameters the current collection was built with, reported by /index/stats."""
+        return self._index().stats()
+
+    def get_document_count(self):
+        try:
+            return len(self._index())
+        except Exception as e:
+            logger.error(f"Failed to get document count: {str(e)}")
+            return 0
+
+    def get_all_document_ids(self):
+        try:
+            return self._index().document_ids()
+        except Exception as e:
+            logger.error(f"Failed to get document IDs: {str(e)}")
+            return []
+
+    def clear_collection(self):
+        self._index().clear()
+        logger.warning("Cleared all documents from vector store")
+
+    def drop_collection(self, collection_name):
+        if drop_numpy_vector_index(collection_name):
+            logger.info(f"Dropped collection {collection_name}")
+        else:
+            logger.debug(f"Collection {collection_name} does not exist, nothing to drop")
+
+    def get_all_chunks(self):
+        try:
+            return self._index().get_chunks()
+        except Exception as e:
+            logger.error(f"Failed to load all chunks: {str(e)}")
+            return []
+
+    def get_chunks(self, chunk_ids):
+        if not chunk_ids:
+            return {}
+        try:
+            return {chunk['id']: chunk for chunk in self._index().get_chunks(chunk_ids)}
+        except Exception as e:
+            logger.error(f"Failed to load chunks by ID: {str(e)}")
+            return {}
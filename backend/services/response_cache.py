@@ -1,63 +1,130 @@
 import time
 import hashlib
-import threading
-from collections import OrderedDict
 from backend.core.config import config
 from backend.core.logger import setup_logger
+from backend.services.cache_backends import get_cache_backend
+from backend.models.index_state import IndexState
+from backend.services.semantic_cache import SemanticCache
+from backend.retrieval.query_filters import filters_key
 
 logger = setup_logger(__name__)
 
 
 class ResponseCache:
-    """Simple thread-safe in-memory LRU cache with TTL for RAG responses."""
+    """LRU cache with TTL for RAG responses, stored in a pluggable backend.
 
-    def __init__(self):
+    Entries record the index generation they were answered at and the documents
+    they cited; an entry is dropped once any of those documents is reindexed or
+    deleted, so unrelated index updates leave it in place. An optional semantic
+    tier maps query embeddings to entries so paraphrased questions can hit as
+    well. The semantic tier is per-process and only holds keys; the entries
+    themselves live in the (possibly shared) backend.
+    """
+
+    def __init__(self, backend=None, index_state=None):
+        self.backend = backend or get_cache_backend()
+        self.index_state = index_state or IndexState()
         self.max_size = config.cache_max_size
         self.ttl_seconds = config.cache_ttl_seconds
-        self._cache = OrderedDict()
-        self._lock = threading.Lock()
+        self.semantic = SemanticCache(
+            threshold=config.semantic_cache_threshold,
+            max_entries=self.max_size
+        ) if config.semantic_cache_enabled else None
 
-    def _make_key(self, query, top_k, temperature):
+    def _make_key(self, query, top_k, temperature, filters=None):
         normalized = query.strip().lower()
         raw = f"{normalized}|{top_k}|{temperature}"
+        if filters:
+            # Scoped answers never satisfy an unscoped question, or one with another scope
+            raw = f"{raw}|{filters_key(filters)}"
         return hashlib.sha256(raw.encode()).hexdigest()
 
-    def get(self, query, top_k=5, temperature=0.7):
-        key = self._make_key(query, top_k, temperature)
-        with self._lock:
-            if key in self._cache:
-                entry = self._cache[key]
-                if time.time() - entry['timestamp'] < self.ttl_seconds:
-                    self._cache.move_to_end(key)
-                    logger.info(f"Cache HIT for query: {query[:60]}...")
-                    return entry['response']
-                else:
-                    del self._cache[key]
-                    logger.debug(f"Cache EXPIRED for query: {query[:60]}...")
-        return None
-
-    def put(self, query, top_k, temperature, response):
-        key = self._make_key(query, top_k, temperature)
-        with self._lock:
-            if key in self._cache:
-                del self._cache[key]
-            self._cache[key] = {
+    def _evict(self, key):
+        try:
+            self.backend.delete(key)
+        except Exception as e:
+            logger.warning(f"Response cache delete failed: {str(e)}")
+        if self.semantic is not None:
+            self.semantic.remove(key)
+
+    def _lookup(self, key):
+        try:
+            entry = self.backend.get(key)
+        except Exception as e:
+            logger.warning(f"Response cache read failed: {str(e)}")
+            return None
+
+        if entry is None:
+            # Expired, evicted, or cleared by another worker
+            if self.semantic is not None:
+                self.semantic.remove(key)
+            return None
+        if self.index_state.is_stale(entry.get('index_generation'), entry.get('document_ids', [])):
+            self._evict(key)
+            logger.debug(f"Cache entry invalidated by index update for query: {entry['query'][:60]}...")
+            return None
+        return entry
+
+    def get(self, query, top_k=5, temperature=0.7, filters=None):
+        key = self._make_key(query, top_k, temperature, filters)
+        entry = self._lookup(key)
+        if entry is None:
+            return None
+        logger.info(f"Cache HIT for query: {query[:60]}...")
+        return entry['response']
+
+    def get_similar(self, query_embedding, top_k=5, temperature=0.7, filters=None):
+        if self.semantic is None or query_embedding is None:
+            return None
+
+        match = self.semantic.lookup(query_embedding, (top_k, temperature, filters_key(filters)))
+        if not match:
+            return None
+
+        key, similarity = match
+        entry = self._lookup(key)
+        if entry is None:
+            return None
+        logger.info(f"Semantic cache HIT (similarity {similarity:.3f}) for cached query: "
+                    f"{entry['query'][:60]}...")
+        return entry['response']
+
+    def put(self, query, top_k, temperature, response, query_embedding=None,
+            index_generation=None, document_ids=None, filters=None):
+        key = self._make_key(query, top_k, temperature, filters)
+        if index_generation is None:
+            index_generation = self.index_state.get_generation()
+        try:
+            self.backend.set(key, {
+                'query': query,
                 'response': response,
+                'index_generation': index_generation,
+                'document_ids': sorted(set(document_ids or [])),
                 'timestamp': time.time()
-            }
-            if len(self._cache) > self.max_size:
-                self._cache.popitem(last=False)
-            logger.info(f"Cache STORE for query: {query[:60]}...")
+            })
+        except Exception as e:
+            logger.warning(f"Response cache write failed: {str(e)}")
+            return
+
+        if self.semantic is not None and query_embedding is not None:
+            self.semantic.add(key, query_embedding, (top_k, temperature, filters_key(filters)))
+        logger.info(f"Cache STORE for query: {query[:60]}...")
 
     def clear(self):
-        with self._lock:
-            self._cache.clear()
-            logger.info("Response cache cleared")
+        try:
+            self.backend.clear()
+        except Exception as e:
+            logger.warning(f"Response cache clear failed: {str(e)}")
+        if self.semantic is not None:
+            self.semantic.clear()
+        logger.info("Response cache cleared")
 
     def stats(self):
-        with self._lock:
-            return {
-                'size': len(self._cache),
-                'max_size': self.max_size,
-                'ttl_seconds': self.ttl_seconds,
-            }
+        try:
+            stats = self.backend.stats()
+        except Exception as e:
+            logger.warning(f"Response cache stats failed: {str(e)}")
+            stats = {'backend': self.backend.name, 'error': str(e)}
+        stats['ttl_seconds'] = self.ttl_seconds
+        stats['semantic_entries'] = self.semantic.size() if self.semantic is not None else 0
+        return stats
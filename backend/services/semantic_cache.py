@@ -0,0 +1,106 @@
+import threading
+import numpy as np
+from backend.core.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class SemanticCache:
+    """In-memory nearest-neighbour index from query embeddings to response cache keys.
+
+    Candidates come from random-hyperplane LSH tables (several short signatures,
+    so near-duplicates collide in at least one table with high probability);
+    the exact cosine similarity of each candidate decides the hit. Small caches
+    skip LSH and are scanned exhaustively.
+    """
+
+    def __init__(self, threshold=0.92, num_tables=8, num_bits=8, exhaustive_limit=256, seed=13, max_entries=None):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.num_tables = num_tables
+        self.num_bits = num_bits
+        self.exhaustive_limit = exhaustive_limit
+        self._rng = np.random.default_rng(seed)
+        self._planes = None
+        self._entries = {}
+        self._tables = [{} for _ in range(num_tables)]
+        self._lock = threading.Lock()
+
+    def _normalize(self, embedding):
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _signatures(self, vector):
+        if self._planes is None or self._planes.shape[2] != vector.shape[0]:
+            self._planes = self._rng.standard_normal((self.num_tables, self.num_bits, vector.shape[0])).astype(np.float32)
+        bits = (self._planes @ vector) > 0
+        weights = 1 << np.arange(self.num_bits)
+        return (bits * weights).sum(axis=1).tolist()
+
+    def add(self, key, embedding, scope):
+        vector = self._normalize(embedding)
+        with self._lock:
+            self._remove_locked(key)
+            signatures = self._signatures(vector)
+            self._entries[key] = (vector, scope, signatures)
+            for table, signature in zip(self._tables, signatures):
+                table.setdefault((scope, signature), set()).add(key)
+            while self.max_entries and len(self._entries) > self.max_entries:
+                self._remove_locked(next(iter(self._entries)))
+
+    def _remove_locked(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        _, scope, signatures = entry
+        for table, signature in zip(self._tables, signatures):
+            bucket = table.get((scope, signature))
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del table[(scope, signature)]
+
+    def remove(self, key):
+        with self._lock:
+            self._remove_locked(key)
+
+    def lookup(self, embedding, scope):
+        """Return (key, similarity) of the most similar entry above the threshold, or None."""
+        vector = self._normalize(embedding)
+        with self._lock:
+            if not self._entries:
+                return None
+
+            if len(self._entries) <= self.exhaustive_limit:
+                candidates = list(self._entries.keys())
+            else:
+                candidates = set()
+                for table, signature in zip(self._tables, self._signatures(vector)):
+                    candidates.update(table.get((scope, signature), ()))
+
+            best_key = None
+            best_similarity = self.threshold
+            for key in candidates:
+                stored, stored_scope, _ = self._entries[key]
+                if stored_scope != scope:
+                    continue
+                if stored.shape != vector.shape:
+                    continue
+                similarity = float(stored @ vector)
+                if similarity >= best_similarity:
+                    best_key = key
+                    best_similarity = similarity
+
+            if best_key is None:
+                return None
+            return best_key, best_similarity
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._tables = [{} for _ in range(self.num_tables)]
+
+    def size(self):
+        with self._lock:
+            return len(self._entries)
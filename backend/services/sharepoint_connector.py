@@ -1,11 +1,21 @@
+import time
+import random
+import threading
 import requests
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 from datetime import datetime
+from email.utils import parsedate_to_datetime
+from requests.adapters import HTTPAdapter
 from backend.core.logger import setup_logger
 from backend.core.config import config
 
 logger = setup_logger(__name__)
 
 
+class DeltaResyncRequired(Exception):
+    """Graph no longer accepts the stored delta token (HTTP 410)."""
+
+
 class SharePointConnector:
     def __init__(self):
         self.tenant_id = config.sharepoint_tenant_id
@@ -13,27 +23,115 @@ class SharePointConnector:
         self.client_secret = config.sharepoint_client_secret
         self.site_url = config.sharepoint_site_url
         self.document_library = config.sharepoint_document_library
+        self.graph_url = config.sharepoint_graph_url
+        self.login_url = config.sharepoint_login_url
+        self.supports_changes = config.sharepoint_delta_enabled
+        self.max_concurrency = max(1, config.sharepoint_max_concurrency)
+        self.max_retries = config.sharepoint_max_retries
+        self.timeout_seconds = config.sharepoint_timeout_seconds
         self.access_token = None
         self.site_id = None
         self.drive_id = None
+
+        # One keep-alive pool shared by every thread; sized for the concurrency limit
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.max_concurrency)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self._slots = threading.BoundedSemaphore(self.max_concurrency)
+        self._token_lock = threading.Lock()
+        self._token_expires_at = 0.0
+        self._throttle_lock = threading.Lock()
+        self._throttled_until = 0.0
+        self._download_urls = {}
+
         self._authenticate()
 
+    def _fetch_token(self):
+        url = f'{self.login_url}/{self.tenant_id}/oauth2/v2.0/token'
+        headers = {'Content-Type': 'application/x-www-form-urlencoded'}
+        data = {
+            'scope': 'https://graph.microsoft.com/.default',
+            'grant_type': 'client_credentials',
+            'client_id': self.client_id,
+            'client_secret': self.client_secret
+        }
+
+        response = self.session.post(url, headers=headers, data=data, timeout=self.timeout_seconds)
+        response.raise_for_status()
+
+        response_data = response.json()
+        self.access_token = response_data['access_token']
+        # Refresh ahead of expiry (five minutes for the usual one-hour token) so long runs never send an expired one
+        expires_in = int(response_data.get('expires_in', 3600))
+        self._token_expires_at = time.monotonic() + expires_in - min(300, expires_in // 10)
+        logger.debug("Acquired SharePoint access token")
+
+    def _get_token(self, force_refresh=False):
+        with self._token_lock:
+            if force_refresh or not self.access_token or time.monotonic() >= self._token_expires_at:
+                self._fetch_token()
+            return self.access_token
+
+    def _retry_delay(self, response, attempt):
+        retry_after = response.headers.get('Retry-After')
+        if retry_after:
+            try:
+                return max(0.0, float(retry_after))
+            except ValueError:
+                try:
+                    retry_at = parsedate_to_datetime(retry_after)
+                    return max(0.0, (retry_at - datetime.now(retry_at.tzinfo)).total_seconds())
+                except (TypeError, ValueError):
+                    pass
+        return min(60.0, 2 ** attempt) * (0.5 + random.random() / 2)
+
+    def _wait_for_throttle(self):
+        with self._throttle_lock:
+            delay = self._throttled_until - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+    def _request(self, method, url, authenticated=True, **kwargs):
+        """Send a request through the pooled session.
+
+        Honours Retry-After on 429/503 (throttling is per app, so every thread
+        waits out the same window), refreshes the token once on 401, and limits
+        the number of requests in flight to SHAREPOINT_MAX_CONCURRENCY.
+        """
+        kwargs.setdefault('timeout', self.timeout_seconds)
+        headers = dict(kwargs.pop('headers', None) or {})
+        refreshed = False
+        attempt = 0
+
+        while True:
+            self._wait_for_throttle()
+            if authenticated:
+                headers['Authorization'] = f'Bearer {self._get_token()}'
+
+            with self._slots:
+                response = self.session.request(method, url, headers=headers, **kwargs)
+
+            if response.status_code == 401 and authenticated and not refreshed:
+                refreshed = True
+                self._get_token(force_refresh=True)
+                continue
+
+            if response.status_code in (429, 503) and attempt < self.max_retries:
+                delay = self._retry_delay(response, attempt)
+                attempt += 1
+                with self._throttle_lock:
+                    self._throttled_until = max(self._throttled_until, time.monotonic() + delay)
+                logger.warning(f"SharePoint throttled the request (HTTP {response.status_code}), "
+                               f"retrying in {delay:.1f}s ({attempt}/{self.max_retries})")
+                response.close()
+                continue
+
+            return response
+
     def _authenticate(self):
         try:
-            url = f'https://login.microsoftonline.com/{self.tenant_id}/oauth2/v2.0/token'
-            headers = {'Content-Type': 'application/x-www-form-urlencoded'}
-            data = {
-                'scope': 'https://graph.microsoft.com/.default',
-                'grant_type': 'client_credentials',
-                'client_id': self.client_id,
-                'client_secret': self.client_secret
-            }
-
-            response = requests.post(url, headers=headers, data=data)
-            response.raise_for_status()
-
-            response_data = response.json()
-            self.access_token = response_data['access_token']
+            self._get_token(force_refresh=True)
 
             self._get_site_id()
             self._get_drive_id()
@@ -47,7 +145,6 @@ class SharePointConnector:
     def _get_site_id(self):
         try:
             from urllib.parse import urlparse
-            headers = {'Authorization': f'Bearer {self.access_token}'}
 
             logger.info(f"Resolving Site ID for URL: {self.site_url}")
             
@@ -68,13 +165,13 @@ class SharePointConnector:
                     path = ''
             
             if path and path != '/':
-                graph_url = f'https://graph.microsoft.com/v1.0/sites/{hostname}:{path}'
+                graph_url = f'{self.graph_url}/sites/{hostname}:{path}'
             else:
-                graph_url = f'https://graph.microsoft.com/v1.0/sites/{hostname}'
+                graph_url = f'{self.graph_url}/sites/{hostname}'
 
             logger.info(f"Graph API URL for Site ID: {graph_url}")
 
-            response = requests.get(graph_url, headers=headers)
+            response = self._request('GET', graph_url)
             response.raise_for_status()
 
             data = response.json()
@@ -88,12 +185,7 @@ class SharePointConnector:
 
     def _get_drive_id(self):
         try:
-            headers = {'Authorization': f'Bearer {self.access_token}'}
-
-            response = requests.get(
-                f'https://graph.microsoft.com/v1.0/sites/{self.site_id}/drives',
-                headers=headers
-            )
+            response = self._request('GET', f'{self.graph_url}/sites/{self.site_id}/drives')
             response.raise_for_status()
 
             data = response.json()
@@ -112,8 +204,10 @@ class SharePointConnector:
         try:
             logger.info(f"Fetching all documents from path: {self.document_library}")
 
-            documents = []
-            self._traverse_folder(self.document_library, "", documents)
+            if config.sharepoint_delta_enabled:
+                return self.get_changes()['documents']
+
+            documents = self._traverse_library()
 
             logger.info(f"Retrieved {len(documents)} documents from SharePoint")
             return documents
@@ -122,50 +216,200 @@ class SharePointConnector:
             logger.error(f"Failed to fetch documents: {str(e)}")
             raise
 
-    def _traverse_folder(self, base_folder, current_path, documents):
+    def _traverse_library(self):
+        # Folders are listed concurrently: each finished listing schedules its subfolders
+        base_folder = self.document_library
+        self._download_urls.clear()
+        documents = []
+        with ThreadPoolExecutor(max_workers=self.max_concurrency,
+                                thread_name_prefix='sharepoint-traverse') as executor:
+            pending = {executor.submit(self._list_folder, base_folder, "")}
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    files, subfolders = future.result()
+                    documents.extend(files)
+                    for subfolder in subfolders:
+                        pending.add(executor.submit(self._list_folder, base_folder, subfolder))
+        return documents
+
+    def _list_folder(self, base_folder, current_path):
         try:
             if current_path == "":
-                url = f"https://graph.microsoft.com/v1.0/drives/{self.drive_id}/root:/{base_folder}:/children"
+                url = f"{self.graph_url}/drives/{self.drive_id}/root:/{base_folder}:/children"
             else:
-                url = f"https://graph.microsoft.com/v1.0/drives/{self.drive_id}/root:/{base_folder}/{current_path}:/children"
+                url = f"{self.graph_url}/drives/{self.drive_id}/root:/{base_folder}/{current_path}:/children"
 
-            headers = {'Authorization': f'Bearer {self.access_token}'}
-            response = requests.get(url, headers=headers)
+            files = []
+            subfolders = []
+            while url:
+                response = self._request('GET', url)
 
-            if response.status_code == 404:
-                raise Exception(f"SharePoint folder not found: '{base_folder}/{current_path}'")
-            elif response.status_code == 403:
-                raise Exception(f"Access denied to SharePoint folder: '{base_folder}/{current_path}'")
+                if response.status_code == 404:
+                    raise Exception(f"SharePoint folder not found: '{base_folder}/{current_path}'")
+                elif response.status_code == 403:
+                    raise Exception(f"Access denied to SharePoint folder: '{base_folder}/{current_path}'")
 
-            response.raise_for_status()
-            data = response.json()
+                response.raise_for_status()
+                data = response.json()
 
-            if 'value' not in data:
-                raise Exception(f"SharePoint folder '{base_folder}/{current_path}' not found or inaccessible")
+                if 'value' not in data:
+                    raise Exception(f"SharePoint folder '{base_folder}/{current_path}' not found or inaccessible")
 
-            for item in data['value']:
-                if 'file' in item:
-                    doc_info = {
-                        'id': item['id'],
-                        'name': item['name'],
-                        'path': f"{base_folder}/{current_path}/{item['name']}" if current_path else f"{base_folder}/{item['name']}",
-                        'modified': item['lastModifiedDateTime'],
-                        'size': item.get('size', 0),
-                        'author': item.get('createdBy', {}).get('user', {}).get('displayName', 'Unknown'),
-                        'download_url': item.get('@microsoft.graph.downloadUrl', ''),
-                        'web_url': item.get('webUrl', '')
-                    }
-                    documents.append(doc_info)
-                    logger.debug(f"Found file: {doc_info['name']}")
-
-                elif 'folder' in item:
-                    new_path = f"{current_path}/{item['name']}" if current_path else item['name']
-                    self._traverse_folder(base_folder, new_path, documents)
+                for item in data['value']:
+                    if 'file' in item:
+                        path = f"{base_folder}/{current_path}/{item['name']}" if current_path else f"{base_folder}/{item['name']}"
+                        doc_info = self._build_document_info(item, path)
+                        files.append(doc_info)
+                        logger.debug(f"Found file: {doc_info['name']}")
+
+                    elif 'folder' in item:
+                        subfolders.append(f"{current_path}/{item['name']}" if current_path else item['name'])
+
+                url = data.get('@odata.nextLink')
+
+            return files, subfolders
 
         except Exception as e:
             logger.error(f"Failed to traverse folder {base_folder}/{current_path}: {str(e)}")
             raise
 
+    def _build_document_info(self, item, path):
+        download_url = item.get('@microsoft.graph.downloadUrl', '')
+        if download_url:
+            # Listings carry a pre-authenticated URL, which saves a metadata request per download
+            self._download_urls[path] = download_url
+        document = {
+            'id': item['id'],
+            'name': item['name'],
+            'path': path,
+            'modified': item['lastModifiedDateTime'],
+            'size': item.get('size', 0),
+            'author': item.get('createdBy', {}).get('user', {}).get('displayName', 'Unknown'),
+            'download_url': item.get('@microsoft.graph.downloadUrl', ''),
+            'web_url': item.get('webUrl', '')
+        }
+
+        # Lets the indexer skip files whose bytes did not change without downloading them
+        hashes = item.get('file', {}).get('hashes', {})
+        if hashes.get('sha1Hash'):
+            document['content_hash'] = f"sha1:{hashes['sha1Hash'].lower()}"
+        elif hashes.get('quickXorHash'):
+            document['content_hash'] = f"quickXorHash:{hashes['quickXorHash']}"
+        return document
+
+    def get_changes(self, cursor=None):
+        """Read the drive delta feed from `cursor` (None enumerates the whole drive).
+
+        Returns {'documents', 'deleted_ids', 'full', 'cursor'}. `documents` holds
+        files under the document library that were added or modified, `deleted_ids`
+        files that were deleted or moved out of it, and `cursor` is the state to
+        persist for the next call. When `full` is True the feed was read from the
+        start and `documents` lists every file in the library, so anything indexed
+        but not listed has been deleted.
+        """
+        self._download_urls.clear()
+        if cursor and cursor.get('drive_id') == self.drive_id and cursor.get('delta_link'):
+            try:
+                changes = self._read_delta(cursor['delta_link'], dict(cursor.get('folders', {})))
+                if changes is not None:
+                    return changes
+                logger.info("Folder moved, renamed or deleted, re-reading the delta feed from the start")
+            except DeltaResyncRequired:
+                logger.warning("Delta token expired, re-reading the delta feed from the start")
+
+        url = f"{self.graph_url}/drives/{self.drive_id}/root/delta?$top={config.sharepoint_delta_page_size}"
+        changes = self._read_delta(url, {}, full=True)
+        logger.info(f"Retrieved {len(changes['documents'])} documents from SharePoint delta feed")
+        return changes
+
+    def _read_delta(self, url, folders, full=False):
+        # Delta items carry no path, so folder paths are rebuilt from the folder
+        # items seen so far and persisted with the delta link
+        files = {}
+        deleted_ids = set()
+        pending = []
+        requests_made = 0
+        delta_link = None
+
+        while url:
+            response = self._request('GET', url)
+            requests_made += 1
+            if response.status_code == 410:
+                raise DeltaResyncRequired()
+            response.raise_for_status()
+            data = response.json()
+
+            for item in data.get('value', []):
+                outcome = self._apply_delta_item(item, folders, files, deleted_ids, full)
+                if outcome == 'resync':
+                    return None
+                if outcome == 'pending':
+                    pending.append(item)
+
+            url = data.get('@odata.nextLink')
+            delta_link = data.get('@odata.deltaLink', delta_link)
+
+        # Items listed before their parent folder are resolved once all folders are known
+        while pending:
+            unresolved = []
+            for item in pending:
+                outcome = self._apply_delta_item(item, folders, files, deleted_ids, full)
+                if outcome == 'resync':
+                    return None
+                if outcome == 'pending':
+                    unresolved.append(item)
+            if len(unresolved) == len(pending):
+                if not full:
+                    return None
+                logger.warning(f"Skipped {len(unresolved)} delta items outside the drive tree")
+                break
+            pending = unresolved
+
+        logger.info(f"Read delta feed in {requests_made} requests: {len(files)} changed, "
+                    f"{len(deleted_ids)} removed")
+        return {
+            'documents': list(files.values()),
+            'deleted_ids': sorted(deleted_ids),
+            'full': full,
+            'cursor': {'drive_id': self.drive_id, 'delta_link': delta_link, 'folders': folders}
+        }
+
+    def _apply_delta_item(self, item, folders, files, deleted_ids, full):
+        item_id = item['id']
+
+        if 'deleted' in item:
+            if item_id in folders:
+                if not full:
+                    return 'resync'  # files below a deleted folder are not reported
+                folders.pop(item_id)
+            else:
+                files.pop(item_id, None)
+                deleted_ids.add(item_id)
+            return 'ok'
+
+        if 'root' in item:
+            folders[item_id] = ''
+            return 'ok'
+
+        parent_path = folders.get(item.get('parentReference', {}).get('id'))
+        if parent_path is None:
+            return 'pending'
+        path = f"{parent_path}/{item['name']}" if parent_path else item['name']
+
+        if 'folder' in item:
+            if not full and item_id in folders and folders[item_id] != path:
+                return 'resync'  # files below a moved folder are not reported
+            folders[item_id] = path
+        elif 'file' in item:
+            if path.startswith(f"{self.document_library.strip('/')}/"):
+                files[item_id] = self._build_document_info(item, path)
+                deleted_ids.discard(item_id)
+            else:
+                files.pop(item_id, None)
+                deleted_ids.add(item_id)
+        return 'ok'
+
     def get_documents_modified_since(self, last_indexed_time):
         try:
             all_documents = self.get_all_documents()
@@ -187,22 +431,22 @@ class SharePointConnector:
         try:
             logger.debug(f"Downloading content from: {file_path}")
 
-            url = f"https://graph.microsoft.com/v1.0/drives/{self.drive_id}/root:/{file_path}"
-            headers = {'Authorization': f'Bearer {self.access_token}'}
-
-            response = requests.get(url, headers=headers)
+            download_url = self._download_urls.pop(file_path, None)
+            if download_url:
+                response = self._request('GET', download_url, authenticated=False)
+                if response.ok:
+                    content = response.content
+                    logger.debug(f"Successfully downloaded {len(content)} bytes")
+                    return content
+                # The pre-authenticated URL expires after about an hour
+                logger.debug(f"Download URL for {file_path} rejected (HTTP {response.status_code}), "
+                             f"falling back to the content endpoint")
+
+            url = f"{self.graph_url}/drives/{self.drive_id}/root:/{file_path}:/content"
+            response = self._request('GET', url)
             response.raise_for_status()
 
-            file_data = response.json()
-            download_url = file_data.get('@microsoft.graph.downloadUrl')
-
-            if not download_url:
-                raise Exception(f"No download URL found for file: {file_path}")
-
-            download_response = requests.get(download_url)
-            download_response.raise_for_status()
-
-            content = download_response.content
+            content = response.content
             logger.debug(f"Successfully downloaded {len(content)} bytes")
             return content
 
@@ -212,10 +456,9 @@ class SharePointConnector:
 
     def get_file_metadata(self, file_path):
         try:
-            url = f"https://graph.microsoft.com/v1.0/drives/{self.drive_id}/root:/{file_path}"
-            headers = {'Authorization': f'Bearer {self.access_token}'}
+            url = f"{self.graph_url}/drives/{self.drive_id}/root:/{file_path}"
 
-            response = requests.get(url, headers=headers)
+            response = self._request('GET', url)
             response.raise_for_status()
 
             data = response.json()
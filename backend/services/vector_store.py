@@ -3,24 +3,103 @@ from chromadb.config import Settings
 from datetime import datetime
 from backend.core.logger import setup_logger
 from backend.core.config import config
+from backend.models.index_state import IndexState
 
 logger = setup_logger(__name__)
 
 
-class VectorStore:
-    def __init__(self):
+def default_hnsw_params():
+    params = {
+        'hnsw:space': config.vector_hnsw_space,
+        'hnsw:M': config.vector_hnsw_m,
+        'hnsw:construction_ef': config.vector_hnsw_construction_ef,
+        'hnsw:search_ef': config.vector_hnsw_search_ef,
+    }
+    if config.vector_hnsw_num_threads > 0:
+        params['hnsw:num_threads'] = config.vector_hnsw_num_threads
+    return params
+
+
+class VectorStoreBase:
+    """Interface shared by the vector store backends.
+
+    COLLECTION_NAME is an alias resolved through IndexState on every access, so
+    a blue/green reindex becomes visible to all processes as soon as the alias
+    is swapped. Passing collection_name pins the store to one physical collection.
+    """
+
+    name = 'base'
+
+    def __init__(self, collection_name=None, query_candidates=None):
+        self.alias = config.collection_name
+        self._pinned_collection = collection_name
+        self.index_state = IndexState()
+        self.query_candidates = config.vector_query_candidates if query_candidates is None else query_candidates
+        self.write_batch_size = max(1, config.vector_write_batch_size)
+
+    @property
+    def collection_name(self):
+        return self._pinned_collection or self.index_state.get_active_collection(self.alias)
+
+    def _write_batches(self, count):
+        """(start, end) slices of at most write_batch_size items, one backend write each."""
+        return [(start, min(start + self.write_batch_size, count))
+                for start in range(0, count, self.write_batch_size)]
+
+    def _chunk_ids(self, chunks, offset=0):
+        ids = []
+        for position, chunk in enumerate(chunks, start=offset):
+            if chunk.get('id'):
+                ids.append(chunk['id'])
+                continue
+            metadata = chunk['metadata']
+            document_id = metadata['document_id']
+            page_number = metadata.get('page_number', 'na')
+            chunk_index = metadata.get('chunk_index', position)
+            ids.append(f"{document_id}_p{page_number}_c{chunk_index}_{position}")
+        return ids
+
+    def _prepare_metadata(self, chunk):
+        # chunk_index, chunk_size, start_char and end_char stay ints so range filters compare numbers
+        metadata = chunk['metadata'].copy()
+        metadata['indexed_at'] = datetime.utcnow().isoformat()
+        return metadata
+
+
+class VectorStore(VectorStoreBase):
+    """Chroma collection addressed through an alias.
+
+    HNSW parameters (`hnsw_params`, default from VECTOR_HNSW_*) are fixed when
+    a collection is created; a full reindex builds a new collection and so
+    picks up changed settings.
+    """
+
+    name = 'chroma'
+
+    def __init__(self, collection_name=None, hnsw_params=None, query_candidates=None):
+        super().__init__(collection_name, query_candidates)
         self.client = chromadb.PersistentClient(
             path=config.vector_db_path,
             settings=Settings(anonymized_telemetry=False)
         )
-        self.collection_name = config.collection_name
+        self.hnsw_params = hnsw_params or default_hnsw_params()
+        # Chroma rejects a write larger than the batch its SQLite backend can bind
+        self.write_batch_size = min(self.write_batch_size, self.client.max_batch_size)
 
     def _get_collection(self):
+        # get_or_create_collection would overwrite the stored metadata on every call
+        collection_name = self.collection_name
+        try:
+            return self.client.get_collection(name=collection_name)
+        except ValueError:
+            pass
+
         try:
             collection = self.client.get_or_create_collection(
-                name=self.collection_name,
-                metadata={"description": "SharePoint documents embeddings"}
+                name=collection_name,
+                metadata={"description": "SharePoint documents embeddings", **self.hnsw_params}
             )
+            logger.info(f"Created collection {collection_name} with {self.hnsw_params}")
             return collection
         except Exception as e:
             logger.error(f"Failed to get/create collection: {str(e)}")
@@ -29,73 +108,108 @@ class VectorStore:
     def add_documents(self, chunks, embeddings):
         if not chunks or not embeddings:
             logger.warning("No chunks or embeddings provided")
-            return
+            return []
 
         if len(chunks) != len(embeddings):
             raise ValueError("Number of chunks must match number of embeddings")
 
         try:
+            collection = self._get_collection()
             ids = []
-            for position, chunk in enumerate(chunks):
-                metadata = chunk['metadata']
-                document_id = metadata['document_id']
-                page_number = metadata.get('page_number', 'na')
-                chunk_index = metadata.get('chunk_index', position)
-                ids.append(f"{document_id}_p{page_number}_c{chunk_index}_{position}")
-
-            texts = [chunk['text'] for chunk in chunks]
-
-            metadatas = []
-            for chunk in chunks:
-                metadata = chunk['metadata'].copy()
-                metadata['indexed_at'] = datetime.utcnow().isoformat()
-                metadata['chunk_index'] = str(metadata['chunk_index'])
-                metadata['chunk_size'] = str(metadata['chunk_size'])
-                
-                # Optional fields
-                if 'start_char' in metadata:
-                    metadata['start_char'] = str(metadata['start_char'])
-                if 'end_char' in metadata:
-                    metadata['end_char'] = str(metadata['end_char'])
-                    
-                metadatas.append(metadata)
-
-            self._get_collection().add(
-                ids=ids,
-                embeddings=embeddings,
-                documents=texts,
-                metadatas=metadatas
-            )
+            for start, end in self._write_batches(len(chunks)):
+                batch = chunks[start:end]
+                batch_ids = self._chunk_ids(batch, offset=start)
+                collection.add(
+                    ids=batch_ids,
+                    embeddings=embeddings[start:end],
+                    documents=[chunk['text'] for chunk in batch],
+                    metadatas=[self._prepare_metadata(chunk) for chunk in batch]
+                )
+                ids.extend(batch_ids)
 
             logger.info(f"Added {len(chunks)} document chunks to vector store")
+            return ids
 
         except Exception as e:
             logger.error(f"Failed to add documents to vector store: {str(e)}")
             raise
 
+    def update_chunk_metadata(self, chunks):
+        """Refresh the metadata of chunks that are already stored, keeping their embeddings."""
+        if not chunks:
+            return
+
+        try:
+            collection = self._get_collection()
+            for start, end in self._write_batches(len(chunks)):
+                collection.update(
+                    ids=[chunk['id'] for chunk in chunks[start:end]],
+                    metadatas=[self._prepare_metadata(chunk) for chunk in chunks[start:end]]
+                )
+            logger.debug(f"Updated metadata of {len(chunks)} unchanged chunks")
+        except Exception as e:
+            logger.error(f"Failed to update chunk metadata: {str(e)}")
+            raise
+
+    def get_embeddings(self, chunk_ids):
+        if not chunk_ids:
+            return {}
+
+        try:
+            results = self._get_collection().get(ids=list(chunk_ids), include=['embeddings'])
+            ids = results.get('ids') or []
+            embeddings = results.get('embeddings')
+            if embeddings is None:
+                return {}
+            return {chunk_id: list(embeddings[i]) for i, chunk_id in enumerate(ids)}
+        except Exception as e:
+            logger.error(f"Failed to load embeddings by ID: {str(e)}")
+            return {}
+
+    def delete_chunks(self, chunk_ids):
+        if not chunk_ids:
+            return
+
+        try:
+            self._get_collection().delete(ids=list(chunk_ids))
+            logger.info(f"Deleted {len(chunk_ids)} chunks from vector store")
+        except Exception as e:
+            logger.error(f"Failed to delete chunks: {str(e)}")
+            raise
+
     def search(self, query_embedding, top_k=5, filter_metadata=None):
+        return self.search_many([query_embedding], top_k=top_k, filter_metadata=filter_metadata)[0]
+
+    def search_many(self, query_embeddings, top_k=5, filter_metadata=None):
+        """Search several query embeddings in one Chroma query; returns one result list per query."""
+        if not query_embeddings:
+            return []
+
         try:
-            logger.debug(f"Searching for top {top_k} similar documents")
+            logger.debug(f"Searching for top {top_k} similar documents for {len(query_embeddings)} queries")
 
+            # hnswlib searches with ef = max(search_ef, n_results), so asking for more
+            # candidates than needed raises recall for this query only
             results = self._get_collection().query(
-                query_embeddings=[query_embedding],
-                n_results=top_k,
+                query_embeddings=list(query_embeddings),
+                n_results=max(top_k, self.query_candidates),
                 where=filter_metadata
             )
 
-            retrieved_docs = []
-            if results and results.get('ids') and len(results['ids']) > 0:
+            all_docs = []
+            for position in range(len(query_embeddings)):
                 # Ensure we have data for all required fields to avoid index errors
-                ids = results['ids'][0] if results['ids'] else []
-                documents = results['documents'][0] if results.get('documents') else []
-                metadatas = results['metadatas'][0] if results.get('metadatas') else []
-                distances = results['distances'][0] if results.get('distances') else []
-                
+                ids = results['ids'][position] if results and results.get('ids') else []
+                documents = results['documents'][position] if results.get('documents') else []
+                metadatas = results['metadatas'][position] if results.get('metadatas') else []
+                distances = results['distances'][position] if results.get('distances') else []
+
                 # The length of these lists should match, but let's be safe and take the minimum length
                 count = len(ids)
                 if documents: count = min(count, len(documents))
                 if metadatas: count = min(count, len(metadatas))
-                
+
+                retrieved_docs = []
                 for i in range(count):
                     doc = {
                         'id': ids[i],
@@ -104,9 +218,11 @@ class VectorStore:
                         'distance': distances[i] if distances and i < len(distances) else 0.0
                     }
                     retrieved_docs.append(doc)
+                all_docs.append(retrieved_docs[:top_k])
 
-            logger.info(f"Retrieved {len(retrieved_docs)} documents from vector store")
-            return retrieved_docs
+            logger.info(f"Retrieved {sum(len(docs) for docs in all_docs)} documents from vector store "
+                        f"for {len(query_embeddings)} queries")
+            return all_docs
 
         except Exception as e:
             logger.error(f"Failed to search vector store: {str(e)}")
@@ -122,6 +238,14 @@ class VectorStore:
             logger.error(f"Failed to delete document {document_id}: {str(e)}")
             raise
 
+    def get_index_params(self):
+        """Parameters the current collection was built with, reported by /index/stats."""
+        metadata = self._get_collection().metadata or {}
+        params = {'backend': self.name}
+        params.update((key, value) for key, value in metadata.items() if key.startswith('hnsw:'))
+        params['query_candidates'] = self.query_candidates
+        return params
+
     def get_document_count(self):
         try:
             count = self._get_collection().count()
@@ -158,6 +282,13 @@ class VectorStore:
             logger.error(f"Failed to clear collection: {str(e)}")
             raise
 
+    def drop_collection(self, collection_name):
+        try:
+            self.client.delete_collection(collection_name)
+            logger.info(f"Dropped collection {collection_name}")
+        except ValueError:
+            logger.debug(f"Collection {collection_name} does not exist, nothing to drop")
+
     def get_all_chunks(self):
         try:
             results = self._get_collection().get(include=['documents', 'metadatas'])
@@ -180,3 +311,34 @@ class VectorStore:
         except Exception as e:
             logger.error(f"Failed to load all chunks: {str(e)}")
             return []
+
+    def get_chunks(self, chunk_ids):
+        if not chunk_ids:
+            return {}
+
+        try:
+            results = self._get_collection().get(ids=list(chunk_ids), include=['documents', 'metadatas'])
+
+            ids = results.get('ids') or []
+            documents = results.get('documents') or []
+            metadatas = results.get('metadatas') or []
+
+            chunks = {}
+            for i, chunk_id in enumerate(ids):
+                chunks[chunk_id] = {
+                    'id': chunk_id,
+                    'text': documents[i] if i < len(documents) else "",
+                    'metadata': metadatas[i] if i < len(metadatas) else {}
+                }
+            return chunks
+        except Exception as e:
+            logger.error(f"Failed to load chunks by ID: {str(e)}")
+            return {}
+
+
+def create_vector_store(collection_name=None):
+    """Return the VECTOR_STORE_BACKEND implementation, optionally pinned to one collection."""
+    if config.vector_store_backend == 'numpy':
+        from backend.services.numpy_vector_store import NumpyVectorStore
+        return NumpyVectorStore(collection_name=collection_name)
+    return VectorStore(collection_name=collection_name)
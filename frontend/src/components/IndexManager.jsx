@@ -5,6 +5,7 @@ import { getIndexStats, triggerFullReindex, triggerIncrementalIndex, uploadDocum
 export default function IndexManager() {
   const [stats, setStats] = useState(null);
   const [documents, setDocuments] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
   const [loading, setLoading] = useState(false);
   const [indexing, setIndexing] = useState(false);
   const [message, setMessage] = useState(null);
@@ -18,7 +19,8 @@ export default function IndexManager() {
       const statsData = await getIndexStats();
       const docsData = await getIndexedDocuments();
       setStats(statsData);
-      setDocuments(docsData);
+      setDocuments(docsData.documents);
+      setNextCursor(docsData.next_cursor);
     } catch (err) {
       console.error('Failed to load stats or documents:', err);
     } finally {
@@ -26,6 +28,16 @@ export default function IndexManager() {
     }
   };
 
+  const loadMoreDocuments = async () => {
+    try {
+      const docsData = await getIndexedDocuments(nextCursor);
+      setDocuments((current) => [...current, ...docsData.documents]);
+      setNextCursor(docsData.next_cursor);
+    } catch (err) {
+      console.error('Failed to load documents:', err);
+    }
+  };
+
   useEffect(() => {
     loadData();
   }, []);
@@ -293,6 +305,16 @@ export default function IndexManager() {
                       ))}
                     </tbody>
                   </table>
+                  {nextCursor && (
+                    <div className="p-4 text-center border-t border-gray-100">
+                      <button
+                        onClick={loadMoreDocuments}
+                        className="text-sm font-medium text-primary-600 hover:text-primary-700"
+                      >
+                        Load more
+                      </button>
+                    </div>
+                  )}
                 </div>
               )}
             </div>
@@ -45,8 +45,10 @@ export const getIndexStats = async () => {
   return response.data;
 };
 
-export const getIndexedDocuments = async () => {
-  const response = await apiClient.get('/index/documents');
+export const getIndexedDocuments = async (cursor = null, limit = 100) => {
+  const response = await apiClient.get('/index/documents', {
+    params: { limit, ...(cursor ? { cursor } : {}) },
+  });
   return response.data;
 };
 
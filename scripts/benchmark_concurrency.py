@@ -0,0 +1,119 @@
+import sys
+import time
+import argparse
+import statistics
+import threading
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import requests
+from backend.core.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+DEFAULT_QUESTIONS = [
+    "How do I reset my VPN password?",
+    "What is the expense reimbursement process?",
+    "Explain the onboarding checklist for new employees",
+    "What are the security requirements for remote access?",
+]
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def run_query(base_url, question, timeout):
+    started = time.perf_counter()
+    response = requests.post(
+        f"{base_url}/query",
+        json={'question': question, 'top_k': 5, 'temperature': 0.2},
+        timeout=timeout
+    )
+    return time.perf_counter() - started, response.status_code
+
+
+def probe_health(base_url, stop_event, latencies, interval):
+    # /health does no work, so its latency shows how long the event loop is blocked
+    while not stop_event.is_set():
+        started = time.perf_counter()
+        try:
+            requests.get(f"{base_url}/health", timeout=30)
+            latencies.append(time.perf_counter() - started)
+        except Exception as e:
+            logger.warning(f"Health probe failed: {str(e)}")
+        stop_event.wait(interval)
+
+
+def run_benchmark(base_url, total_requests, concurrency, timeout, questions):
+    health_latencies = []
+    stop_event = threading.Event()
+    prober = threading.Thread(target=probe_health, args=(base_url, stop_event, health_latencies, 0.1), daemon=True)
+    prober.start()
+
+    latencies = []
+    failures = 0
+    started = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = [
+            executor.submit(run_query, base_url, questions[i % len(questions)], timeout)
+            for i in range(total_requests)
+        ]
+        for future in futures:
+            try:
+                latency, status_code = future.result()
+                latencies.append(latency)
+                if status_code != 200:
+                    failures += 1
+            except Exception as e:
+                failures += 1
+                logger.warning(f"Query request failed: {str(e)}")
+
+    elapsed = time.perf_counter() - started
+    stop_event.set()
+    prober.join()
+
+    return {
+        'requests': total_requests,
+        'concurrency': concurrency,
+        'failures': failures,
+        'elapsed_seconds': round(elapsed, 2),
+        'throughput_rps': round(total_requests / elapsed, 2) if elapsed else 0.0,
+        'query_p50_seconds': round(statistics.median(latencies), 3) if latencies else 0.0,
+        'query_p95_seconds': round(percentile(latencies, 95), 3),
+        'health_p50_seconds': round(statistics.median(health_latencies), 3) if health_latencies else 0.0,
+        'health_max_seconds': round(max(health_latencies), 3) if health_latencies else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Measure /query throughput and /health responsiveness under concurrent load. "
+                    "Run once against the synchronous build and once against the async build."
+    )
+    parser.add_argument('--base-url', default='http://localhost:8000/api/v1')
+    parser.add_argument('--requests', type=int, default=32)
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 4, 16])
+    parser.add_argument('--timeout', type=float, default=120.0)
+    args = parser.parse_args()
+
+    logger.info(f"Benchmarking {args.base_url} with {args.requests} queries per run")
+    for concurrency in args.concurrency:
+        result = run_benchmark(args.base_url, args.requests, concurrency, args.timeout, DEFAULT_QUESTIONS)
+        logger.info(
+            f"concurrency={result['concurrency']:>3}  throughput={result['throughput_rps']:>6} req/s  "
+            f"query p50={result['query_p50_seconds']}s p95={result['query_p95_seconds']}s  "
+            f"health p50={result['health_p50_seconds']}s max={result['health_max_seconds']}s  "
+            f"failures={result['failures']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+import sys
+import time
+import shutil
+import argparse
+import itertools
+import statistics
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+from backend.core.config import config
+from backend.core.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def make_corpus(documents, queries, dimensions, clusters, seed):
+    """Unit vectors drawn around random cluster centres, like embeddings of related documents."""
+    rng = np.random.default_rng(seed)
+    centres = rng.standard_normal((clusters, dimensions)).astype(np.float32)
+
+    def sample(count):
+        vectors = centres[rng.integers(0, clusters, count)]
+        vectors = vectors + rng.standard_normal((count, dimensions)).astype(np.float32) * 0.6
+        return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+    return sample(documents), sample(queries)
+
+
+def exact_neighbours(corpus, queries, top_k, space):
+    """Brute-force top_k per query, the ground truth recall is measured against."""
+    if space == 'l2':
+        scores = -(np.sum(corpus ** 2, axis=1)[None, :] - 2 * queries @ corpus.T)
+    elif space == 'cosine':
+        normalised = corpus / np.linalg.norm(corpus, axis=1, keepdims=True)
+        scores = queries @ normalised.T
+    else:
+        scores = queries @ corpus.T
+
+    candidates = np.argpartition(-scores, top_k - 1, axis=1)[:, :top_k]
+    return [set(row) for row in candidates]
+
+
+def build_store(corpus, batch_size, params=None, dtype=None):
+    from backend.services.vector_store import VectorStore
+    from backend.services.numpy_vector_store import NumpyVectorStore
+
+    collection_name = f"bench_{time.time_ns()}"
+    if dtype:
+        config.vector_numpy_dtype = dtype
+        store = NumpyVectorStore(collection_name=collection_name)
+    else:
+        store = VectorStore(collection_name=collection_name, hnsw_params=params)
+    chunks = [
+        {
+            'id': str(position),
+            'text': '',
+            'metadata': {'document_id': str(position), 'chunk_index': 0, 'chunk_size': 0}
+        }
+        for position in range(len(corpus))
+    ]
+
+    started = time.perf_counter()
+    for offset in range(0, len(corpus), batch_size):
+        store.add_documents(chunks[offset:offset + batch_size], corpus[offset:offset + batch_size].tolist())
+    return store, time.perf_counter() - started
+
+
+def measure(store, queries, truth, top_k, candidates):
+    store.query_candidates = candidates
+    latencies = []
+    hits = 0
+    for query, expected in zip(queries.tolist(), truth):
+        started = time.perf_counter()
+        results = store.search(query, top_k=top_k)
+        latencies.append(time.perf_counter() - started)
+        hits += len(expected & {int(doc['id']) for doc in results})
+
+    return {
+        'recall': round(hits / (len(truth) * top_k), 4),
+        'p50_ms': round(statistics.median(latencies) * 1000, 2),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Build the vector index over a synthetic corpus with a grid of HNSW settings (chroma) "
+                    "or storage types (numpy) and report build time, query latency and recall@k against "
+                    "exact search."
+    )
+    parser.add_argument('--backend', choices=['chroma', 'numpy'], nargs='+', default=['chroma', 'numpy'])
+    parser.add_argument('--documents', type=int, default=20000)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--dimensions', type=int, default=768)
+    parser.add_argument('--clusters', type=int, default=50)
+    parser.add_argument('--top-k', type=int, default=10)
+    parser.add_argument('--space', choices=['l2', 'cosine', 'ip'], default=config.vector_hnsw_space)
+    parser.add_argument('--m', type=int, nargs='+', default=[16])
+    parser.add_argument('--construction-ef', type=int, nargs='+', default=[100])
+    parser.add_argument('--search-ef', type=int, nargs='+', default=[10, 50, 100])
+    parser.add_argument('--candidates', type=int, nargs='+', default=[0],
+                        help="VECTOR_QUERY_CANDIDATES values to try on each built index")
+    parser.add_argument('--dtype', choices=['float32', 'float16', 'int8'], nargs='+', default=['float32'],
+                        help="Storage types to try with the numpy backend")
+    parser.add_argument('--batch-size', type=int, default=5000)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    corpus, queries = make_corpus(args.documents, args.queries, args.dimensions, args.clusters, args.seed)
+    started = time.perf_counter()
+    truth = exact_neighbours(corpus, queries, args.top_k, args.space)
+    logger.info(f"Exact search over {args.documents} x {args.dimensions} vectors: "
+                f"{(time.perf_counter() - started) / args.queries * 1000:.2f} ms per query")
+
+    # Every index is built in a throwaway database so the configured one is never touched
+    workdir = tempfile.mkdtemp(prefix='vector_bench_')
+    config.vector_db_path = workdir
+    config.vector_hnsw_space = args.space
+    try:
+        if 'chroma' in args.backend:
+            for m, construction_ef, search_ef in itertools.product(args.m, args.construction_ef, args.search_ef):
+                params = {
+                    'hnsw:space': args.space,
+                    'hnsw:M': m,
+                    'hnsw:construction_ef': construction_ef,
+                    'hnsw:search_ef': search_ef,
+                }
+                store, build_seconds = build_store(corpus, args.batch_size, params=params)
+                for candidates in args.candidates:
+                    result = measure(store, queries, truth, args.top_k, candidates)
+                    logger.info(
+                        f"chroma M={m:>3} construction_ef={construction_ef:>4} search_ef={search_ef:>4} "
+                        f"candidates={candidates:>4}  build={build_seconds:.1f}s  "
+                        f"p50={result['p50_ms']}ms p95={result['p95_ms']}ms  recall@{args.top_k}={result['recall']}"
+                    )
+                store.drop_collection(store.collection_name)
+
+        if 'numpy' in args.backend:
+            for dtype in args.dtype:
+                store, build_seconds = build_store(corpus, args.batch_size, dtype=dtype)
+                result = measure(store, queries, truth, args.top_k, 0)
+                logger.info(
+                    f"numpy dtype={dtype:<7}  build={build_seconds:.1f}s  "
+                    f"p50={result['p50_ms']}ms p95={result['p95_ms']}ms  recall@{args.top_k}={result['recall']}"
+                )
+                store.drop_collection(store.collection_name)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
 import sys
+import threading
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
@@ -7,6 +8,7 @@ from apscheduler.schedulers.blocking import BlockingScheduler
 from apscheduler.triggers.interval import IntervalTrigger
 from datetime import datetime
 from backend.services.indexing_service import IndexingService
+from backend.services.document_watcher import DocumentWatcher, WatcherUnavailable
 from backend.core.config import config
 from backend.core.logger import setup_logger
 
@@ -17,6 +19,9 @@ class IndexScheduler:
     def __init__(self):
         self.indexing_service = IndexingService()
         self.scheduler = BlockingScheduler()
+        self.watcher = None
+        # Scheduled runs and watcher batches must not index concurrently
+        self._index_lock = threading.Lock()
 
     def run_scheduled_index(self):
         logger.info("=" * 80)
@@ -24,7 +29,8 @@ class IndexScheduler:
         logger.info("=" * 80)
 
         try:
-            result = self.indexing_service.incremental_index()
+            with self._index_lock:
+                result = self.indexing_service.incremental_index()
 
             logger.info("Index Revolution completed")
             logger.info(f"Documents processed: {result['documents_processed']}")
@@ -38,6 +44,31 @@ class IndexScheduler:
         except Exception as e:
             logger.error(f"Index Revolution failed: {str(e)}")
 
+    def run_watched_index(self, paths):
+        if paths is None:
+            logger.info("Watcher lost events, running a full incremental index")
+            return self.run_scheduled_index()
+
+        try:
+            with self._index_lock:
+                result = self.indexing_service.index_paths(sorted(paths))
+            logger.info(f"Watcher batch indexed: {result['documents_processed']} documents, "
+                        f"{result.get('documents_deleted', 0)} deleted")
+        except Exception as e:
+            logger.error(f"Watcher batch failed: {str(e)}")
+
+    def start_watcher(self):
+        try:
+            self.watcher = DocumentWatcher(
+                config.local_documents_path,
+                self.run_watched_index,
+                debounce_seconds=config.local_watch_debounce_seconds
+            )
+            self.watcher.start()
+        except (WatcherUnavailable, OSError) as e:
+            logger.warning(f"File watcher unavailable, relying on scheduled scans: {str(e)}")
+            self.watcher = None
+
     def start(self):
         logger.info("Starting Index Scheduler")
         logger.info(f"Indexing interval: {config.index_schedule_minutes} minutes")
@@ -53,6 +84,9 @@ class IndexScheduler:
         logger.info("Running initial index...")
         self.run_scheduled_index()
 
+        if config.local_watch_enabled and config.environment != 'production':
+            self.start_watcher()
+
         logger.info("Scheduler started. Press Ctrl+C to stop.")
         self.scheduler.start()
 
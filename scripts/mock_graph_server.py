@@ -0,0 +1,311 @@
+import sys
+import json
+import time
+import hashlib
+import argparse
+import threading
+from pathlib import Path
+from datetime import datetime, timezone
+from urllib.parse import urlparse, parse_qs, unquote
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend.core.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+DRIVE_ID = 'mock-drive'
+SITE_ID = 'mock-host,mock-site,mock-web'
+
+
+class MockDrive:
+    """A local folder served as a SharePoint drive, with a Graph-style delta feed.
+
+    Every request rescans the folder and appends what changed since the last
+    scan to a change log; a delta token is a position in that log. Item IDs are
+    derived from paths, so a rename shows up as a delete plus an add.
+    """
+
+    def __init__(self, root):
+        self.root = Path(root).resolve()
+        self._lock = threading.Lock()
+        self._snapshot = {}
+        self._log = []
+        self.request_counts = {}
+        self.scan()
+
+    def _item_id(self, relative_path):
+        if not relative_path:
+            return 'root'
+        return hashlib.sha1(relative_path.encode('utf-8')).hexdigest()[:20]
+
+    def _build_item(self, path):
+        relative_path = path.relative_to(self.root).as_posix() if path != self.root else ''
+        stat = path.stat()
+        item = {
+            'id': self._item_id(relative_path),
+            'name': path.name if relative_path else 'root',
+            'lastModifiedDateTime': datetime.fromtimestamp(stat.st_mtime, tz=timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ'),
+            'createdBy': {'user': {'displayName': 'Mock User'}},
+            'webUrl': f"https://mock.sharepoint.local/{relative_path}",
+        }
+        if not relative_path:
+            item['root'] = {}
+            item['folder'] = {}
+        else:
+            parent = path.parent.relative_to(self.root).as_posix() if path.parent != self.root else ''
+            item['parentReference'] = {'driveId': DRIVE_ID, 'id': self._item_id(parent)}
+            if path.is_dir():
+                item['folder'] = {}
+            else:
+                item['file'] = {}
+                item['size'] = stat.st_size
+                item['cTag'] = f"{stat.st_mtime_ns}-{stat.st_size}"
+        return relative_path, item
+
+    def scan(self):
+        with self._lock:
+            current = {}
+            for path in [self.root] + sorted(self.root.rglob('*')):
+                relative_path, item = self._build_item(path)
+                previous = self._snapshot.get(item['id'])
+                if 'file' in item:
+                    if previous and previous[1].get('cTag') == item['cTag']:
+                        item['file'] = previous[1]['file']
+                    else:
+                        item['file'] = {'hashes': {'sha1Hash': hashlib.sha1(path.read_bytes()).hexdigest().upper()}}
+                current[item['id']] = (relative_path, item)
+
+            for item_id, (relative_path, item) in current.items():
+                previous = self._snapshot.get(item_id)
+                if previous is None or previous[1].get('cTag') != item.get('cTag'):
+                    self._log.append(item)
+            for item_id in self._snapshot.keys() - current.keys():
+                self._log.append({'id': item_id, 'deleted': {'state': 'deleted'}})
+
+            self._snapshot = current
+
+    def find(self, relative_path):
+        item_id = self._item_id(relative_path.strip('/'))
+        entry = self._snapshot.get(item_id)
+        return entry[1] if entry else None
+
+    def children(self, relative_path):
+        parent_id = self._item_id(relative_path.strip('/'))
+        return [
+            item for _, item in self._snapshot.values()
+            if item.get('parentReference', {}).get('id') == parent_id
+        ]
+
+    def delta(self, token, skip, top):
+        if token is None:
+            # A fresh enumeration lists the current tree, parents before children
+            items = [item for _, (_, item) in sorted(self._snapshot.items(), key=lambda entry: entry[1][0].count('/') if entry[1][0] else -1)]
+        else:
+            if token > len(self._log):
+                return None
+            changed = {}
+            for item in self._log[token:]:
+                changed[item['id']] = item
+            items = list(changed.values())
+        return items[skip:skip + top], len(items), len(self._log)
+
+    def content(self, item_id):
+        entry = self._snapshot.get(item_id)
+        if entry is None or 'file' not in entry[1]:
+            return None
+        return (self.root / entry[0]).read_bytes()
+
+
+class GraphHandler(BaseHTTPRequestHandler):
+    drive = None
+    base_url = ''
+    token_lifetime = 3600
+    throttle_every = 0
+    tokens = {}
+    graph_requests = 0
+    counter_lock = threading.Lock()
+
+    protocol_version = 'HTTP/1.1'  # keep-alive, so connection reuse shows up in /_stats
+
+    def setup(self):
+        super().setup()
+        self._count('connections')
+
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _count(self, kind):
+        with self.counter_lock:
+            counts = self.drive.request_counts
+            counts[kind] = counts.get(kind, 0) + 1
+
+    def _reject(self):
+        """Send 401 for a missing or expired token, or 429 on every `throttle_every`-th request."""
+        token = self.headers.get('Authorization', '').replace('Bearer ', '')
+        if self.tokens.get(token, 0) < time.monotonic():
+            self._count('unauthorized')
+            self._send_json(401, {'error': {'code': 'InvalidAuthenticationToken'}})
+            return True
+
+        with self.counter_lock:
+            GraphHandler.graph_requests += 1
+            throttled = self.throttle_every and GraphHandler.graph_requests % self.throttle_every == 0
+        if throttled:
+            self._count('throttled')
+            body = json.dumps({'error': {'code': 'TooManyRequests'}}).encode('utf-8')
+            self.send_response(429)
+            self.send_header('Retry-After', '1')
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return True
+        return False
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        self.rfile.read(length)
+        if self.path.endswith('/oauth2/v2.0/token'):
+            self._count('token')
+            token = f"mock-token-{len(self.tokens) + 1}"
+            self.tokens[token] = time.monotonic() + self.token_lifetime
+            return self._send_json(200, {'access_token': token, 'expires_in': self.token_lifetime})
+        self._send_json(404, {'error': {'code': 'itemNotFound'}})
+
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        path = unquote(parsed.path)
+        query = parse_qs(parsed.query)
+
+        if path == '/_stats':
+            return self._send_json(200, self.drive.request_counts)
+
+        self.drive.scan()
+
+        if path.startswith('/content/'):
+            self._count('download')
+            content = self.drive.content(path[len('/content/'):])
+            if content is None:
+                return self._send_json(404, {'error': {'code': 'itemNotFound'}})
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/octet-stream')
+            self.send_header('Content-Length', str(len(content)))
+            self.end_headers()
+            self.wfile.write(content)
+            return
+
+        if not path.startswith('/v1.0/'):
+            return self._send_json(404, {'error': {'code': 'itemNotFound'}})
+        path = path[len('/v1.0'):]
+
+        if self._reject():
+            return
+
+        if path.startswith('/sites/') and path.endswith('/drives'):
+            self._count('drives')
+            return self._send_json(200, {'value': [{'id': DRIVE_ID, 'name': 'Documents'}]})
+        if path.startswith('/sites/'):
+            self._count('site')
+            return self._send_json(200, {'id': SITE_ID})
+
+        drive_prefix = f'/drives/{DRIVE_ID}/root'
+        if path == f'{drive_prefix}/delta':
+            self._count('delta')
+            return self._delta(query)
+
+        if path.startswith(f'{drive_prefix}:/'):
+            item_path = path[len(f'{drive_prefix}:/'):]
+            if item_path.endswith(':/content'):
+                self._count('content')
+                item = self.drive.find(item_path[:-len(':/content')])
+                if item is None or 'file' not in item:
+                    return self._send_json(404, {'error': {'code': 'itemNotFound'}})
+                self.send_response(302)
+                self.send_header('Location', f"{self.base_url}/content/{item['id']}")
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+
+            if item_path.endswith(':/children'):
+                self._count('children')
+                folder = item_path[:-len(':/children')]
+                if self.drive.find(folder) is None:
+                    return self._send_json(404, {'error': {'code': 'itemNotFound'}})
+                children = [
+                    dict(item, **{'@microsoft.graph.downloadUrl': f"{self.base_url}/content/{item['id']}"})
+                    if 'file' in item else item
+                    for item in self.drive.children(folder)
+                ]
+                return self._send_json(200, {'value': children})
+
+            self._count('item')
+            item = self.drive.find(item_path)
+            if item is None:
+                return self._send_json(404, {'error': {'code': 'itemNotFound'}})
+            if 'file' in item:
+                item = dict(item, **{'@microsoft.graph.downloadUrl': f"{self.base_url}/content/{item['id']}"})
+            return self._send_json(200, item)
+
+        self._send_json(404, {'error': {'code': 'itemNotFound'}})
+
+    def _delta(self, query):
+        token = int(query['token'][0]) if 'token' in query else None
+        skip = int(query.get('skip', ['0'])[0])
+        top = int(query.get('$top', ['200'])[0])
+
+        page = self.drive.delta(token, skip, top)
+        if page is None:
+            return self._send_json(410, {'error': {'code': 'resyncRequired'}})
+        items, total, position = page
+
+        delta_url = f"{self.base_url}/v1.0/drives/{DRIVE_ID}/root/delta"
+        payload = {'value': items}
+        if skip + top < total:
+            token_param = f"&token={token}" if token is not None else ''
+            payload['@odata.nextLink'] = f"{delta_url}?$top={top}&skip={skip + top}{token_param}"
+        else:
+            payload['@odata.deltaLink'] = f"{delta_url}?$top={top}&token={position}"
+        self._send_json(200, payload)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Serve a local folder as a SharePoint drive through a minimal mock of the Graph API'
+    )
+    parser.add_argument('root', help='Folder served as the drive root')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--token-lifetime', type=int, default=3600,
+                        help='Seconds before an issued access token is rejected with 401')
+    parser.add_argument('--throttle-every', type=int, default=0,
+                        help='Answer every Nth Graph request with 429 and Retry-After: 1 (0 disables)')
+    args = parser.parse_args()
+
+    GraphHandler.drive = MockDrive(args.root)
+    GraphHandler.base_url = f"http://{args.host}:{args.port}"
+    GraphHandler.token_lifetime = args.token_lifetime
+    GraphHandler.throttle_every = args.throttle_every
+    server = ThreadingHTTPServer((args.host, args.port), GraphHandler)
+
+    logger.info(f"Mock Graph API serving {GraphHandler.drive.root} on {GraphHandler.base_url}")
+    logger.info(f"Point the connector at it with SHAREPOINT_GRAPH_URL={GraphHandler.base_url}/v1.0 "
+                f"and SHAREPOINT_LOGIN_URL={GraphHandler.base_url}")
+    logger.info(f"Request counts by endpoint: GET {GraphHandler.base_url}/_stats")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+import os
+import tempfile
+
+# Config is read from the environment when backend.core.config is first imported,
+# so every store points at a scratch directory before any test module loads
+_scratch = tempfile.mkdtemp(prefix='tryrag_tests_')
+os.environ.update({
+    'ENVIRONMENT': 'development',
+    'EMBEDDING_PROVIDER': 'local',
+    'EMBEDDING_CACHE_ENABLED': 'false',
+    'EXTRACTION_ISOLATION_ENABLED': 'false',
+    'LOCAL_WATCH_ENABLED': 'false',
+    'TELEMETRY_ENABLED': 'false',
+    'CACHE_BACKEND': 'memory',
+    'VECTOR_DB_PATH': os.path.join(_scratch, 'db'),
+    'LOCAL_DOCUMENTS_PATH': os.path.join(_scratch, 'docs'),
+    'LOG_FILE': os.path.join(_scratch, 'app.log'),
+})
+
+import pytest
+
+from backend.core.config import config
+from backend.retrieval import bm25_index
+from backend.services import chunk_manifest, numpy_vector_store
+from backend.services.indexing_service import IndexingService
+
+
+@pytest.fixture
+def workspace(tmp_path, monkeypatch):
+    """Fresh vector store, keyword index, manifests and index state under tmp_path.
+
+    Yields the local documents folder; IndexState resolves ./data against the
+    working directory, so the test runs from tmp_path.
+    """
+    documents = tmp_path / 'docs'
+    documents.mkdir()
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(config, 'vector_db_path', str(tmp_path / 'db'))
+    monkeypatch.setattr(config, 'keyword_index_dir', str(tmp_path / 'db'))
+    monkeypatch.setattr(config, 'local_documents_path', str(documents))
+    monkeypatch.setattr(config, 'local_manifest_path', str(tmp_path / 'local_manifest.db'))
+    # Process-wide registries are keyed by collection name, which every test reuses
+    monkeypatch.setattr(bm25_index, '_indexes', {})
+    monkeypatch.setattr(chunk_manifest, '_manifests', {})
+    monkeypatch.setattr(numpy_vector_store, '_indexes', {})
+    yield documents
+
+
+@pytest.fixture
+def service(workspace):
+    return IndexingService()
@@ -0,0 +1,75 @@
+from backend.retrieval.bm25_index import BM25Index
+
+
+def _chunk(document_id, text, path=None):
+    return {
+        'text': text,
+        'metadata': {'document_id': document_id, 'document_path': path or f"/{document_id}.txt"},
+    }
+
+
+def _index(tmp_path, **kwargs):
+    index = BM25Index(tmp_path / 'keyword.pkl', **kwargs)
+    index.add_chunks(
+        ['a1', 'a2', 'b1', 'c1'],
+        [
+            _chunk('a', 'vacation policy for employees'),
+            _chunk('a', 'vacation carry over rules'),
+            _chunk('b', 'travel policy and vacation travel'),
+            _chunk('c', 'expense reports'),
+        ]
+    )
+    return index
+
+
+def _ids(results):
+    return {chunk_id for chunk_id, _ in results}
+
+
+def test_removed_chunks_stop_matching_and_are_counted_as_tombstones(tmp_path):
+    index = _index(tmp_path, compaction_ratio=1.0)
+    assert _ids(index.search('vacation')) == {'a1', 'a2', 'b1'}
+
+    index.remove_document('a')
+    assert _ids(index.search('vacation')) == {'b1'}
+    assert index.stats()['tombstones'] == 2
+
+    index.remove_chunks(['b1'], document_id='b')
+    assert index.search('vacation') == []
+    stats = index.stats()
+    assert (stats['chunks'], stats['documents'], stats['tombstones']) == (1, 1, 3)
+
+
+def test_reindexed_chunk_replaces_its_earlier_copy(tmp_path):
+    index = _index(tmp_path)
+    index.add_chunks(['a1'], [_chunk('a', 'remote work policy')])
+
+    assert _ids(index.search('remote')) == {'a1'}
+    assert 'a1' not in _ids(index.search('employees'))
+    assert len(index) == 4
+
+
+def test_filtered_search_skips_tombstones(tmp_path):
+    index = _index(tmp_path, compaction_ratio=1.0)
+    index.remove_chunks(['a1'], document_id='a')
+
+    results = index.search('vacation', filters={'document_ids': ['a']})
+    assert _ids(results) == {'a2'}
+
+
+def test_save_compacts_tombstones_and_keeps_scores(tmp_path):
+    index = _index(tmp_path, compaction_ratio=0.25)
+    index.remove_document('c')
+    index.remove_chunks(['a2'], document_id='a')
+    before = index.search('vacation policy')
+
+    index.save()
+    assert index.stats()['tombstones'] == 0
+
+    assert index.search('vacation policy') == before
+    reloaded = BM25Index(tmp_path / 'keyword.pkl')
+    assert reloaded.search('vacation policy') == before
+    assert reloaded.matching_documents({'document_ids': ['a', 'b', 'c']}) == {'a', 'b'}
+
+    reloaded.add_chunks(['d1'], [_chunk('d', 'vacation request form')])
+    assert 'd1' in _ids(reloaded.search('vacation'))
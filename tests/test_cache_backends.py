@@ -0,0 +1,115 @@
+import time
+
+import pytest
+
+from backend.core.config import config
+from backend.services import cache_backends
+from backend.services.cache_backends import (
+    MemoryCacheBackend,
+    RedisCacheBackend,
+    SQLiteCacheBackend,
+    create_cache_backend,
+)
+from backend.services.response_cache import ResponseCache
+
+fakeredis = pytest.importorskip('fakeredis')
+
+
+@pytest.fixture(params=['memory', 'sqlite', 'redis'])
+def make_backend(request, tmp_path):
+    """Factory for backends of one kind; backends made by one factory share storage."""
+    server = fakeredis.FakeServer()
+
+    def make(ttl_seconds=60, max_entries=100, max_bytes=1_000_000):
+        if request.param == 'memory':
+            return MemoryCacheBackend(ttl_seconds, max_entries, max_bytes)
+        if request.param == 'sqlite':
+            return SQLiteCacheBackend(ttl_seconds, max_entries, max_bytes, tmp_path / 'cache.db')
+        client = fakeredis.FakeRedis(server=server)
+        return RedisCacheBackend(ttl_seconds, max_entries, max_bytes, client=client)
+
+    return make
+
+
+def _entry(text):
+    return {'query': text, 'response': {'answer': text}}
+
+
+def test_entries_expire_after_ttl(make_backend):
+    backend = make_backend(ttl_seconds=0.2)
+    backend.set('a', _entry('first'))
+    assert backend.get('a') == _entry('first')
+
+    time.sleep(0.3)
+    assert backend.get('a') is None
+    assert backend.stats()['size'] == 0
+
+
+def test_least_recently_used_entry_is_evicted_at_max_entries(make_backend):
+    backend = make_backend(max_entries=2)
+    backend.set('a', _entry('a'))
+    time.sleep(0.01)
+    backend.set('b', _entry('b'))
+    time.sleep(0.01)
+    assert backend.get('a') is not None  # 'b' is now the least recently used
+    time.sleep(0.01)
+    backend.set('c', _entry('c'))
+
+    assert backend.get('b') is None
+    assert backend.get('a') is not None
+    assert backend.get('c') is not None
+    assert backend.stats()['size'] == 2
+
+
+def test_byte_bound_holds(make_backend):
+    entry_bytes = len(MemoryCacheBackend(60, 1, 1)._encode(_entry('x' * 100)))
+    backend = make_backend(max_bytes=entry_bytes * 3)
+    for i in range(10):
+        backend.set(f"k{i}", _entry('x' * 100))
+        time.sleep(0.01)
+
+    stats = backend.stats()
+    assert stats['bytes'] <= entry_bytes * 3
+    assert stats['size'] == 3
+    assert backend.get('k9') is not None
+    assert backend.get('k0') is None
+
+
+def test_clear_reaches_every_instance_of_a_shared_backend(make_backend):
+    writer = make_backend()
+    other = make_backend()
+    writer.set('a', _entry('a'))
+    if isinstance(writer, MemoryCacheBackend):
+        assert other.get('a') is None  # per-process by design
+        return
+
+    assert other.get('a') == _entry('a')
+    other.clear()
+    assert writer.get('a') is None
+    assert writer.stats()['size'] == 0
+
+
+def test_unreachable_redis_falls_back_to_memory(monkeypatch):
+    monkeypatch.setattr(config, 'cache_backend', 'redis')
+    monkeypatch.setattr(config, 'cache_redis_url', 'redis://127.0.0.1:1/0')
+
+    assert isinstance(create_cache_backend(), MemoryCacheBackend)
+
+
+def test_response_cache_survives_backend_failures(workspace):
+    class BrokenBackend(cache_backends.CacheBackend):
+        name = 'broken'
+
+        def __init__(self):
+            super().__init__(60, 10, 1000)
+
+        def _fail(self, *args):
+            raise ConnectionError('backend down')
+
+        get = set = delete = clear = stats = _fail
+
+    cache = ResponseCache(backend=BrokenBackend())
+    cache.put('question', 5, 0.7, {'answer': 'x'})
+    assert cache.get('question') is None
+    cache.clear()
+    assert cache.stats()['backend'] == 'broken'
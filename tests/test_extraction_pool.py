@@ -0,0 +1,62 @@
+import io
+import mmap
+import time
+
+import pytest
+from docx import Document
+
+from backend.services.document_processor import _iter_pages_in_child
+from backend.services.extraction_pool import ExtractionError, ExtractionPool, ExtractionTimeout
+
+
+def _docx_bytes(paragraphs):
+    document = Document()
+    for text in paragraphs:
+        document.add_paragraph(text)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+def _allocate(megabytes):
+    return len(bytearray(megabytes * 1024 * 1024))
+
+
+def _sleep(seconds):
+    time.sleep(seconds)
+    return seconds
+
+
+def test_extraction_runs_within_limit_when_caller_is_large():
+    paragraphs = ['vacation policy'] + [f"travel rule {i} " * 20 for i in range(3000)]
+    content = _docx_bytes(paragraphs)
+    pool = ExtractionPool(max_workers=1, memory_limit_mb=2048)
+
+    # An API process holding models already maps more than the job's whole budget
+    reserved = mmap.mmap(-1, 3 * 1024 * 1024 * 1024)
+    try:
+        pages = list(pool.stream(_iter_pages_in_child, content, 'policy.docx'))
+        allocated = pool.run(_allocate, 64)
+    finally:
+        reserved.close()
+
+    assert pages
+    assert 'vacation policy' in pages[0]['text']
+    assert allocated == 64 * 1024 * 1024
+
+
+def test_job_over_memory_limit_fails_without_harming_caller():
+    pool = ExtractionPool(max_workers=1, memory_limit_mb=512)
+
+    with pytest.raises(ExtractionError, match='memory limit'):
+        pool.run(_allocate, 1024)
+    assert pool.run(_allocate, 16) == 16 * 1024 * 1024
+
+
+def test_job_over_timeout_is_killed():
+    pool = ExtractionPool(max_workers=1, timeout_seconds=1)
+
+    started = time.monotonic()
+    with pytest.raises(ExtractionTimeout):
+        pool.run(_sleep, 30)
+    assert time.monotonic() - started < 10
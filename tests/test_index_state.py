@@ -0,0 +1,31 @@
+import multiprocessing
+
+from backend.models.index_state import IndexState
+
+
+def _bump(state_file, worker, rounds):
+    state = IndexState(state_file)
+    for n in range(rounds):
+        state.bump_generation([f"doc_{worker}_{n}"])
+        if worker == 0:
+            state.swap_collection('documents', f"documents_{n}")
+
+
+def _run(target, args_list):
+    processes = [multiprocessing.Process(target=target, args=args) for args in args_list]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join(60)
+    assert [process.exitcode for process in processes] == [0] * len(processes)
+
+
+def test_index_state_updates_from_several_processes_are_all_kept(tmp_path):
+    state_file = tmp_path / 'index_state.json'
+    workers, rounds = 4, 50
+    _run(_bump, [(str(state_file), worker, rounds) for worker in range(workers)])
+
+    state = IndexState(str(state_file))
+    assert state.get_generation() == workers * rounds
+    assert state.get_active_collection('documents') == f"documents_{rounds - 1}"
+    assert state.is_stale(0, ['doc_3_49'])
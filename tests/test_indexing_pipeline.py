@@ -0,0 +1,66 @@
+import threading
+import time
+
+from backend.retrieval.bm25_index import BM25Index
+
+
+def _ids(results):
+    return {chunk_id for chunk_id, _ in results}
+
+
+def _write(folder, name, text):
+    path = folder / name
+    path.write_text(text)
+    return path
+
+
+def test_document_without_text_loses_its_stale_chunks(workspace, service):
+    _write(workspace, 'policy.txt', 'Vacation policy: twenty days of paid leave per year.')
+    _write(workspace, 'travel.txt', 'Travel policy: book economy class for short flights.')
+    service.incremental_index()
+    assert service.get_index_stats()['total_documents'] == 2
+
+    _write(workspace, 'policy.txt', '   \n')
+    results = service.incremental_index()
+
+    stats = service.get_index_stats()
+    assert results['chunks_deleted'] == 1
+    assert stats['total_documents'] == 1
+    assert stats['total_chunks'] == 1
+    assert stats['keyword_index']['documents'] == 1
+    names = [doc['name'] for doc in service.get_indexed_documents()['documents']]
+    assert names == ['travel.txt']
+
+
+def test_keyword_index_lock_is_not_held_for_the_whole_run(workspace, service, monkeypatch):
+    for i in range(4):
+        _write(workspace, f"doc{i}.txt", f"Document {i} describes the onboarding checklist.")
+    service.incremental_index()
+
+    embed = service.embedding_service.generate_embeddings
+    embedding_started = threading.Event()
+
+    def slow_embed(texts, *args, **kwargs):
+        embedding_started.set()
+        time.sleep(1.5)
+        return embed(texts, *args, **kwargs)
+
+    monkeypatch.setattr(service.embedding_service, 'generate_embeddings', slow_embed)
+    _write(workspace, 'doc0.txt', 'Document 0 now covers the offboarding checklist.')
+    run = threading.Thread(target=service.incremental_index)
+    run.start()
+    assert embedding_started.wait(10)
+
+    # Another process's writer: a separate index object on the same file
+    other = BM25Index(service.keyword_index.index_path)
+    started = time.monotonic()
+    with other.writing():
+        other.remove_document('unknown')
+    waited = time.monotonic() - started
+    run.join()
+
+    assert waited < 1.0
+    assert _ids(service.keyword_index.search('offboarding')) == {
+        chunk['id'] for chunk in service.vector_store.get_all_chunks()
+        if chunk['metadata']['document_name'] == 'doc0.txt'
+    }
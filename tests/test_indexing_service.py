@@ -0,0 +1,142 @@
+import os
+
+from backend.core.config import config
+from backend.services.indexing_service import IndexingService
+
+
+def _write(folder, name, text):
+    path = folder / name
+    path.write_text(text)
+    return path
+
+
+def test_collection_indexed_before_the_registry_is_registered_by_the_next_run(workspace, service):
+    _write(workspace, 'policy.txt', 'Vacation policy: twenty days of paid leave per year.')
+    _write(workspace, 'travel.txt', 'Travel policy: book economy class for short flights.')
+    service.incremental_index()
+
+    # As left behind by a version without the document registry
+    manifest = service.chunk_manifest
+    manifest.clear()
+    manifest.set_meta('upgraded', '')
+
+    assert service.get_index_stats()['total_documents'] == 0
+    assert service.get_indexed_documents()['documents'] == []
+    assert not manifest.get_meta('upgraded')
+
+    (workspace / 'travel.txt').unlink()
+    results = service.incremental_index()
+
+    assert results['documents_deleted'] == 1
+    stats = service.get_index_stats()
+    assert stats['total_documents'] == 1
+    assert stats['total_chunks'] == 1
+    assert [doc['name'] for doc in service.get_indexed_documents()['documents']] == ['policy.txt']
+
+
+def _paragraphs(*topics):
+    return '\n\n'.join(f"{topic.capitalize()}: " + ' '.join(f"{topic} rule {i}." for i in range(90)) for topic in topics)
+
+
+def _document(service, name):
+    return next(doc for doc in service.get_indexed_documents()['documents'] if doc['name'] == name)
+
+
+def _chunk_ids(service, name):
+    return set(service.chunk_manifest.get(_document(service, name)['id']))
+
+
+def test_incremental_reindex_keeps_the_ids_of_unchanged_chunks(workspace, service):
+    _write(workspace, 'handbook.txt', _paragraphs('vacation', 'travel', 'expenses'))
+    service.incremental_index()
+    before = _chunk_ids(service, 'handbook.txt')
+    assert len(before) >= 3
+
+    _write(workspace, 'handbook.txt', _paragraphs('vacation', 'travel', 'security'))
+    results = service.incremental_index()
+
+    after = _chunk_ids(service, 'handbook.txt')
+    assert results['chunks_unchanged'] > 0
+    assert results['chunks_created'] + results['chunks_unchanged'] == len(after)
+    assert results['chunks_deleted'] == len(before - after)
+    assert 0 < len(before & after) < len(before)
+    assert service.get_index_stats()['total_chunks'] == len(after)
+
+
+def test_touched_but_unchanged_file_is_not_reindexed(workspace, monkeypatch):
+    # Timestamp-based change detection reports the touched file; its content hash skips it
+    monkeypatch.setattr(config, 'local_manifest_enabled', False)
+    service = IndexingService()
+    path = _write(workspace, 'handbook.txt', _paragraphs('vacation', 'travel'))
+    service.incremental_index()
+    before = _chunk_ids(service, 'handbook.txt')
+    generation = service.index_state.get_generation()
+
+    later = path.stat().st_mtime + 3600
+    os.utime(path, (later, later))
+    results = service.incremental_index()
+
+    assert results['documents_unchanged'] == 1
+    assert results['documents_processed'] == 0
+    assert results['chunks_created'] == 0
+    assert _chunk_ids(service, 'handbook.txt') == before
+    assert not service.index_state.is_stale(generation, [_document(service, 'handbook.txt')['id']])
+
+
+def test_full_reindex_swaps_the_alias_and_rollback_restores_it(workspace, service):
+    _write(workspace, 'policy.txt', 'Vacation policy: twenty days of paid leave per year.')
+    service.incremental_index()
+    first = service.vector_store.collection_name
+
+    _write(workspace, 'travel.txt', 'Travel policy: book economy class for short flights.')
+    results = service.full_reindex()
+
+    second = results['collection_name']
+    assert second != first
+    assert service.vector_store.collection_name == second
+    stats = service.get_index_stats()
+    assert stats['previous_collection'] == first
+    assert stats['total_documents'] == 2
+    assert stats['keyword_index']['documents'] == 2
+
+    service.rollback()
+    assert service.vector_store.collection_name == first
+    stats = service.get_index_stats()
+    assert stats['total_documents'] == 1
+    assert stats['keyword_index']['documents'] == 1
+
+
+def test_failed_full_reindex_keeps_serving_the_current_collection(workspace, service, monkeypatch):
+    _write(workspace, 'policy.txt', 'Vacation policy: twenty days of paid leave per year.')
+    service.incremental_index()
+    serving = service.vector_store.collection_name
+
+    def fail(*args, **kwargs):
+        raise RuntimeError('embedding service down')
+
+    monkeypatch.setattr(service.embedding_service, 'generate_embeddings', fail)
+    results = service.full_reindex()
+
+    assert results['status'] == 'failed'
+    assert service.vector_store.collection_name == serving
+    assert service.get_index_stats()['total_documents'] == 1
+
+
+def test_deletes_keep_registry_totals_consistent(workspace, service):
+    for name in ('policy', 'travel', 'expenses'):
+        _write(workspace, f"{name}.txt", _paragraphs(name))
+    service.incremental_index()
+
+    (workspace / 'travel.txt').unlink()
+    service.incremental_index()
+    service.delete_document(_document(service, 'expenses.txt')['id'])
+
+    registry = service.chunk_manifest
+    documents = service.get_indexed_documents()['documents']
+    stats = service.get_index_stats()
+    assert [doc['name'] for doc in documents] == ['policy.txt']
+    assert stats['total_documents'] == len(documents) == 1
+    assert stats['chunk_manifest']['chunks'] == sum(doc['chunks_count'] for doc in documents)
+    assert stats['total_chunks'] == stats['chunk_manifest']['chunks'] == len(registry.get(documents[0]['id']))
+    assert stats['keyword_index']['documents'] == 1
+    assert stats['keyword_index']['chunks'] == stats['total_chunks']
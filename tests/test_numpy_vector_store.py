@@ -0,0 +1,58 @@
+import multiprocessing
+import zlib
+
+import numpy as np
+
+from backend.services.numpy_vector_store import NumpyVectorIndex
+
+DIMENSIONS = 16
+
+
+def _fingerprint(chunk_id):
+    return float(zlib.crc32(chunk_id.encode()) % 100000)
+
+
+def _vectors(ids, seed):
+    vectors = np.random.default_rng(seed).standard_normal((len(ids), DIMENSIONS)).astype(np.float32)
+    # The first component identifies the chunk, so a row stored under the wrong ID shows up
+    vectors[:, 0] = [_fingerprint(chunk_id) for chunk_id in ids]
+    return vectors
+
+
+def _write_chunks(directory, tag, rounds):
+    index = NumpyVectorIndex(directory, compaction_ratio=0.02)
+    for n in range(rounds):
+        ids = [f"{tag}_{n}_{k}" for k in range(5)]
+        index.add(ids, _vectors(ids, n), [''] * 5, [{'document_id': tag, 'chunk_index': k} for k in range(5)])
+        if n % 10 == 9:
+            # Deletes push the index over its compaction ratio while the others append
+            index.delete_ids(ids[:3])
+
+
+def _expected_ids(tag, rounds):
+    return [
+        f"{tag}_{n}_{k}"
+        for n in range(rounds) for k in range(5)
+        if not (n % 10 == 9 and k < 3)
+    ]
+
+
+def _run(target, args_list):
+    processes = [multiprocessing.Process(target=target, args=args) for args in args_list]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join(60)
+    assert [process.exitcode for process in processes] == [0] * len(processes)
+
+
+def test_concurrent_writers_never_store_a_row_under_another_id(tmp_path):
+    tags, rounds = 'abcd', 40
+    _run(_write_chunks, [(tmp_path, tag, rounds) for tag in tags])
+
+    index = NumpyVectorIndex(tmp_path)
+    expected = [chunk_id for tag in tags for chunk_id in _expected_ids(tag, rounds)]
+    stored = index.get_embeddings(expected)
+    assert len(index) == len(expected) == len(stored)
+    assert all(stored[chunk_id][0] == _fingerprint(chunk_id) for chunk_id in expected)
+    assert sorted(index.document_ids()) == list(tags)